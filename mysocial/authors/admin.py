@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from authors.models.author import Author
+from authors.models.directory_author import DirectoryAuthor, NodeSyncState
 from authors.models.remote_node import RemoteNode
 
 
@@ -20,3 +21,16 @@ class RemoteNodeAdmin(admin.ModelAdmin):
 
 
 admin.site.register(RemoteNode, RemoteNodeAdmin)
+
+
+class DirectoryAuthorAdmin(admin.ModelAdmin):
+    list_display = ('url', 'host', 'changed', 'last_seen')
+    list_filter = ('host',)
+
+
+class NodeSyncStateAdmin(admin.ModelAdmin):
+    list_display = ('host', 'started', 'synced', 'authors', 'changed_authors', 'error')
+
+
+admin.site.register(DirectoryAuthor, DirectoryAuthorAdmin)
+admin.site.register(NodeSyncState, NodeSyncStateAdmin)
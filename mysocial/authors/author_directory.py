@@ -0,0 +1,192 @@
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from django.utils import timezone
+
+from authors.models.directory_author import DirectoryAuthor, NodeSyncState
+from common.base_util import BaseUtil
+from common.fast_json import FastJSON
+from mysocial.settings import base
+
+logger = logging.getLogger(__name__)
+
+
+class AuthorDirectory:
+    """
+    Keeps DirectoryAuthor, a local copy of every connected node's authors, so /authors/ and resolving remote authors
+    (see Author.from_directory) don't wait on other nodes. sync_remote_authors pages through each node's /authors/
+    every SYNC_INTERVAL_SECONDS of base.REMOTE_AUTHOR_DIRECTORY; rows are only rewritten for authors that changed.
+
+    A node's copy is used while its last complete crawl is younger than MAX_AGE_SECONDS (see NodeSyncState). Before the
+    first crawl, or once it's too old, callers ask the node live like before.
+
+    Example how to use::
+
+        directory = AuthorDirectory()
+        for node_config in directory.get_due_nodes(now):
+            directory.sync_node(node_config, now)
+    """
+
+    def __init__(self, config: dict = None):
+        config = base.REMOTE_AUTHOR_DIRECTORY if config is None else config
+        self.page_size = config['PAGE_SIZE']
+        self.max_pages = config['MAX_PAGES']
+
+    @staticmethod
+    def get_states(hosts: list) -> dict:
+        states = {state.host: state for state in NodeSyncState.objects.filter(host__in=hosts)}
+        return {host: states.get(host) or NodeSyncState(host=host) for host in hosts}
+
+    @staticmethod
+    def get_fresh_hosts(hosts: list, now: datetime = None) -> list:
+        """The hosts whose copy is used: their last complete crawl is younger than MAX_AGE_SECONDS"""
+        now = now or timezone.now()
+        return [host for host, state in AuthorDirectory.get_states(hosts).items() if state.is_fresh(now)]
+
+    def get_due_nodes(self, now: datetime) -> list:
+        """The connected nodes whose last crawl started more than SYNC_INTERVAL_SECONDS ago, if ever"""
+        nodes = list(BaseUtil.connected_nodes)
+        states = AuthorDirectory.get_states([node_config.domain for node_config in nodes])
+        return [node_config for node_config in nodes if states[node_config.domain].is_due(now)]
+
+    def sync_node(self, node_config, now: datetime = None) -> NodeSyncState:
+        """
+        Pages through the node's authors, adding new ones and rewriting changed ones. Once every page was read, the
+        authors the node no longer lists are deleted.
+
+        :return: The node's state after the crawl; check its error
+        """
+        now = now or timezone.now()
+        host = node_config.domain
+        state, _ = NodeSyncState.objects.get_or_create(host=host)
+        state.started = now
+        state.save(update_fields=['started'])
+
+        seen = changed = 0
+        previous_urls = None
+        is_complete = False
+        # if authors the node no longer lists can be deleted
+        is_exhaustive = True
+        error = ''
+        for page in range(1, self.max_pages + 1):
+            author_jsons = node_config.get_all_author_jsons({'page': page, 'size': self.page_size})
+            if author_jsons is None:
+                if page == 1:
+                    error = 'could not get the first page of authors'
+                else:
+                    # the page before was full, so this is probably a 404 for the page after the last one; we can't
+                    # tell it from an error, so the authors we didn't see are left to age out instead of being deleted
+                    is_complete = True
+                    is_exhaustive = False
+                break
+
+            entries = AuthorDirectory.to_entries(host, author_jsons)
+            urls = [entry.url for entry in entries]
+            if urls == previous_urls:
+                # the node ignores page and size and sent everything again
+                is_complete = True
+                break
+            previous_urls = urls
+
+            changed += AuthorDirectory.save_entries(entries, now)
+            seen += len(entries)
+            if len(author_jsons) < self.page_size:
+                is_complete = True
+                break
+        else:
+            error = f'stopped after {self.max_pages} pages'
+
+        if is_complete:
+            if is_exhaustive:
+                DirectoryAuthor.objects.filter(host=host, last_seen__lt=now).delete()
+            state.synced = now
+            state.authors = seen
+            state.changed_authors = changed
+        state.error = error
+        state.save()
+
+        if error:
+            logger.warning(f'AuthorDirectory: {host}: {error}')
+        return state
+
+    @staticmethod
+    def to_entries(host: str, author_jsons: list) -> list:
+        entries = {}
+        for author_json in author_jsons:
+            url = author_json.get('url')
+            # nodes may list our authors too
+            if not url or author_json.get('host') == base.CURRENT_DOMAIN:
+                continue
+            content_hash = hashlib.sha256(FastJSON.dumps(author_json)).hexdigest()
+            entry = DirectoryAuthor(url=DirectoryAuthor.get_url_key(url), author_id=str(author_json.get('id', '')),
+                                    host=host, data=author_json, content_hash=content_hash)
+            entries[entry.url] = entry
+        return list(entries.values())
+
+    @staticmethod
+    def save_entries(entries: list, now: datetime) -> int:
+        """
+        Adds new authors and rewrites changed ones; the others are only marked as seen.
+
+        :return: How many were added or changed
+        """
+        hashes = dict(DirectoryAuthor.objects.filter(url__in=[entry.url for entry in entries])
+                      .values_list('url', 'content_hash'))
+
+        new_entries = []
+        changed_entries = []
+        unchanged_urls = []
+        for entry in entries:
+            entry.first_seen = entry.changed = entry.last_seen = now
+            if entry.url not in hashes:
+                new_entries.append(entry)
+            elif hashes[entry.url] != entry.content_hash:
+                changed_entries.append(entry)
+            else:
+                unchanged_urls.append(entry.url)
+
+        DirectoryAuthor.objects.bulk_create(new_entries, ignore_conflicts=True)
+        DirectoryAuthor.objects.bulk_update(changed_entries,
+                                            ['author_id', 'host', 'data', 'content_hash', 'changed', 'last_seen'])
+        if unchanged_urls:
+            DirectoryAuthor.objects.filter(url__in=unchanged_urls).update(last_seen=now)
+        return len(new_entries) + len(changed_entries)
+
+    @staticmethod
+    def get_author_jsons(hosts: list, params: dict = None, now: datetime = None) -> dict:
+        """
+        The authors of the given nodes whose copy is fresh, the ones we saw first first, in two queries; or one more
+        per node when params has a page.
+
+        :param params: page and size, to get only that page of each node's authors, like the node would send
+        :return: Author jsons by host; nodes we have to ask live are left out
+        """
+        now = now or timezone.now()
+        fresh_hosts = AuthorDirectory.get_fresh_hosts(hosts, now)
+        if not fresh_hosts:
+            return {}
+
+        entries = DirectoryAuthor.get_fresh(now).order_by('first_seen', 'url')
+        page = AuthorDirectory.get_page_slice(params or {})
+        if page is not None:
+            return {host: list(entries.filter(host=host).values_list('data', flat=True)[page]) for host in fresh_hosts}
+
+        author_jsons = defaultdict(list)
+        for host, data in entries.filter(host__in=fresh_hosts).values_list('host', 'data'):
+            author_jsons[host].append(data)
+        return {host: author_jsons[host] for host in fresh_hosts}
+
+    @staticmethod
+    def get_page_slice(params: dict) -> Optional[slice]:
+        """The slice of a listing that params' page and size select; None if they aren't both valid"""
+        try:
+            page = int(params['page'])
+            size = int(params['size'])
+        except (KeyError, ValueError):
+            return None
+        if page < 1 or size < 1:
+            return None
+        return slice((page - 1) * size, page * size)
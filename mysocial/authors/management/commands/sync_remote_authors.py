@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from authors.author_directory import AuthorDirectory
+from mysocial.settings import base
+from remote_nodes.remote_util import RemoteUtil
+
+
+class Command(BaseCommand):
+    help = "Copies the authors of every connected node into DirectoryAuthor (see AuthorDirectory), each node once " \
+           "every SYNC_INTERVAL_SECONDS of REMOTE_AUTHOR_DIRECTORY"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='stop once every due node was synced instead of waiting')
+        parser.add_argument('--node', help='only sync the node with this domain, due or not')
+        parser.add_argument('--interval', type=float, default=60.0,
+                            help='seconds to wait before looking for due nodes again')
+
+    def handle(self, *args, **options):
+        if not base.REMOTE_CONFIG:
+            # what the web process does when it loads mysocial/urls.py
+            RemoteUtil.setup()
+
+        directory = AuthorDirectory()
+        while True:
+            now = timezone.now()
+            if options['node'] is not None:
+                node_config = base.REMOTE_CONFIG.get(options['node'])
+                if node_config is None:
+                    raise CommandError(f'Not a connected node: {options["node"]}')
+                nodes = [node_config]
+            else:
+                nodes = directory.get_due_nodes(now)
+
+            for node_config in nodes:
+                state = directory.sync_node(node_config, now)
+                if state.error:
+                    self.stdout.write(self.style.WARNING(f'{state.host}: {state.error}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{state.host}: {state.authors} authors, {state.changed_authors} new or changed'))
+
+            if options['once'] or options['node'] is not None:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,46 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authors', '0008_author_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirectoryAuthor',
+            fields=[
+                ('url', models.CharField(max_length=1000, primary_key=True, serialize=False)),
+                ('author_id', models.CharField(max_length=255)),
+                ('host', models.CharField(max_length=255)),
+                ('data', models.JSONField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('first_seen', models.DateTimeField(default=django.utils.timezone.now)),
+                ('changed', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_seen', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NodeSyncState',
+            fields=[
+                ('host', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('synced', models.DateTimeField(blank=True, null=True)),
+                ('authors', models.PositiveIntegerField(default=0)),
+                ('changed_authors', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='directoryauthor',
+            index=models.Index(fields=['author_id'], name='directoryauthor_author_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='directoryauthor',
+            index=models.Index(fields=['host', 'last_seen'], name='directoryauthor_host_seen_idx'),
+        ),
+    ]
@@ -1,14 +1,19 @@
+import logging
 import uuid
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from requests import ConnectionError
 
+from authors.author_directory import AuthorDirectory
 from common.base_util import BaseUtil
 from mysocial.settings import base
+from .directory_author import DirectoryAuthor
 from .author_manager import AuthorManager
 from .remote_node import NodeStatus, RemoteNode
 
+logger = logging.getLogger(__name__)
+
 
 class Author(AbstractUser):
     """
@@ -46,6 +51,8 @@ class Author(AbstractUser):
     github = models.TextField(blank=True)
     profile_image = models.TextField(default="", blank=True)
     node_detail = models.ForeignKey(RemoteNode, on_delete=models.CASCADE, null=True, blank=True)
+    """Row version; bumped on every save. Used for conditional GETs, see ConditionalHelper"""
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = AuthorManager()
 
@@ -129,8 +136,8 @@ def get_serializer_field_name():
     @classmethod
     def get_author(cls, official_id: str, should_do_recursively=True):
         """
-        Get a local author. If not found locally, tries to find the author on other nodes by default.
-        Turn off the recursive find by setting should_do_recursively=False.
+        Get a local author. If not found locally, tries to find the author in the DirectoryAuthor copy of other nodes'
+        authors, then on other nodes, by default. Turn off the recursive find by setting should_do_recursively=False.
 
         :param official_id:
         :return: A local_author
@@ -145,24 +152,45 @@ def get_author(cls, official_id: str, should_do_recursively=True):
             if not should_do_recursively:
                 raise cls.DoesNotExist()
 
+            author = cls.from_directory(author_id=str(official_id))
+            if author is not None:
+                return author
+
             for node in BaseUtil.connected_nodes:
                 try:
                     author = node.from_author_id_to_author(official_id)
                 except ConnectionError:
                     continue
                 except ValueError as e:
-                    print(f"Author.get_author: Value error: {str(e)}")
+                    logger.warning(f"Author.get_author: Value error: {str(e)}")
                     continue
                 except Exception as e:
-                    print(f"Author.get_author: Unknown err: {str(e)}")
+                    logger.warning(f"Author.get_author: Unknown err: {str(e)}")
                     continue
 
                 if author is not None:
                     return author  # <- GODD RESULT HERE
             raise cls.DoesNotExist()
         except Exception as e:
-            print(f"Cannot find author {official_id}: {e}")
+            logger.warning(f"Cannot find author {official_id}: {e}")
+            return None
+
+    @classmethod
+    def from_directory(cls, **lookup):
+        """
+        A remote author from the DirectoryAuthor copy, e.g. from_directory(url=url); no node is asked.
+
+        :return: The remote author, or None if it isn't there, is out of date, or its node is no longer connected or
+        wasn't crawled recently (see AuthorDirectory.get_fresh_hosts)
+        """
+        hosts = AuthorDirectory.get_fresh_hosts([node_config.domain for node_config in BaseUtil.connected_nodes])
+        entry = DirectoryAuthor.get_fresh().filter(host__in=hosts, **lookup).first()
+        if entry is None:
+            return None
+        serializer = cls.SERIALIZER(data=entry.data)
+        if not serializer.is_valid():
             return None
+        return serializer.validated_data
 
     @classmethod
     def get_all_authors(cls):
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from django.db import models
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from mysocial.settings import base
+
+
+class DirectoryAuthor(models.Model):
+    """
+    A remote author as its node listed it at /authors/ the last time sync_remote_authors went through it; see
+    AuthorDirectory. Lets us list and resolve remote authors without asking their node.
+    """
+    # author url without the trailing slash; see get_url_key
+    url = models.CharField(primary_key=True, max_length=1000)
+    # whatever the node uses as id; not always a uuid
+    author_id = models.CharField(max_length=255)
+    host = models.CharField(max_length=255)
+    # as AuthorSerializer wrote it, so it can be read back with AuthorSerializer(data=data)
+    data = models.JSONField()
+    # sha256 of data; rows are only rewritten when it changes
+    content_hash = models.CharField(max_length=64)
+    first_seen = models.DateTimeField(default=timezone.now)
+    changed = models.DateTimeField(default=timezone.now)
+    last_seen = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # resolving an author by id; see Author.from_directory
+            models.Index(fields=['author_id'], name='directoryauthor_author_id_idx'),
+            # a node's authors, and the ones its last crawl didn't see
+            models.Index(fields=['host', 'last_seen'], name='directoryauthor_host_seen_idx'),
+        ]
+
+    @staticmethod
+    def get_url_key(url: str) -> str:
+        return str(url).rstrip('/')
+
+    @staticmethod
+    def get_fresh(now: datetime = None) -> QuerySet:
+        """Authors seen in the last MAX_AGE_SECONDS; older ones may be gone from their node"""
+        now = now or timezone.now()
+        max_age = timedelta(seconds=base.REMOTE_AUTHOR_DIRECTORY['MAX_AGE_SECONDS'])
+        return DirectoryAuthor.objects.filter(last_seen__gte=now - max_age)
+
+
+class NodeSyncState(models.Model):
+    """How far sync_remote_authors got with a node; see AuthorDirectory"""
+    host = models.CharField(primary_key=True, max_length=255)
+    # when the last crawl started, finished or not
+    started = models.DateTimeField(null=True, blank=True)
+    # when the last crawl that went through every page started; its directory is as old as this
+    synced = models.DateTimeField(null=True, blank=True)
+    # of the last complete crawl
+    authors = models.PositiveIntegerField(default=0)
+    changed_authors = models.PositiveIntegerField(default=0)
+    # why the last crawl stopped early, if it did
+    error = models.TextField(blank=True, default='')
+
+    def is_due(self, now: datetime) -> bool:
+        interval = timedelta(seconds=base.REMOTE_AUTHOR_DIRECTORY['SYNC_INTERVAL_SECONDS'])
+        return self.started is None or self.started <= now - interval
+
+    def is_fresh(self, now: datetime) -> bool:
+        max_age = timedelta(seconds=base.REMOTE_AUTHOR_DIRECTORY['MAX_AGE_SECONDS'])
+        return self.synced is not None and self.synced > now - max_age
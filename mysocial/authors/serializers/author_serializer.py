@@ -1,5 +1,8 @@
 import json
+import logging
 import pathlib
+import threading
+from collections import OrderedDict
 from urllib.parse import urlparse
 
 from drf_spectacular.utils import OpenApiExample, extend_schema_serializer
@@ -9,6 +12,8 @@
 from common.base_util import BaseUtil
 from mysocial.settings import base
 
+logger = logging.getLogger(__name__)
+
 AUTHOR_SERIALIZER_EXAMPLE = {
     "type": "author",
     "id": "9ae19cc1-4fbe-478a-bcbf-ffddbf906605",
@@ -56,6 +61,51 @@ class AuthorSerializer(serializers.ModelSerializer):
         'password': 'password',
     }
 
+    # memoized representations shared by every serializer that nests authors; see to_representation
+    REPRESENTATION_CACHE_SIZE = 4096
+    _representation_cache: OrderedDict = OrderedDict()
+    _representation_cache_lock = threading.Lock()
+
+    def to_representation(self, instance: Author) -> OrderedDict:
+        """
+        Serializes an author, reusing the output from the last time the same version of this author was serialized.
+
+        Saved authors are versioned by updated_at, remote authors we deserialized on the fly by their fields.
+        Entries are dropped on Author save, see authors/signals.py. Returns a shallow copy so callers can modify it.
+        """
+        key = str(instance.official_id)
+        version = AuthorSerializer._get_representation_version(instance)
+
+        with AuthorSerializer._representation_cache_lock:
+            cached = AuthorSerializer._representation_cache.get(key)
+            if cached is not None and cached[0] == version:
+                AuthorSerializer._representation_cache.move_to_end(key)
+                return OrderedDict(cached[1])
+
+        representation = super().to_representation(instance)
+
+        with AuthorSerializer._representation_cache_lock:
+            AuthorSerializer._representation_cache[key] = (version, representation)
+            AuthorSerializer._representation_cache.move_to_end(key)
+            while len(AuthorSerializer._representation_cache) > AuthorSerializer.REPRESENTATION_CACHE_SIZE:
+                AuthorSerializer._representation_cache.popitem(last=False)
+
+        return OrderedDict(representation)
+
+    @staticmethod
+    def invalidate_representation(official_id):
+        with AuthorSerializer._representation_cache_lock:
+            AuthorSerializer._representation_cache.pop(str(official_id), None)
+
+    @staticmethod
+    def _get_representation_version(model: Author) -> tuple:
+        if not model._state.adding and model.updated_at is not None:
+            return ('saved', model.updated_at)
+
+        # remote authors are never saved, so the fields we serialize are their version
+        return ('unsaved', model.get_url(), model.host, model.display_name, model.username, model.github,
+                model.profile_image)
+
     @staticmethod
     def get_type(model: Author) -> str:
         return model.get_serializer_field_name()
@@ -142,7 +192,7 @@ def to_internal_value(self, data: dict) -> Author:
                 author = Author()
                 node_config = base.REMOTE_CONFIG.get(host)
                 if node_config is None:
-                    print(f"AuthorSerializer: Host not found: {host}")
+                    logger.warning(f"AuthorSerializer: Host not found: {host}")
                     raise serializers.ValidationError({host: 'missing field'})
                 remote_fields: dict = node_config.remote_author_fields
 
@@ -183,7 +233,7 @@ def to_internal_value(self, data: dict) -> Author:
                     setattr(author, 'url', f'{author_url}/')
                     author.username = author.display_name
         except Exception as e:
-            print(f"AuthorSerializer: failed serializing: {e}")
+            logger.warning(f"AuthorSerializer: failed serializing: {e}")
             raise serializers.ValidationError({'non_field_errors': str(e)})
 
         return author
@@ -199,14 +249,14 @@ def deserializer_author_list(cls, response_json: str):
         elif isinstance(response_json, dict) or isinstance(response_json, list):
             author_json = response_json
         else:
-            print(f'AuthorSerializer: deserializer_author_list: unknown type ({type(response_json)}): {str(response_json)}')
+            logger.warning(f'AuthorSerializer: deserializer_author_list: unknown type ({type(response_json)}): {str(response_json)}')
             return []
 
         if isinstance(author_json, dict):
             author_json = author_json.get('items')
 
         if author_json is None:
-            print('AuthorSerializer: deserializer_author_list: author_json is None')
+            logger.warning('AuthorSerializer: deserializer_author_list: author_json is None')
             return []
 
         author_list = []
@@ -216,7 +266,7 @@ def deserializer_author_list(cls, response_json: str):
                 author = author_deserializer.validated_data
                 author_list.append(AuthorSerializer(author).data)
             else:
-                print(f'AuthorSerializer: deserializer_author_list: unknown error')
+                logger.warning(f'AuthorSerializer: deserializer_author_list: unknown error')
         return author_list
 
 
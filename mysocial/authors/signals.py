@@ -1,10 +1,30 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver   
 from authors.models.author import Author
+from authors.serializers.author_serializer import AuthorSerializer
+from common.response_cache import ResponseCache
 from inbox.models import Inbox
 
 @receiver(post_save, sender = Author)
 def create_inbox(sender, instance, created, **kwargs):
     if created:
-        inbox = Inbox.objects.create(author = instance)
-        inbox.save()
+        Inbox.objects.create(author = instance)
+
+
+@receiver([post_save, post_delete], sender = Author)
+def invalidate_author_representation(sender, instance, **kwargs):
+    # updated_at is not bumped by saves with update_fields, so the version alone is not enough
+    AuthorSerializer.invalidate_representation(instance.official_id)
+
+
+@receiver([post_save, post_delete], sender = Author)
+def invalidate_author_responses(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and set(update_fields) <= {'last_login', 'updated_at'}:
+        # logging in does not change anything we serialize
+        return
+
+    ResponseCache.invalidate(ResponseCache.AUTHORS)
+    # authors are embedded in every post they wrote
+    ResponseCache.invalidate(ResponseCache.PUBLIC_POSTS)
+    ResponseCache.invalidate(ResponseCache.AUTHOR_POSTS, str(instance.official_id))
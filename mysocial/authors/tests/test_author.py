@@ -3,6 +3,7 @@
 
 from authors.models.author import Author
 from authors.models.remote_node import NodeStatus
+from authors.serializers.author_serializer import AuthorSerializer
 from common.test_helper import TestHelper
 
 
@@ -97,3 +98,18 @@ def test_get_all_authors(self):
 
         for case in test_cases:
             self.assertEqual(case.user in authors, case.result)
+
+    def test_serializer_representation_follows_saves(self):
+        data = AuthorSerializer(self.local_author).data
+        self.assertEqual(data['displayName'], self.local_author.display_name)
+
+        # a partial save does not bump updated_at but must still drop the cached representation
+        self.local_author.display_name = 'renamed'
+        self.local_author.save(update_fields=['display_name'])
+        stale_copy = Author.objects.get(official_id=self.local_author.official_id)
+        self.assertEqual(AuthorSerializer(stale_copy).data['displayName'], 'renamed')
+
+        # callers get their own copy
+        data = AuthorSerializer(self.local_author).data
+        data['displayName'] = 'changed by caller'
+        self.assertEqual(AuthorSerializer(self.local_author).data['displayName'], 'renamed')
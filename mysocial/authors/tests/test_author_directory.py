@@ -0,0 +1,100 @@
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from authors.author_directory import AuthorDirectory
+from authors.models.author import Author
+from authors.models.directory_author import DirectoryAuthor, NodeSyncState
+from benchmarks.stub_peer import StubPeer
+from common.base_util import BaseUtil
+from common.test_helper import TestHelper
+from mysocial.settings import base
+
+
+class TestAuthorDirectory(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        BaseUtil.connected_nodes = []
+        self.remote_author_ids = [str(uuid.uuid4()) for _ in range(5)]
+        self.peer = StubPeer(self.remote_author_ids)
+        self.peer.register()
+        self.addCleanup(self.peer.unregister)
+        mock = self.peer.mock()
+        mock.__enter__()
+        self.addCleanup(mock.__exit__, None, None, None)
+
+        self.node_config = base.REMOTE_CONFIG[self.peer.domain]
+        self.directory = AuthorDirectory({'PAGE_SIZE': 2, 'MAX_PAGES': 10})
+
+    def test_sync_node(self):
+        state = self.directory.sync_node(self.node_config)
+        self.assertEqual(state.error, '')
+        self.assertEqual((state.authors, state.changed_authors), (5, 5))
+        self.assertEqual(DirectoryAuthor.objects.filter(host=self.peer.domain).count(), 5)
+
+        # only what changed is rewritten; authors the node dropped are deleted
+        self.peer.remote_author_ids = self.remote_author_ids[1:]
+        state = self.directory.sync_node(self.node_config, timezone.now() + timedelta(seconds=1))
+        self.assertEqual((state.authors, state.changed_authors), (4, 0))
+        self.assertFalse(DirectoryAuthor.objects.filter(author_id=self.remote_author_ids[0]).exists())
+
+        # the node isn't due again until SYNC_INTERVAL_SECONDS passed
+        self.assertEqual(self.directory.get_due_nodes(timezone.now()), [])
+
+    def test_sync_node_ends_on_error_after_full_page(self):
+        self.directory.sync_node(self.node_config)
+        # a node with a multiple of the page size of authors that errors for the page after the last one
+        self.peer.remote_author_ids = self.remote_author_ids[1:]
+        get_all_author_jsons = self.node_config.get_all_author_jsons
+        with mock.patch.object(self.node_config, 'get_all_author_jsons',
+                               side_effect=lambda params: get_all_author_jsons(params) if params['page'] < 3 else None):
+            now = timezone.now() + timedelta(seconds=1)
+            state = self.directory.sync_node(self.node_config, now)
+
+        self.assertEqual((state.error, state.synced, state.authors), ('', now, 4))
+        # we can't tell it from an error, so the author that wasn't seen is left to age out
+        self.assertTrue(DirectoryAuthor.objects.filter(author_id=self.remote_author_ids[0]).exists())
+
+    def test_read_page_from_directory(self):
+        self.directory.sync_node(self.node_config)
+
+        every_author = AuthorDirectory.get_author_jsons([self.peer.domain])[self.peer.domain]
+        self.assertEqual(len(every_author), 5)
+        author_jsons = AuthorDirectory.get_author_jsons([self.peer.domain], {'page': '2', 'size': '2'})
+        self.assertEqual(author_jsons[self.peer.domain], every_author[2:4])
+
+    def test_read_from_directory(self):
+        self.directory.sync_node(self.node_config)
+        self.peer.calls.clear()
+
+        author = Author.get_author(self.remote_author_ids[1])
+        self.assertEqual(author.get_id(), self.remote_author_ids[1])
+        self.assertEqual(author.host, self.peer.domain)
+
+        self.client.force_login(TestHelper.create_author('directory_reader'))
+        response = self.client.get(f'/{Author.URL_PATH}/')
+        self.assertEqual(response.status_code, 200)
+        remote_ids = [item['id'] for item in response.data['items'] if item['host'] == self.peer.domain]
+        self.assertCountEqual(remote_ids, self.remote_author_ids)
+
+        # the peer wasn't asked
+        self.assertEqual(self.peer.get_call_count(), 0)
+
+    def test_read_from_directory_only_connected_fresh_nodes(self):
+        self.directory.sync_node(self.node_config)
+        lookup = {'author_id': self.remote_author_ids[1]}
+        self.assertIsNotNone(Author.from_directory(**lookup))
+
+        # the node's last complete crawl is too old
+        max_age = timedelta(seconds=base.REMOTE_AUTHOR_DIRECTORY['MAX_AGE_SECONDS'])
+        NodeSyncState.objects.filter(host=self.peer.domain).update(synced=timezone.now() - max_age)
+        self.assertIsNone(Author.from_directory(**lookup))
+
+        # the node was disconnected
+        NodeSyncState.objects.filter(host=self.peer.domain).update(synced=timezone.now())
+        self.peer.unregister()
+        self.assertIsNone(Author.from_directory(**lookup))
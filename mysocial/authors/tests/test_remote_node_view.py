@@ -5,6 +5,7 @@
 
 from authors.models.remote_node import NodeStatus
 from common.test_helper import TestHelper
+from remote_nodes.remote_client import RemoteCallMetrics
 
 
 class TestRemoteNodeView(TestCase):
@@ -43,3 +44,27 @@ def test_get_successful(self):
             response = self.client.get('/remote-node/', **header)
             self.assertEqual(case.result, response.status_code, case.user)
             self.client.logout()
+
+    def test_get_metrics(self):
+        RemoteCallMetrics.record('Team12Main', 'GET', '/authors/{id}/posts/', '200', 0.2, 512)
+
+        # anonymous
+        response = self.client.get('/remote-node/metrics/')
+        self.assertEqual(401, response.status_code)
+
+        # nodes are not admins
+        token = base64.b64encode('active_node:active_node'.encode('ascii')).decode('utf-8')
+        response = self.client.get('/remote-node/metrics/', HTTP_AUTHORIZATION=f'Basic {token}')
+        self.assertEqual(403, response.status_code)
+
+        # neither are regular authors
+        self.client.force_login(self.local_author)
+        response = self.client.get('/remote-node/metrics/')
+        self.assertEqual(403, response.status_code)
+
+        admin = TestHelper.create_author('admin', {'is_superuser': True})
+        self.client.force_login(admin)
+        response = self.client.get('/remote-node/metrics/')
+        self.assertEqual(200, response.status_code)
+        self.assertIn('remote_requests_total{node="Team12Main",method="GET",endpoint="/authors/{id}/posts/",status="200"}',
+                      response.content.decode('utf-8'))
@@ -8,4 +8,5 @@
     path(f'{app_name}/self/', views.AuthorSelfView.as_view()),
     path(f'{app_name}/<uuid:author_id>/', views.AuthorView.as_view({'get': 'retrieve', 'put': 'update_profile'})),
     path('remote-node/', views.RemoteNodeView.as_view()),
+    path('remote-node/metrics/', views.RemoteNodeMetricsView.as_view()),
 ]
@@ -1,11 +1,16 @@
+import logging
 import pathlib
 
+from asgiref.sync import sync_to_async
 from django.core.exceptions import ValidationError
 
 from authors.models.author import Author
+from authors.models.directory_author import DirectoryAuthor
 from authors.serializers.author_serializer import AuthorSerializer
 from mysocial.settings import base
 
+logger = logging.getLogger(__name__)
+
 
 # These functions are outside Author to prevent circular dependency and IDEs struggling figuring out type hinting
 
@@ -27,23 +32,48 @@ def from_author_url_to_author(author_url: str) -> (Author, ValidationError):
 
             # do logic with author
         """
-        serializer = AuthorSerializer(data={'url': author_url})
-        if not serializer.is_valid():
-            return None, ValidationError(f'{author_url} cannot be deserialized to an Author')
-
-        first_author: Author = serializer.validated_data
-        if first_author.is_local():
+        first_author, err = AuthorUtil._from_author_url(author_url)
+        if err is not None or first_author.is_local():
             # guaranteed complete!
-            return first_author, None  # <- GOOD RESULT
+            return first_author, err  # <- GOOD RESULT
 
         # second pass for remote authors to get the most fields possible
         node_config = base.REMOTE_CONFIG.get(first_author.host)
         if node_config is None:
             return None, ValidationError(f'{author_url} does not have any corresponding domain. domain/host={first_author.host}')
 
-        remote_author = node_config.get_author_via_url(author_url)
+        remote_author = Author.from_directory(url=DirectoryAuthor.get_url_key(author_url))
+        if remote_author is None:
+            remote_author = node_config.get_author_via_url(author_url)
+        return AuthorUtil._check_remote_author(remote_author)
+
+    @staticmethod
+    async def afrom_author_url_to_author(author_url: str) -> (Author, ValidationError):
+        """Async version of from_author_url_to_author; the remote author is fetched without blocking the event loop"""
+        first_author, err = await sync_to_async(AuthorUtil._from_author_url)(author_url)
+        if err is not None or first_author.is_local():
+            return first_author, err
+
+        node_config = base.REMOTE_CONFIG.get(first_author.host)
+        if node_config is None:
+            return None, ValidationError(f'{author_url} does not have any corresponding domain. domain/host={first_author.host}')
+
+        remote_author = await sync_to_async(Author.from_directory)(url=DirectoryAuthor.get_url_key(author_url))
+        if remote_author is None:
+            remote_author = await node_config.aget_author_via_url(author_url)
+        return AuthorUtil._check_remote_author(remote_author)
+
+    @staticmethod
+    def _from_author_url(author_url: str) -> (Author, ValidationError):
+        serializer = AuthorSerializer(data={'url': author_url})
+        if not serializer.is_valid():
+            return None, ValidationError(f'{author_url} cannot be deserialized to an Author')
+        return serializer.validated_data, None
+
+    @staticmethod
+    def _check_remote_author(remote_author: Author) -> (Author, ValidationError):
         if remote_author is None:
-            print('from_author_url_to_author: get_author_via_url returned None')
+            logger.warning('from_author_url_to_author: get_author_via_url returned None')
             return None, ValidationError('from_author_url_to_author: get_author_via_url returned None')
 
         return remote_author, None
@@ -1,23 +1,31 @@
+import asyncio
 import logging
 
+from asgiref.sync import sync_to_async
 from django.http import HttpResponseBadRequest, HttpResponseForbidden
 from django.http.response import HttpResponse, HttpResponseNotFound
 from drf_spectacular.utils import extend_schema, inline_serializer
 from rest_framework import serializers
 from rest_framework.decorators import action
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from authors.author_directory import AuthorDirectory
 from authors.models.author import Author
 from authors.permissions import NodeIsAuthenticated
 from authors.serializers.author_serializer import AuthorSerializer, AuthorSerializerList
+from common.async_view import AsyncViewMixin
 from common.base_util import BaseUtil
+from common.conditional_helper import ConditionalHelper
+from common.pooled_postgresql.base import ConnectionPools
+from common.response_cache import ResponseCache
 from common.pagination_helper import PaginationHelper
 from mysocial.settings import base
+from remote_nodes.remote_client import RemoteCallMetrics
 from remote_nodes.remote_util import RemoteUtil
 
 logger = logging.getLogger(__name__)
@@ -26,7 +34,7 @@
 # Note: GenericViewSet allows more flexibility to specify which function a method should call
 # Check out author/urls.py about how we redirected get calls to retrieve and retrieve_all
 
-class AuthorView(GenericViewSet):
+class AuthorView(AsyncViewMixin, GenericViewSet):
     # removes the extra outer array enveloping the real request return structure
     pagination_class = None
     serializer_class = AuthorSerializer
@@ -47,7 +55,7 @@ def get_queryset(self):
               ]
     )
     @action(detail=True, methods=['get'], url_name='retrieve_all')
-    def retrieve_all(request: Request):
+    async def retrieve_all(request: Request):
         """
         Gets all authors (remote or local)
 
@@ -57,11 +65,56 @@ def retrieve_all(request: Request):
         """
         node_target, other_params = RemoteUtil.extract_node_target(request)
         if node_target is not None:
-            return AuthorView.retrieve_all_remote(request, node_target, other_params)
+            return await AuthorView.retrieve_all_remote(request, node_target, other_params)
 
         # lazy query set serialization so it's fine if this goes first
         # todo(turnip): only allow superusers because this kinda seems bad access?
         authors = Author.get_all_authors()
+
+        # recursively find an author if this is a user
+        should_do_recursively = request.user.is_authenticated and request.user.is_authenticated_user
+        if not should_do_recursively:
+            # only local authors are returned so our own rows are the only validators
+            return await sync_to_async(ResponseCache.get_or_render)(
+                request,
+                ResponseCache.AUTHORS,
+                lambda: ConditionalHelper.respond(request, [authors],
+                                                  lambda: AuthorView.build_retrieve_all_response(request, authors))
+            )
+
+        async def build_response():
+            remote_author_jsons = await AuthorView.get_remote_author_jsons(request)
+            return await sync_to_async(AuthorView.build_retrieve_all_response)(request, authors, remote_author_jsons)
+
+        # remote authors are only refreshed once the cached entry expires
+        return await ResponseCache.aget_or_render(request, ResponseCache.AUTHORS, build_response)
+
+    @staticmethod
+    async def get_remote_author_jsons(request: Request) -> list:
+        """
+        Every connected node's authors, from the AuthorDirectory copy; nodes without a fresh copy are asked at the same
+        time. Returns one list of author jsons per node
+        """
+        nodes = list(BaseUtil.connected_nodes)
+        # only the requested page of each node, like the live ones send
+        directory_jsons = await sync_to_async(AuthorDirectory.get_author_jsons)([node.domain for node in nodes],
+                                                                                request.query_params)
+        live_nodes = [node for node in nodes if node.domain not in directory_jsons]
+        # todo: for team 14
+        results = await asyncio.gather(*[node.aget_all_author_jsons(request.query_params) for node in live_nodes])
+        live_jsons = dict(zip([node.domain for node in live_nodes], results))
+
+        remote_author_jsons = []
+        for node in nodes:
+            author_jsons = directory_jsons.get(node.domain, live_jsons.get(node.domain))
+            if author_jsons is None:
+                logger.warning(f'AuthorsView: cannot connect: {node.domain}')
+            else:
+                remote_author_jsons.append(author_jsons)
+        return remote_author_jsons
+
+    @staticmethod
+    def build_retrieve_all_response(request: Request, authors, remote_author_jsons=()) -> HttpResponse:
         serializer = AuthorSerializer(
             authors,
             many=True,
@@ -71,21 +124,13 @@ def retrieve_all(request: Request):
         data = serializer.data
 
         # look at everyone else
-        # recursively find an author if this is a user
-        should_do_recursively = request.user.is_authenticated and request.user.is_authenticated_user
-        if should_do_recursively:
-            for node in BaseUtil.connected_nodes:
-                # todo: for team 14
-                author_jsons = node.get_all_author_jsons(request.query_params)
-                if author_jsons is None:
-                    print(f'AuthorsView: cannot connect: {node.domain}')
-                else:
-                    data += author_jsons
+        for author_jsons in remote_author_jsons:
+            data += author_jsons
 
         data, err = PaginationHelper.paginate_serialized_data(request, data)
 
         if err is not None:
-            logger.info("AuthorView: _get_all_authors:", err)
+            logger.warning(f"AuthorView: _get_all_authors: {err}")
             return HttpResponseNotFound()
 
         return Response({
@@ -94,7 +139,7 @@ def retrieve_all(request: Request):
         })
 
     @staticmethod
-    def retrieve_all_remote(request: Request, node_param: str, params: dict):
+    async def retrieve_all_remote(request: Request, node_param: str, params: dict):
         """Gets all authors in another node
         :param node_param: node domain
         :param request: http request
@@ -103,7 +148,7 @@ def retrieve_all_remote(request: Request, node_param: str, params: dict):
         node_config = base.REMOTE_CONFIG.get(node_param)
         if node_config is None:
             return HttpResponseNotFound()
-        return node_config.get_all_authors_request(params)
+        return await node_config.aget_all_authors_request(params)
 
     @staticmethod
     @extend_schema(
@@ -137,12 +182,18 @@ def retrieve(request: Request, author_id: str) -> HttpResponse:
             author = Author.get_author(official_id=author_id, should_do_recursively=should_do_recursively)
         except Author.DoesNotExist:
             return HttpResponseNotFound()
-        serializer = AuthorSerializer(
-            author,
-            context={
-                "host": request.get_host()
-            })
-        return Response(serializer.data)
+
+        def build_response():
+            serializer = AuthorSerializer(
+                author,
+                context={
+                    "host": request.get_host()
+                })
+            return Response(serializer.data)
+
+        if author is not None and author.is_local() and author.updated_at is not None:
+            return ConditionalHelper.respond_for_instances(request, [author], build_response)
+        return build_response()
 
     @staticmethod
     def retrieve_author(request: Request, node_param: str, author_id: str):
@@ -195,7 +246,7 @@ def update_profile(request: Request, author_id: str) -> HttpResponse:
             author_dict[AuthorSerializer.SPECIAL_SHOULD_TRUST_LOCAL_TAG] = True
             author_deserializer = AuthorSerializer(data=author_dict)
             if not author_deserializer.is_valid():
-                print(f'AuthorSerializer: put: {str(author_deserializer.errors)}')
+                logger.warning(f'AuthorSerializer: put: {str(author_deserializer.errors)}')
                 return HttpResponseBadRequest(str(author_deserializer.errors))
             serializer = AuthorSerializer(author_deserializer.validated_data)
             return Response(serializer.data)
@@ -255,3 +306,27 @@ def get(request) -> HttpResponse:
             'type': 'remoteNode',
             'message': 'Authentication passed!'
         })
+
+
+class RemoteNodeMetricsView(GenericAPIView):
+    """
+    Aggregates of our outbound calls to other nodes in the Prometheus text format; admins only.
+
+    Use this to find which node makes our pages slow, e.g. sort remote_request_duration_seconds_sum by node. If the
+    database goes through common.pooled_postgresql, the state of its pool is included too.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        return None
+
+    @staticmethod
+    @extend_schema(
+        tags=["remote debug"],
+        summary="Outbound remote call and database pool metrics",
+        responses={(200, 'text/plain'): str},
+    )
+    def get(request) -> HttpResponse:
+        metrics = RemoteCallMetrics.render_prometheus() + ConnectionPools.render_prometheus()
+        return HttpResponse(metrics, content_type='text/plain; version=0.0.4')
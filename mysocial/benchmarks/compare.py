@@ -0,0 +1,49 @@
+"""
+Compares two benchmark result files written by benchmarks/test_endpoints.py.
+
+To run:
+    python benchmarks/compare.py before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ('p50_ms', 'p95_ms', 'queries', 'http_calls')
+
+
+def load(path: str) -> dict:
+    with open(path) as result_file:
+        return json.load(result_file)
+
+
+def format_change(before, after) -> str:
+    if before is None or after is None:
+        return f'{before} -> {after}'
+    if before == 0:
+        return f'{before} -> {after}'
+    change = (after - before) / before * 100
+    return f'{before} -> {after} ({change:+.0f}%)'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares two benchmark result files')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+
+    before = load(args.before)
+    after = load(args.after)
+    print(f"before: {before.get('commit')} {before.get('params')}")
+    print(f"after:  {after.get('commit')} {after.get('params')}")
+    if before.get('params') != after.get('params'):
+        print('warning: the runs were seeded with different sizes')
+
+    for endpoint in sorted(set(before['endpoints']) | set(after['endpoints'])):
+        print(endpoint)
+        old = before['endpoints'].get(endpoint, {})
+        new = after['endpoints'].get(endpoint, {})
+        for metric in METRICS:
+            print(f'  {metric:>10}: {format_change(old.get(metric), new.get(metric))}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import datetime
+import os
+import random
+import uuid
+
+from django.utils import timezone
+
+from authors.models.author import Author
+from authors.serializers.author_serializer import AuthorSerializer
+from comment.models import Comment
+from common.fast_json import FastJSON
+from follow.models import Follow
+from inbox.models import Inbox, InboxItem, ItemType
+from post.models import Post, Visibility
+from post.serializer import PostSerializer
+
+# ids of the stubbed peer's authors are derived from this so every run sees the same remote data
+REMOTE_AUTHOR_NAMESPACE = uuid.UUID('6f0c6e43-4f3a-4c8e-9a53-0c3b2b1f1a10')
+
+
+class BenchmarkSeed:
+    """
+    Seeds a deterministic data set for the benchmarks.
+
+    Sizes are read from the environment so runs can be compared across commits:
+        BENCHMARK_AUTHORS (N), BENCHMARK_POSTS (M), BENCHMARK_FOLLOWS (K), BENCHMARK_COMMENTS,
+        BENCHMARK_REMOTE_AUTHORS, BENCHMARK_INBOX_ITEMS
+    """
+
+    def __init__(self):
+        self.author_count = BenchmarkSeed.get_size('BENCHMARK_AUTHORS', 50)
+        self.post_count = BenchmarkSeed.get_size('BENCHMARK_POSTS', 200)
+        self.follow_count = BenchmarkSeed.get_size('BENCHMARK_FOLLOWS', 200)
+        self.comment_count = BenchmarkSeed.get_size('BENCHMARK_COMMENTS', 200)
+        self.remote_author_count = BenchmarkSeed.get_size('BENCHMARK_REMOTE_AUTHORS', 20)
+        self.inbox_item_count = BenchmarkSeed.get_size('BENCHMARK_INBOX_ITEMS', 100)
+
+        self.authors: list = []
+        self.posts: list = []
+        self.remote_author_ids: list = [
+            str(uuid.uuid5(REMOTE_AUTHOR_NAMESPACE, str(i))) for i in range(self.remote_author_count)
+        ]
+
+    @staticmethod
+    def get_size(key: str, default: int) -> int:
+        return int(os.environ.get(key, default))
+
+    def get_params(self) -> dict:
+        return {
+            'authors': self.author_count,
+            'posts': self.post_count,
+            'follows': self.follow_count,
+            'comments': self.comment_count,
+            'remote_authors': self.remote_author_count,
+            'inbox_items': self.inbox_item_count,
+        }
+
+    def seed(self, remote_base_url: str):
+        """
+        Creates local authors with inboxes, their posts and comments, and follows between local authors and between
+        local and remote authors. Bulk inserts skip signals on purpose; nothing here depends on them.
+        """
+        rng = random.Random(404)
+        now = timezone.now()
+
+        self.authors = Author.objects.bulk_create([
+            Author(username=f'bench{i}', display_name=f'Bench {i}', password='!') for i in range(self.author_count)
+        ])
+        Inbox.objects.bulk_create([Inbox(author=author) for author in self.authors])
+
+        self.posts = Post.objects.bulk_create([
+            Post(
+                author=self.authors[i % self.author_count],
+                title=f'post {i}',
+                description='benchmark post',
+                content='lorem ipsum ' * 20,
+                categories=['benchmark'],
+                visibility=Visibility.PUBLIC if i % 4 else Visibility.FRIENDS,
+                published=now - datetime.timedelta(minutes=i),
+            ) for i in range(self.post_count)
+        ])
+
+        author_jsons = [AuthorSerializer(author).data for author in self.authors]
+        Comment.objects.bulk_create([
+            Comment(
+                post=self.posts[rng.randrange(self.post_count)],
+                author=author_jsons[rng.randrange(self.author_count)],
+                comment=f'comment {i}',
+            ) for i in range(self.comment_count)
+        ])
+
+        local_urls = [author.get_url() for author in self.authors]
+        remote_urls = [f'{remote_base_url}/authors/{author_id}' for author_id in self.remote_author_ids]
+        pairs = set()
+        while len(pairs) < self.follow_count:
+            actor = rng.choice(local_urls)
+            # a quarter of follows cross to the stubbed peer, half of those in each direction
+            if remote_urls and rng.random() < 0.25:
+                remote = rng.choice(remote_urls)
+                pair = (actor, remote) if rng.random() < 0.5 else (remote, actor)
+            else:
+                pair = (actor, rng.choice(local_urls))
+            if pair[0] != pair[1]:
+                pairs.add(pair)
+        Follow.objects.bulk_create([Follow(actor=actor, target=target, has_accepted=True) for actor, target in pairs])
+
+        inbox = Inbox.objects.get(author=self.authors[0])
+        post_jsons = [(post, FastJSON.loads(FastJSON.dumps(PostSerializer(post).data)))
+                      for post in self.posts[:self.inbox_item_count]]
+        InboxItem.objects.bulk_create([
+            InboxItem(inbox=inbox, type=ItemType.POST, data=data, received=post.published,
+                      dedupe_key=InboxItem.get_dedupe_key(data))
+            for post, data in post_jsons
+        ])
@@ -0,0 +1,127 @@
+import re
+from collections import Counter
+from urllib.parse import parse_qs
+
+from httmock import HTTMock, response
+
+from common.base_util import BaseUtil
+from common.fast_json import FastJSON
+from common.test_helper import TestHelper
+from mysocial.settings import base
+from remote_nodes.local_mirror import LocalMirror
+
+AUTHOR_PATH = re.compile(r'^/authors/(?P<author_id>[^/]+)/?$')
+AUTHOR_POSTS_PATH = re.compile(r'^/authors/(?P<author_id>[^/]+)/posts/?$')
+INBOX_PATH = re.compile(r'^/authors/(?P<author_id>[^/]+)/inbox/?$')
+
+
+class StubPeer:
+    """
+    Stands in for the LocalMirror node on 127.0.0.1:8080 so benchmarks need a single server and no network.
+
+    Answers the endpoints our node configs call with canned data and counts every request it receives, so the
+    benchmarks can report outbound HTTP calls per endpoint.
+
+    Example how to use::
+
+        peer = StubPeer(remote_author_ids)
+        peer.register()
+        with peer.mock():
+            ...
+        peer.unregister()
+    """
+    POSTS_PER_AUTHOR = 3
+
+    def __init__(self, remote_author_ids: list):
+        self.domain = LocalMirror.domain
+        self.remote_author_ids = remote_author_ids
+        self.calls = Counter()
+
+    def get_base_url(self) -> str:
+        return f'{BaseUtil.get_http_or_https()}{self.domain}'
+
+    def register(self):
+        """Adds the peer to REMOTE_CONFIG like RemoteUtil.setup does outside tests; needs the database seeded"""
+        # RemoteUtil.setup may have made the node already, when the urls were loaded
+        TestHelper.overwrite_node(LocalMirror.username, LocalMirror.username, LocalMirror.username,
+                                  LocalMirror.username, self.domain)
+        base.REMOTE_CONFIG.update(LocalMirror.create_dictionary_entry())
+        BaseUtil.connected_nodes.append(base.REMOTE_CONFIG[self.domain])
+
+    def unregister(self):
+        node_config = base.REMOTE_CONFIG.pop(self.domain, None)
+        if node_config in BaseUtil.connected_nodes:
+            BaseUtil.connected_nodes.remove(node_config)
+
+    def mock(self) -> HTTMock:
+        return HTTMock(self.handle)
+
+    def get_call_count(self) -> int:
+        return sum(self.calls.values())
+
+    def get_author_json(self, author_id: str) -> dict:
+        return {
+            'type': 'author',
+            'id': author_id,
+            'url': f'{self.get_base_url()}/authors/{author_id}',
+            'host': self.domain,
+            'displayName': f'remote {author_id[:8]}',
+            'github': '',
+            'profileImage': '',
+        }
+
+    def get_post_json(self, author_id: str, index: int) -> dict:
+        author_url = f'{self.get_base_url()}/authors/{author_id}'
+        return {
+            'type': 'post',
+            'id': f'{author_url}/posts/{index}',
+            'title': f'remote post {index}',
+            'description': 'benchmark post',
+            'content': 'lorem ipsum',
+            'contentType': 'text/plain',
+            'author': self.get_author_json(author_id),
+            'categories': [],
+            'count': 0,
+            'comments': f'{author_url}/posts/{index}/comments',
+            'published': '2022-11-17T21:07:41Z',
+            'visibility': 'public',
+            'unlisted': False,
+        }
+
+    def handle(self, url, request):
+        if url.netloc != self.domain:
+            # let anything else fail loudly instead of reaching the network
+            return response(502, b'', request=request)
+
+        self.calls[f'{request.method} {url.path}'] += 1
+
+        if request.method == 'GET' and url.path.rstrip('/') == '/authors':
+            items = [self.get_author_json(author_id) for author_id in self.remote_author_ids]
+            query = parse_qs(url.query)
+            if 'page' in query and 'size' in query:
+                size = int(query['size'][0])
+                start = (int(query['page'][0]) - 1) * size
+                items = items[start:start + size]
+            return self.respond(request, {'type': 'authors', 'items': items})
+
+        match = AUTHOR_PATH.match(url.path)
+        if request.method == 'GET' and match:
+            return self.respond(request, self.get_author_json(match.group('author_id')))
+
+        match = AUTHOR_POSTS_PATH.match(url.path)
+        if request.method == 'GET' and match:
+            items = [self.get_post_json(match.group('author_id'), i) for i in range(StubPeer.POSTS_PER_AUTHOR)]
+            return self.respond(request, {'type': 'posts', 'items': items})
+
+        if request.method == 'POST' and INBOX_PATH.match(url.path):
+            return self.respond(request, {'type': 'inbox'}, 201)
+
+        if request.method == 'POST' and url.path == '/inbox/bulk':
+            items = [{'author': entry['author'], 'status': 200} for entry in FastJSON.loads(request.body)['items']]
+            return self.respond(request, {'type': 'inbox-bulk', 'items': items})
+
+        return response(404, b'', request=request)
+
+    @staticmethod
+    def respond(request, data, status_code: int = 200):
+        return response(status_code, FastJSON.dumps(data), {'content-type': 'application/json'}, request=request)
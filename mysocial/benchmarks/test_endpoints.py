@@ -0,0 +1,150 @@
+import datetime
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from benchmarks.seed import BenchmarkSeed
+from benchmarks.stub_peer import StubPeer
+from post.serializer import PostSerializer
+
+logger = logging.getLogger(__name__)
+
+# run with `manage.py test benchmarks.test_endpoints`: the label benchmarks alone isn't found by the test runner
+LABEL = 'benchmarks.test_endpoints'
+
+
+@skipUnless(any(arg.startswith(LABEL) for arg in sys.argv), 'benchmarks only run when asked for')
+class BenchmarkEndpoints(APITestCase):
+    """
+    Latency, query count and outbound HTTP count of the federation-heavy endpoints.
+
+    We play LocalDefault on 127.0.0.1:8000; the LocalMirror peer on 127.0.0.1:8080 is a StubPeer. Results are written
+    as JSON to BENCHMARK_OUTPUT (default: benchmark-results.json in the temp directory) once every endpoint ran.
+
+    To run, from manage.py's directory:
+        python manage.py test benchmarks.test_endpoints --settings mysocial.settings.local
+
+    Compare two runs with:
+        python benchmarks/compare.py before.json after.json
+
+    See docs/benchmarks.md.
+    """
+    # class level on purpose: attributes set in setUpTestData are copied for every test
+    results: dict = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.iterations = BenchmarkSeed.get_size('BENCHMARK_ITERATIONS', 20)
+        cls.seed = BenchmarkSeed()
+        cls.peer = StubPeer(cls.seed.remote_author_ids)
+        cls.peer.register()
+        cls.seed.seed(cls.peer.get_base_url())
+        cls.user = cls.seed.authors[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.peer.unregister()
+        cls.write_results()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.client.force_login(self.user)
+        mock = self.peer.mock()
+        mock.__enter__()
+        self.addCleanup(mock.__exit__, None, None, None)
+
+    def test_authors(self):
+        self.measure('authors', lambda: self.client.get('/authors/'))
+
+    def test_public_posts(self):
+        self.measure('public_posts', lambda: self.client.get('/posts/public/'))
+
+    def test_following_feed(self):
+        self.measure('following_feed', lambda: self.client.get(f'/authors/{self.user.official_id}/following/posts/'))
+
+    def test_inbox_get(self):
+        self.measure('inbox_get', lambda: self.client.get(f'/authors/{self.user.official_id}/inbox'))
+
+    def test_inbox_post(self):
+        target = self.seed.authors[1]
+        payload = PostSerializer(self.seed.posts[0]).data
+        self.measure('inbox_post',
+                     lambda: self.client.post(f'/authors/{target.official_id}/inbox', payload, format='json'))
+
+    def test_followers(self):
+        self.measure('followers', lambda: self.client.get(f'/authors/{self.user.official_id}/followers/'))
+
+    def test_real_friends(self):
+        self.measure('real_friends', lambda: self.client.get(f'/authors/{self.user.official_id}/real-friends/'))
+
+    def measure(self, name: str, send_request):
+        """
+        Sends the request once to warm up, then iterations times. The response cache is cleared before every request
+        so we measure the work behind the endpoint, not the cache.
+        """
+        cache.clear()
+        send_request()
+
+        latencies = []
+        query_counts = []
+        http_counts = []
+        status_codes = set()
+        for _ in range(self.iterations):
+            cache.clear()
+            calls_before = self.peer.get_call_count()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = send_request()
+                latencies.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+            http_counts.append(self.peer.get_call_count() - calls_before)
+            status_codes.add(response.status_code)
+
+        BenchmarkEndpoints.results[name] = {
+            'p50_ms': round(BenchmarkEndpoints.percentile(latencies, 50), 3),
+            'p95_ms': round(BenchmarkEndpoints.percentile(latencies, 95), 3),
+            'mean_ms': round(statistics.mean(latencies), 3),
+            'queries': statistics.median(query_counts),
+            'max_queries': max(query_counts),
+            'http_calls': statistics.median(http_counts),
+            'status_codes': sorted(status_codes),
+        }
+        self.assertTrue(all(code < 500 for code in status_codes), f'{name} failed with {status_codes}')
+
+    @staticmethod
+    def percentile(values: list, percent: int) -> float:
+        """Nearest-rank percentile"""
+        ordered = sorted(values)
+        rank = max(0, -(-percent * len(ordered) // 100) - 1)
+        return ordered[rank]
+
+    @classmethod
+    def write_results(cls):
+        output_path = os.environ.get('BENCHMARK_OUTPUT',
+                                     os.path.join(tempfile.gettempdir(), 'benchmark-results.json'))
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                    check=True).stdout.strip()
+        except Exception:
+            commit = None
+
+        with open(output_path, 'w') as output:
+            json.dump({
+                'commit': commit,
+                'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'iterations': cls.iterations,
+                'params': cls.seed.get_params(),
+                'endpoints': BenchmarkEndpoints.results,
+            }, output, indent=2, sort_keys=True)
+        logger.info(f'Benchmark results written to {output_path}')
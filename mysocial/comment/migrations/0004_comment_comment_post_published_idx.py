@@ -0,0 +1,18 @@
+# Generated by Django 4.1.2 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0006_alter_post_title'),
+        ('comment', '0003_alter_comment_author'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', '-published', '-official_id'], name='comment_post_published_idx'),
+        ),
+    ]
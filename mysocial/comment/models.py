@@ -14,6 +14,14 @@ class Comment(models.Model):
     contentType = models.CharField(choices=ContentType.choices, default = ContentType.PLAIN, max_length = 20)
     official_id = models.UUIDField(primary_key=True, default= uuid.uuid4, editable=False)
     published = models.DateTimeField(default=datetime.now)
+    # row version for conditional GETs; see ConditionalHelper
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # comment threads are listed newest first per post; see CommentView.get
+            models.Index(fields=['post', '-published', '-official_id'], name='comment_post_published_idx'),
+        ]
 
     def get_id(self) -> str:
         return str(self.official_id)
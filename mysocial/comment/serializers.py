@@ -1,3 +1,4 @@
+import logging
 from rest_framework import serializers
 from post.serializer import PostSerializer 
 from .models import Comment, ContentType
@@ -12,6 +13,8 @@
 from post.models import Post
 from authors.serializers.author_serializer import AuthorSerializer
 
+logger = logging.getLogger(__name__)
+
 COMMENT_SERIALIZER_EXAMPLE = {
         "type": "comment",
         "author": {
@@ -74,7 +77,7 @@ def to_internal_value(self, data: dict) -> Comment:
                 comment = Comment()
                 node_config = base.REMOTE_CONFIG.get(host)
                 if node_config is None:
-                    print(f"CommentSerializer: Host not found: {host}")
+                    logger.warning(f"CommentSerializer: Host not found: {host}")
                     return serializers.ValidationError(f"CommentSerializer: Host not found: {host}")
 
                 comment_remote_fields: dict = node_config.comment_remote_fields
@@ -89,7 +92,7 @@ def to_internal_value(self, data: dict) -> Comment:
                         setattr(comment, local_field, data[remote_field])
 
         except Exception as e:
-            print(f"CommentSerializer: failed serializing {e}")
+            logger.warning(f"CommentSerializer: failed serializing {e}")
             raise serializers.ValidationError(f"CommentSerializer: failed serializing {e}")
 
         post = Post.objects.first()
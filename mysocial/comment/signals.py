@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from comment.models import Comment
+from common.response_cache import ResponseCache
+from post.models import Post
+
+
+@receiver([post_save, post_delete], sender = Comment)
+def invalidate_comment_responses(sender, instance, **kwargs):
+    # posts are served with their comments and comment count
+    ResponseCache.invalidate(ResponseCache.PUBLIC_POSTS)
+    if Comment.post.is_cached(instance):
+        author_id = instance.post.author_id
+    else:
+        # only the author is needed, not the whole post
+        author_id = Post.objects.filter(pk = instance.post_id).values_list('author_id', flat = True).first()
+    if author_id is not None:
+        # None when the post is gone already; its own signal invalidated the author's posts
+        ResponseCache.invalidate(ResponseCache.AUTHOR_POSTS, str(author_id))
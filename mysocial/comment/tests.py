@@ -3,9 +3,12 @@
 from post.models import Post
 from common.test_helper import TestHelper
 from authors.models.author import Author
+from comment.models import Comment
 from django.utils import timezone
 import logging
 import datetime
+from unittest import mock
+from common.response_cache import ResponseCache
 
 logger = logging.getLogger("mylogger")
 
@@ -56,7 +59,48 @@ def test_get_comment_on_post(self):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(len(response.data["items"]), 1)
 
+    # get comments on a post page by page using the next cursor
+    def test_get_comments_keyset_pagination(self):
+        self.client.force_login(self.author1)
+        request = f"/authors/{self.author1.get_id()}/posts/{self.author1_post.official_id}/comments"
+        for index in range(3):
+            Comment.objects.create(author = {}, comment = f"comment {index}", post = self.author1_post,
+                                   published = timezone.now() + datetime.timedelta(minutes = index))
+
+        response = self.client.get(f"{request}?size=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["comment"] for item in response.data["items"]], ["comment 2", "comment 1"])
+
+        response = self.client.get(f"{request}?size=2&after={response.data['next']}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["comment"] for item in response.data["items"]], ["comment 0"])
+        self.assertNotIn("next", response.data)
+
+    # poll only for comments newer than the given timestamp
+    def test_get_comments_since(self):
+        self.client.force_login(self.author1)
+        request = f"/authors/{self.author1.get_id()}/posts/{self.author1_post.official_id}/comments"
+        now = timezone.now()
+        Comment.objects.create(author = {}, comment = "old", post = self.author1_post,
+                               published = now - datetime.timedelta(hours = 1))
+        Comment.objects.create(author = {}, comment = "new", post = self.author1_post, published = now)
+
+        since = (now - datetime.timedelta(minutes = 1)).isoformat()
+        response = self.client.get(request, {"since": since})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["comment"] for item in response.data["items"]], ["new"])
 
+        response = self.client.get(request, {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    # saving a comment invalidates its post's author's posts without loading the post
+    def test_comment_save_invalidates_author_posts(self):
+        comment = Comment.objects.create(author = {}, comment = "first", post = self.author2_post)
+        comment = Comment.objects.get(pk = comment.pk)
 
+        with mock.patch.object(ResponseCache, 'invalidate') as invalidate:
+            comment.save()
 
+        invalidate.assert_any_call(ResponseCache.AUTHOR_POSTS, str(self.author2.official_id))
+        self.assertFalse(Comment.post.is_cached(comment))
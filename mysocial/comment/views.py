@@ -1,6 +1,6 @@
 
 from django.http.response import HttpResponse, HttpResponseNotFound
-from drf_spectacular.utils import extend_schema, inline_serializer
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
 from rest_framework.decorators import action
 from rest_framework import serializers
 from rest_framework.generics import GenericAPIView
@@ -15,12 +15,13 @@
 from rest_framework import status
 import logging
 
+from common.conditional_helper import ConditionalHelper
 from common.pagination_helper import PaginationHelper
 from mysocial.settings import base
 from remote_nodes.remote_util import RemoteUtil
 import json
 
-logger = logging.getLogger("mylogger")
+logger = logging.getLogger(__name__)
 class CommentView(GenericAPIView):
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -32,6 +33,11 @@ def get_queryset(self):
         return Comment.objects.all()
 
     @extend_schema(
+        parameters=PaginationHelper.KEYSET_OPEN_API_PARAMETERS + [
+            OpenApiParameter(name='since', location=OpenApiParameter.QUERY,
+                             description='Optional ISO 8601 timestamp. Only returns comments published after it.',
+                             required=False, type=str),
+        ],
         responses=CommentSerializerList,
         summary="comment_get_comments_on_post",
         tags=["comment", RemoteUtil.REMOTE_IMPLEMENTED_TAG, RemoteUtil.TEAM7_CONNECTED, RemoteUtil.TEAM12_CONNECTED, RemoteUtil.TEAM14_CONNECTED]
@@ -39,58 +45,63 @@ def get_queryset(self):
     @action(detail=True, methods=['get'], url_name='comment_get_comments_on_post')
     def get(self, request: Request, *args, **kwargs) -> HttpResponse:
         '''
-        Get a paginated list of comments for a post
+        Get a paginated list of comments for a post, newest first
+
+        Pass the "next" cursor of a response as after to get the next page, or pass since to only get new comments.
         '''
         node: Author = request.user
         if not node.is_authenticated:
             return HttpResponseNotFound()
 
+        # the post and its local author in one query; most comment threads we serve are our own
+        post = Post.objects.select_related('author').filter(
+            official_id=kwargs['post_id'],
+            author__official_id=kwargs['author_id'],
+            author__node_detail__isnull=True
+        ).first()
+
+        if post is not None:
+            return self.get_local_comments(request, post)
+
         if node.is_authenticated_user:
             try:
                 target_author = Author.get_author(kwargs['author_id'])
             except:
                 return Response(f"Error getting author id: {kwargs['author_id']}", status.HTTP_400_BAD_REQUEST)
 
-            #local -> local
-            if target_author.is_local():
-                try:
-                    post = Post.objects.get(official_id=kwargs['post_id'])
-                    comments = Comment.objects.filter(post = post)
-                    serializer = CommentSerializer(comments, many = True)
-                    data = serializer.data
-                    data, err = PaginationHelper.paginate_serialized_data(request, data)
-
-                    if err is not None:
-                        return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
-                    else:
-                        return Response({'type': 'comments', 'items': data})
-
-                except Exception as e:
-                    logger.info(e)
-                    return HttpResponseNotFound
-
             # local -> remote
-            else:
+            if target_author is not None and not target_author.is_local():
                 node_config = base.REMOTE_CONFIG.get(target_author.host)
                 return node_config.get_comments_for_post(request.get_full_path(), author = target_author, request = request)
 
-        # remote -> local
-        if request.user.is_authenticated_node:
-            try:
-                post = Post.objects.get(official_id=kwargs['post_id'])
-                comments = Comment.objects.filter(post = post)
-                serializer = CommentSerializer(comments, many = True)
-                data = serializer.data
-                data, err = PaginationHelper.paginate_serialized_data(request, data)
-
-                if err is not None:
-                    return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
-                else:
-                    return Response({'type': 'comments', 'items': data})
+        return HttpResponseNotFound()
+
+    def get_local_comments(self, request: Request, post: Post) -> HttpResponse:
+        since, err = PaginationHelper.parse_since(request)
+        if err is not None:
+            return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
+
+        comments = Comment.objects.filter(post = post)
+        if since is not None:
+            comments = comments.filter(published__gt = since)
+        comments = comments.order_by('-published', '-official_id')
+
+        def build_response():
+            page, next_cursor, err = PaginationHelper.paginate_queryset(request, comments)
+            if err is not None:
+                return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
+
+            # every comment belongs to the post we already fetched; skip the per-comment post and author lookups
+            page = list(page)
+            for comment in page:
+                comment.post = post
+
+            data = {'type': 'comments', 'items': CommentSerializer(page, many = True).data}
+            if next_cursor is not None:
+                data['next'] = next_cursor
+            return Response(data)
 
-            except Exception as e:
-                logger.info(e)
-                return HttpResponseNotFound
+        return ConditionalHelper.respond(request, [comments], build_response)
 
     @extend_schema(
             summary = "comment_create_comment",
@@ -0,0 +1,57 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.utils.decorators import classonlymethod
+
+
+class AsyncViewMixin:
+    """
+    Lets a DRF view (APIView, GenericAPIView or GenericViewSet) have `async def` handlers.
+
+    Put it first, e.g. `class FollowingPostView(AsyncViewMixin, GenericAPIView)`. Handlers can then await remote calls
+    (see the `a` methods of NodeConfigBase) and gather them, so under ASGI one worker serves many requests that wait
+    on other nodes. Handlers that stay sync, and DRF's authentication, permission and throttle checks, run in a thread.
+
+    Database access from an async handler has to go through sync_to_async.
+    """
+    # read by Django's View.as_view; also lets a view mix sync and async handlers
+    view_is_async = True
+
+    @classonlymethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        # DRF wraps the view in csrf_exempt and ViewSets skip Django's as_view, so mark it ourselves, like Django does
+        view._is_coroutine = asyncio.coroutines._is_coroutine
+        return view
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # is_authenticated_user and is_node read the author's node details; load them while we're in a thread
+        getattr(request.user, 'node_detail', None)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Same as APIView.dispatch, but awaits the handler"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,123 @@
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from typing import Callable, Iterable, Optional
+
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.request import Request
+
+
+class ConditionalHelper:
+    """
+    Conditional GET support (ETag and Last-Modified) for our read endpoints.
+
+    Validators are computed from the updated_at column of every table a response is built from, so a poll that would
+    return an identical payload is answered with a 304 before we serialize anything.
+
+    Example how to use::
+
+        return ConditionalHelper.respond(
+            request,
+            [Post.objects.filter(author=author), Comment.objects.filter(post__author=author)],
+            lambda: Response(PostSerializer(posts, many=True).data)
+        )
+    """
+
+    @staticmethod
+    def get_validators(request: Request, querysets: Iterable[QuerySet],
+                       field: str = 'updated_at') -> (str, Optional[datetime]):
+        """
+        Computes a weak ETag and the Last-Modified timestamp for the rows behind a response.
+
+        Row counts are part of the ETag so deletions change it too. The caller's class and the full path are mixed in
+        because the same rows can be represented differently, e.g. nodes also see unlisted posts.
+        """
+        versions = []
+        for queryset in querysets:
+            aggregate = queryset.order_by().aggregate(count=Count('pk'), last_modified=Max(field))
+            versions.append((aggregate['count'], aggregate['last_modified']))
+        return ConditionalHelper._make_validators(request, versions)
+
+    @staticmethod
+    def get_instance_validators(request: Request, instances: Iterable,
+                                field: str = 'updated_at') -> (str, Optional[datetime]):
+        """Same as get_validators but for model objects we already fetched; costs no queries"""
+        return ConditionalHelper._make_validators(request, [(1, getattr(instance, field)) for instance in instances])
+
+    @staticmethod
+    def get_not_modified_response(request: Request, etag: str,
+                                  last_modified: Optional[datetime]) -> Optional[HttpResponse]:
+        """Returns a 304 (or 412) response if the client's copy is still valid, otherwise None"""
+        return get_conditional_response(request,
+                                        etag=etag,
+                                        last_modified=ConditionalHelper._to_timestamp(last_modified))
+
+    @staticmethod
+    def set_validators(response: HttpResponse, etag: str, last_modified: Optional[datetime]) -> HttpResponse:
+        if 200 <= response.status_code < 300:
+            response.headers['ETag'] = quote_etag(etag)
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(ConditionalHelper._to_timestamp(last_modified))
+        return response
+
+    @staticmethod
+    def respond(request: Request, querysets: Iterable[QuerySet],
+                build_response: Callable[[], HttpResponse]) -> HttpResponse:
+        """
+        Returns a 304 if the client's validators still match, otherwise builds the response and attaches validators.
+
+        :param request: the incoming request; If-None-Match and If-Modified-Since are read from here
+        :param querysets: every queryset whose rows end up in the response
+        :param build_response: builds the full response; only called if the client's copy is stale
+        """
+        etag, last_modified = ConditionalHelper.get_validators(request, querysets)
+        return ConditionalHelper._respond(request, etag, last_modified, build_response)
+
+    @staticmethod
+    def respond_for_instances(request: Request, instances: Iterable,
+                              build_response: Callable[[], HttpResponse]) -> HttpResponse:
+        """Same as respond but for model objects we already fetched"""
+        etag, last_modified = ConditionalHelper.get_instance_validators(request, instances)
+        return ConditionalHelper._respond(request, etag, last_modified, build_response)
+
+    @staticmethod
+    def _respond(request: Request, etag: str, last_modified: Optional[datetime],
+                 build_response: Callable[[], HttpResponse]) -> HttpResponse:
+        not_modified = ConditionalHelper.get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return ConditionalHelper.set_validators(build_response(), etag, last_modified)
+
+    @staticmethod
+    def get_caller_class(request: Request) -> str:
+        user = request.user
+        if user is None or not user.is_authenticated:
+            return 'anonymous'
+        if user.is_authenticated_node:
+            return 'node'
+        return 'user'
+
+    @staticmethod
+    def _make_validators(request: Request, versions: list) -> (str, Optional[datetime]):
+        parts = [request.get_full_path(), ConditionalHelper.get_caller_class(request)]
+        last_modified = None
+
+        for count, version in versions:
+            parts.append(str(count))
+            parts.append(version.isoformat() if version is not None else '')
+            if version is not None and (last_modified is None or version > last_modified):
+                last_modified = version
+
+        digest = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+        return f'W/"{digest}"', last_modified
+
+    @staticmethod
+    def _to_timestamp(value: Optional[datetime]) -> Optional[int]:
+        if value is None:
+            return None
+        if not timezone.is_aware(value):
+            value = timezone.make_aware(value, dt_timezone.utc)
+        return int(value.timestamp())
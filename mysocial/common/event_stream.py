@@ -0,0 +1,115 @@
+import asyncio
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.http.response import HttpResponseBase
+from rest_framework.renderers import BaseRenderer
+
+from common.fast_json import FastJSON
+
+# the receive channel of the ASGI request being handled; see StreamingASGIHandler.handle
+_receive: ContextVar = ContextVar('asgi_receive', default=None)
+
+
+class EventStreamResponse(HttpResponseBase):
+    """
+    A Server-Sent Events response that streams from an async iterator of already formatted events.
+
+    Only StreamingASGIHandler can send it. Check request.supports_event_streams before returning one; under WSGI, send
+    what's there in a normal response and let the client reconnect (see the SSE retry field).
+    """
+    streaming = True
+
+    def __init__(self, events: AsyncIterator[str], *args, **kwargs):
+        kwargs.setdefault('content_type', 'text/event-stream')
+        super().__init__(*args, **kwargs)
+        self.events = events
+        self.headers['Cache-Control'] = 'no-cache'
+        # proxies like nginx would otherwise hold events back until they have a full buffer
+        self.headers['X-Accel-Buffering'] = 'no'
+
+    @staticmethod
+    def format_event(data: str, event_id=None, event: str = None) -> str:
+        lines = []
+        if event_id is not None:
+            lines.append(f'id: {event_id}')
+        if event is not None:
+            lines.append(f'event: {event}')
+        lines += [f'data: {line}' for line in data.split('\n')]
+        return '\n'.join(lines) + '\n\n'
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets a DRF view that returns EventStreamResponses accept `Accept: text/event-stream`, which is what browsers'
+    EventSource sends. Other responses of the view, e.g. errors, are sent as a single "error" event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return EventStreamResponse.format_event(FastJSON.dumps_str(data), event='error').encode('utf-8')
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    Django's ASGI handler, but it can also send EventStreamResponses.
+
+    Django 4.1 iterates streaming responses synchronously, which would block the event loop for as long as a stream is
+    open. An EventStreamResponse is iterated asynchronously instead, and stops once the client disconnects.
+    """
+
+    async def handle(self, scope, receive, send):
+        token = _receive.set(receive)
+        try:
+            await super().handle(scope, receive, send)
+        finally:
+            _receive.reset(token)
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.supports_event_streams = True
+        return request, error_response
+
+    async def send_response(self, response, send):
+        if not isinstance(response, EventStreamResponse):
+            return await super().send_response(response, send)
+
+        response_headers = [(header.encode('ascii'), value.encode('latin1')) for header, value in response.items()]
+        for cookie in response.cookies.values():
+            response_headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': response_headers})
+
+        # the body was read before the view ran, so all that's left to receive is the disconnect
+        disconnected = asyncio.ensure_future(StreamingASGIHandler.wait_for_disconnect(_receive.get()))
+        events = response.events.__aiter__()
+        try:
+            while not disconnected.done():
+                next_event = asyncio.ensure_future(events.__anext__())
+                await asyncio.wait([next_event, disconnected], return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    next_event.cancel()
+                    await asyncio.gather(next_event, return_exceptions=True)
+                    break
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    await send({'type': 'http.response.body'})
+                    break
+                await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+        finally:
+            disconnected.cancel()
+            if hasattr(events, 'aclose'):
+                await events.aclose()
+            await sync_to_async(response.close, thread_sensitive=True)()
+
+    @staticmethod
+    async def wait_for_disconnect(receive):
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
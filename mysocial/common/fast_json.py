@@ -0,0 +1,71 @@
+import json
+from typing import Any, Union
+
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    # the pure-Python fallback below handles the same types, just slower
+    orjson = None
+
+
+class FastJSON:
+    """
+    JSON encoding for hot paths: API responses, inbox items and payloads we send to other nodes.
+
+    Uses orjson when it is installed, which handles UUID and datetime natively and skips DRF's ReturnDict/OrderedDict
+    overhead. Without orjson, falls back to the standard json module with DRF's encoder, so both paths accept the same
+    objects (UUID, datetime, Decimal, lazy strings, ...).
+    """
+
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    @staticmethod
+    def dumps(data: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(data, default=FastJSON._default, option=FastJSON.ORJSON_OPTIONS)
+        return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def dumps_str(data: Any) -> str:
+        return FastJSON.dumps(data).decode('utf-8')
+
+    @staticmethod
+    def loads(raw: Union[bytes, str]) -> Any:
+        """Raises json.JSONDecodeError (or a subclass) on malformed input, same as json.loads"""
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+    @staticmethod
+    def _default(obj: Any) -> Any:
+        # whatever orjson can't handle natively, e.g. Decimal and lazy translation strings
+        return JSONEncoder().default(obj)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """Drop-in replacement for DRF's JSONRenderer; indented output (e.g. ?indent=4) still goes through DRF"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return FastJSON.dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return FastJSON.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
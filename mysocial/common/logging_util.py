@@ -0,0 +1,180 @@
+import asyncio
+import atexit
+import logging
+import queue
+import re
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+from common.fast_json import FastJSON
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# ids we accept from clients and other nodes; anything else is replaced so it can't pollute the logs
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+_request_id: ContextVar = ContextVar('request_id', default=None)
+
+# the extra= fields (and those our filters and Django's loggers add) that are logged; anything else, e.g. the request
+# django.request attaches, could carry a request body with passwords in it
+_LOGGED_FIELDS = ('request_id', 'suppressed', 'method', 'path', 'status', 'status_code', 'duration_ms', 'queries',
+                  'db_ms', 'duplicate_queries', 'http_calls', 'http_ms')
+
+
+class LoggingUtil:
+    @staticmethod
+    def get_request_id():
+        return _request_id.get()
+
+    @staticmethod
+    def set_request_id(request_id):
+        return _request_id.set(request_id)
+
+    @staticmethod
+    def reset_request_id(token):
+        _request_id.reset(token)
+
+    @staticmethod
+    def make_request_id(incoming=None) -> str:
+        if incoming and REQUEST_ID_PATTERN.match(incoming):
+            return incoming
+        return uuid.uuid4().hex
+
+
+class RequestIdMiddleware:
+    """
+    Tags every log line of a request with the same request id, and echoes it back in the X-Request-ID header.
+
+    If the caller (e.g. another node) sent an X-Request-ID we reuse it, so one request can be followed across nodes.
+    RemoteClient forwards the id on our outbound calls.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # tells Django to await us under ASGI instead of running us in a thread; same as Django's MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        request_id = LoggingUtil.make_request_id(request.headers.get(REQUEST_ID_HEADER))
+        token = LoggingUtil.set_request_id(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            LoggingUtil.reset_request_id(token)
+
+        response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+    async def __acall__(self, request):
+        request_id = LoggingUtil.make_request_id(request.headers.get(REQUEST_ID_HEADER))
+        token = LoggingUtil.set_request_id(request_id)
+        try:
+            response = await self.get_response(request)
+        finally:
+            LoggingUtil.reset_request_id(token)
+
+        response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = LoggingUtil.get_request_id()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Keeps a failing node from flooding the logs.
+
+    Warnings and errors are limited per call site: the first `burst` records of every `window_seconds` window pass,
+    after that only every `sample_every`-th one does. The next record that passes carries the number of records
+    dropped in between as `suppressed`. Records below WARNING are never dropped.
+    """
+
+    def __init__(self, burst: int = 10, window_seconds: float = 60, sample_every: int = 100):
+        super().__init__()
+        self.burst = burst
+        self.window_seconds = window_seconds
+        self.sample_every = sample_every
+        self._lock = threading.Lock()
+        # call site -> [window start, records in window, records suppressed since the last one that passed]
+        self._sites = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.window_seconds:
+                suppressed = site[2] if site is not None else 0
+                site = [now, 0, suppressed]
+                self._sites[key] = site
+
+            site[1] += 1
+            count = site[1]
+            if count > self.burst and (count - self.burst) % self.sample_every != 0:
+                site[2] += 1
+                return False
+
+            if site[2]:
+                record.suppressed = site[2]
+                site[2] = 0
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with the extra= fields of _LOGGED_FIELDS merged in; a record's request is logged as
+    its method and path only"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+
+        request = getattr(record, 'request', None)
+        if request is not None:
+            entry['method'] = getattr(request, 'method', None)
+            entry['path'] = getattr(request, 'path', None)
+
+        for key in _LOGGED_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+
+        return FastJSON.dumps_str(entry)
+
+    def formatTime(self, record: logging.LogRecord, datefmt=None) -> str:
+        return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z'
+
+
+class QueueStreamHandler(QueueHandler):
+    """
+    Formats records in the calling thread but writes them to the stream from a background thread, so a slow stdout
+    (e.g. under gunicorn) never blocks a request.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.listener = QueueListener(self.queue, logging.StreamHandler(stream))
+        self.listener.start()
+        atexit.register(self.listener.stop)
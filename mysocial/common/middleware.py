@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from common.request_cache import RequestCache
+from common.request_context import RequestContext
+from mysocial.settings import base
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records database queries, database time, duplicate queries and outbound HTTP calls (see RemoteClient) of every
+    request.
+
+    The numbers are sent back as a Server-Timing header and logged as one JSON line per request. Turned on with the
+    REQUEST_METRICS_ENABLED setting; when off, Django drops this middleware at startup so it costs nothing.
+
+    Sync only: under ASGI Django runs it in the request's thread, the same one the request's queries run in, which is
+    what lets it see them.
+    """
+
+    def __init__(self, get_response):
+        if not base.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        context, token = RequestContext.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(context.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            RequestContext.end(token)
+
+        response.headers['Server-Timing'] = RequestMetricsMiddleware.get_server_timing(context)
+        RequestMetricsMiddleware.log(request, response, context)
+        return response
+
+    @staticmethod
+    def get_server_timing(context: RequestContext) -> str:
+        return ', '.join([
+            f'db;dur={context.query_seconds * 1000:.1f};desc="{context.query_count} queries"',
+            f'remote;dur={context.http_seconds * 1000:.1f};desc="{context.http_count} calls"',
+            f'total;dur={context.get_elapsed_seconds() * 1000:.1f}',
+        ])
+
+    @staticmethod
+    def log(request, response, context: RequestContext):
+        logger.info(f'{request.method} {request.path} {response.status_code}', extra={
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(context.get_elapsed_seconds() * 1000, 1),
+            'queries': context.query_count,
+            'db_ms': round(context.query_seconds * 1000, 1),
+            'duplicate_queries': context.get_duplicate_queries(),
+            'http_calls': context.http_count,
+            'http_ms': round(context.http_seconds * 1000, 1),
+        })
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise's middleware, but it can also be awaited.
+
+    WhiteNoise's own middleware is sync only, so under ASGI Django would run the rest of every request from a thread
+    that then blocks until the response is ready. Outside of DEBUG, finding a static file is a dictionary lookup, so
+    there's nothing to run in a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+
+class RequestCacheMiddleware:
+    """Gives every request its own RequestCache"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        token = RequestCache.start()
+        try:
+            return self.get_response(request)
+        finally:
+            RequestCache.end(token)
+
+    async def __acall__(self, request):
+        token = RequestCache.start()
+        try:
+            return await self.get_response(request)
+        finally:
+            RequestCache.end(token)
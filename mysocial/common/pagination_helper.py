@@ -1,6 +1,11 @@
-from typing import Any
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
 
 from django.core.paginator import EmptyPage, InvalidPage, PageNotAnInteger, Paginator
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
 from drf_spectacular.utils import OpenApiParameter
 from rest_framework.request import Request
 from rest_framework.utils.serializer_helpers import ReturnDict
@@ -8,6 +13,7 @@
 
 class PaginationHelper:
     NO_PAGINATION_REQUEST = "NO_PAGINATION_REQUEST"
+    DEFAULT_KEYSET_SIZE = 100
 
     # use this for documenting endpoints that can be paginated
     OPEN_API_PARAMETERS = [
@@ -19,6 +25,21 @@ class PaginationHelper:
                          required=False, type=int),
     ]
 
+    # use this for documenting endpoints that support keyset pagination on top of page and size
+    KEYSET_OPEN_API_PARAMETERS = [
+        OpenApiParameter(name='page', location=OpenApiParameter.QUERY,
+                         description='A page number greater than zero; 1 if only size was given. If this was given, '
+                                     'size is required.',
+                         required=False, type=int),
+        OpenApiParameter(name='size', location=OpenApiParameter.QUERY,
+                         description='The size of a page greater than zero.',
+                         required=False, type=int),
+        OpenApiParameter(name='after', location=OpenApiParameter.QUERY,
+                         description='Opaque cursor from the "next" field of a previous response. Returns the items '
+                                     'after that cursor. Uses size for the page size if given.',
+                         required=False, type=str),
+    ]
+
     @staticmethod
     def paginate_serialized_data(request: Request, data: ReturnDict) -> (Any, str):
         """
@@ -44,7 +65,12 @@ def paginate_serialized_data(request: Request, data: ReturnDict) -> (Any, str):
                 # should do unsuccessful logic
 
         """
-        should_paginate = 'page' in request.query_params or 'size' in request.query_params
+        return PaginationHelper.paginate_data(request.query_params, data)
+
+    @staticmethod
+    def paginate_data(params: dict, data) -> (Any, str):
+        """paginate_serialized_data with the page and size from params instead of a request's query parameters"""
+        should_paginate = 'page' in params or 'size' in params
 
         if not should_paginate:
             return data, None
@@ -55,11 +81,11 @@ def paginate_serialized_data(request: Request, data: ReturnDict) -> (Any, str):
         size = 1
 
         try:
-            page = int(request.query_params['page'])
+            page = int(params['page'])
             if page < 1:
                 return None, "page should be greater than or equal to 1"
 
-            size = int(request.query_params['size'])
+            size = int(params['size'])
             if size < 1:
                 return None, "size should be greater than or equal to 1"
         except Exception as err:
@@ -76,3 +102,131 @@ def paginate_serialized_data(request: Request, data: ReturnDict) -> (Any, str):
             return (), 'Invalid page'
         except Exception as err:
             return (), str(err)
+
+    @staticmethod
+    def paginate_queryset(request: Request, queryset: QuerySet, key_field: str = 'published', id_field: str = 'pk',
+                          default_size: int = None, max_size: int = None) -> (Any, Optional[str], Optional[str]):
+        """
+        Paginates a queryset inside the database instead of paginating serialized data.
+
+        The queryset has to be ordered by -key_field then -id_field, e.g. order_by('-published', '-pk'), so that
+        the database can walk an index and stop after a page worth of rows.
+
+        :param request: HTTPRequest from Django. We are expecting the query_parameters to contain either:
+            - page and size: same rules as paginate_serialized_data, done with LIMIT and OFFSET, except that page
+              is 1 if only size is given
+            - after (and optionally size): keyset pagination from a cursor we returned in a previous page
+        :param queryset: ordered queryset to paginate
+        :param key_field: the field the queryset is ordered by
+        :param id_field: the tie-breaker field the queryset is ordered by
+        :param default_size: if given, requests without pagination parameters get the first page of this size instead
+        of everything
+        :param max_size: if given, larger sizes are lowered to it
+        :return items: a list of model objects, or the original queryset if there were no pagination parameters
+        :return next_cursor: cursor for the next page, or None if this is the last page
+        :return err: None if successful, otherwise a string error message
+
+        Example how to use::
+
+            items, next_cursor, err = PaginationHelper.paginate_queryset(request, queryset)
+            if err is None:
+                # do successful logic
+            else:
+                # should do unsuccessful logic
+        """
+        if 'after' in request.query_params:
+            cursor = PaginationHelper.decode_cursor(request.query_params['after'])
+            if cursor is None:
+                return None, None, 'after is not a valid cursor'
+
+            size, err = PaginationHelper._get_size(request, default=PaginationHelper.DEFAULT_KEYSET_SIZE,
+                                                   max_size=max_size)
+            if err is not None:
+                return None, None, err
+
+            key, item_id = cursor
+            queryset = queryset.filter(Q(**{f'{key_field}__lt': key}) |
+                                       Q(**{key_field: key, f'{id_field}__lt': item_id}))
+            return PaginationHelper._slice_with_cursor(queryset, 0, size, key_field, id_field)
+
+        should_paginate = 'page' in request.query_params or 'size' in request.query_params
+        if not should_paginate:
+            if default_size is not None:
+                return PaginationHelper._slice_with_cursor(queryset, 0, default_size, key_field, id_field)
+            return queryset, None, None
+
+        try:
+            # size alone is the first page
+            page = int(request.query_params.get('page', 1))
+            if page < 1:
+                return None, None, "page should be greater than or equal to 1"
+        except Exception as err:
+            return None, None, str(err)
+
+        size, err = PaginationHelper._get_size(request, max_size=max_size)
+        if err is not None:
+            return None, None, err
+
+        items, next_cursor, err = PaginationHelper._slice_with_cursor(queryset, (page - 1) * size, size,
+                                                                      key_field, id_field)
+        if err is None and len(items) == 0 and page > 1:
+            return (), None, 'Page is empty'
+        return items, next_cursor, err
+
+    @staticmethod
+    def parse_since(request: Request) -> (Optional[datetime], Optional[str]):
+        """
+        Parses the optional since query parameter, an ISO 8601 timestamp used by clients polling for new entries
+
+        :return: (None, None) if since was not given, (datetime, None) if valid, and (None, str) if invalid
+        """
+        if 'since' not in request.query_params:
+            return None, None
+
+        since = parse_datetime(request.query_params['since'])
+        if since is None:
+            return None, 'since should be an ISO 8601 timestamp'
+        return since, None
+
+    @staticmethod
+    def encode_cursor(key, item_id) -> str:
+        key = key.isoformat() if isinstance(key, datetime) else key
+        raw = json.dumps([key, str(item_id)])
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[tuple]:
+        try:
+            key, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return key, item_id
+        except Exception:
+            return None
+
+    @staticmethod
+    def _get_size(request: Request, default: int = None, max_size: int = None) -> (Optional[int], Optional[str]):
+        if 'size' not in request.query_params and default is not None:
+            size = default
+        else:
+            try:
+                size = int(request.query_params['size'])
+            except Exception as err:
+                return None, str(err)
+
+        if size < 1:
+            return None, "size should be greater than or equal to 1"
+        if max_size is not None:
+            size = min(size, max_size)
+        return size, None
+
+    @staticmethod
+    def _slice_with_cursor(queryset: QuerySet, offset: int, size: int, key_field: str,
+                           id_field: str) -> (Any, Optional[str], Optional[str]):
+        # fetch one extra row so we know whether there is a next page without a COUNT query
+        items = list(queryset[offset:offset + size + 1])
+        if len(items) <= size:
+            return items, None, None
+
+        items = items[:size]
+        last = items[-1]
+        id_attname = last._meta.pk.attname if id_field == 'pk' else id_field
+        return items, PaginationHelper.encode_cursor(getattr(last, key_field), getattr(last, id_attname)), None
@@ -0,0 +1,176 @@
+import threading
+import time
+
+import psycopg2
+import psycopg2.extras
+from django.db.backends.postgresql import base as postgresql
+from django.utils.asyncio import async_unsafe
+from psycopg2_pool import PoolError, ThreadSafeConnectionPool
+
+
+class PooledConnectionPool(ThreadSafeConnectionPool):
+    """ThreadSafeConnectionPool that counts what it does, for /remote-node/metrics/"""
+
+    def __init__(self, alias: str, **kwargs):
+        self.alias = alias
+        self.opened = 0
+        self.checkouts = 0
+        self.health_check_failures = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        super().__init__(**kwargs)
+
+    def _connect(self, for_immediate_use=False):
+        connection = super()._connect(for_immediate_use)
+        self.opened += 1
+        return connection
+
+    def discard(self, connection):
+        """Drops a connection checked out of the pool, e.g. a broken one"""
+        with self.lock:
+            self.connections_in_use.discard(connection)
+        if not connection.closed:
+            connection.close()
+
+    def count(self, counter: str, value=1):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + value)
+
+
+class ConnectionPools:
+    """The pool of every database alias in this process; their state is rendered in the Prometheus text format"""
+    _lock = threading.Lock()
+    _pools = {}
+
+    @staticmethod
+    def get_pool(alias: str, pool_config: dict, conn_params: dict) -> PooledConnectionPool:
+        with ConnectionPools._lock:
+            pool = ConnectionPools._pools.get(alias)
+            if pool is None:
+                pool = PooledConnectionPool(
+                    alias,
+                    minconn=pool_config.get('MIN_SIZE', 1),
+                    maxconn=pool_config.get('MAX_SIZE', 10),
+                    idle_timeout=pool_config.get('IDLE_TIMEOUT', 300),
+                    **conn_params,
+                )
+                ConnectionPools._pools[alias] = pool
+            return pool
+
+    @staticmethod
+    def render_prometheus() -> str:
+        with ConnectionPools._lock:
+            pools = sorted(ConnectionPools._pools.items())
+
+        metrics = [
+            ('db_pool_connections_in_use', 'gauge', 'Connections checked out of the pool.',
+             lambda pool: len(pool.connections_in_use)),
+            ('db_pool_connections_idle', 'gauge', 'Open connections waiting in the pool.',
+             lambda pool: len(pool.idle_connections)),
+            ('db_pool_connections_opened_total', 'counter', 'Connections the pool opened to the database.',
+             lambda pool: pool.opened),
+            ('db_pool_checkouts_total', 'counter', 'Connections handed out by the pool.',
+             lambda pool: pool.checkouts),
+            ('db_pool_health_check_failures_total', 'counter', 'Pooled connections found broken and dropped.',
+             lambda pool: pool.health_check_failures),
+            ('db_pool_timeouts_total', 'counter', 'Checkouts that gave up because the pool was full.',
+             lambda pool: pool.timeouts),
+            ('db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a connection from a full pool.',
+             lambda pool: pool.wait_seconds),
+        ]
+
+        lines = []
+        for name, metric_type, description, get_value in metrics:
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {metric_type}']
+            for alias, pool in pools:
+                lines.append(f'{name}{{alias="{alias}"}} {get_value(pool)}')
+        return '\n'.join(lines) + '\n'
+
+
+class DatabaseWrapper(postgresql.DatabaseWrapper):
+    """
+    Django's postgres backend, but connections come from a pool shared by the threads of this process instead of
+    being opened for every request.
+
+    Use it with `"ENGINE": "common.pooled_postgresql"`, and configure the pool in OPTIONS, e.g.
+    `"OPTIONS": {"POOL": {"MIN_SIZE": 1, "MAX_SIZE": 10, "IDLE_TIMEOUT": 300, "TIMEOUT": 5}}`:
+    - MIN_SIZE: connections kept open even when idle
+    - MAX_SIZE: most connections this process opens; keep workers * MAX_SIZE under the database's limit
+    - IDLE_TIMEOUT: seconds before an idle connection is closed
+    - TIMEOUT: seconds to wait for a connection when all MAX_SIZE are in use before failing the request
+
+    Django's close() gives the connection back to the pool, so CONN_MAX_AGE decides how long a thread holds on to it.
+    With CONN_HEALTH_CHECKS, a connection is tested before it's handed out of the pool.
+    """
+    WAIT_INTERVAL_SECONDS = 0.05
+
+    def get_pool_config(self) -> dict:
+        return self.settings_dict['OPTIONS'].get('POOL', {})
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('POOL', None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = ConnectionPools.get_pool(self.alias, self.get_pool_config(), conn_params)
+        connection = self.checkout(pool)
+
+        # same as the postgres backend does for a new connection
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def checkout(self, pool: PooledConnectionPool):
+        timeout = self.get_pool_config().get('TIMEOUT', 5)
+        start = time.perf_counter()
+        while True:
+            try:
+                connection = pool.getconn()
+            except PoolError:
+                waited = time.perf_counter() - start
+                if waited >= timeout:
+                    pool.count('wait_seconds', waited)
+                    pool.count('timeouts')
+                    raise psycopg2.OperationalError(
+                        f'connection pool exhausted: all {pool.maxconn} connections of "{self.alias}" are in use')
+                time.sleep(DatabaseWrapper.WAIT_INTERVAL_SECONDS)
+                continue
+
+            if self.settings_dict['CONN_HEALTH_CHECKS'] and not self.is_healthy(connection):
+                pool.count('health_check_failures')
+                pool.discard(connection)
+                continue
+
+            pool.count('checkouts')
+            pool.count('wait_seconds', time.perf_counter() - start)
+            return connection
+
+    @staticmethod
+    def is_healthy(connection) -> bool:
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            # the check starts a transaction when autocommit is off; don't hand it out in one
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is not None:
+            pool = ConnectionPools.get_pool(self.alias, self.get_pool_config(), self.get_connection_params())
+            with self.wrap_database_errors:
+                if self.connection.closed:
+                    return pool.discard(self.connection)
+                return pool.putconn(self.connection)
@@ -1,10 +1,45 @@
+import logging
+
+from django.db.models import QuerySet
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.request import Request
+
 from authors.models.author import Author
 from mysocial.settings import base
 from comment.models import Comment
 from comment.serializers import CommentSerializer
 from post.serializer import PostSerializer
 
+logger = logging.getLogger(__name__)
+
+
 class PostHelper():
+    # use this for documenting endpoints that take category
+    CATEGORY_OPEN_API_PARAMETERS = [
+        OpenApiParameter(name='category', location=OpenApiParameter.QUERY,
+                         description='Only returns posts with this category. Repeat it for posts with all of them.',
+                         required=False, type=str, many=True),
+    ]
+
+    @staticmethod
+    def filter_categories(request: Request, posts: QuerySet) -> QuerySet:
+        """The posts with every category in the request's category query parameters; uses the categories index"""
+        categories = [category for category in request.query_params.getlist('category') if category]
+        if categories:
+            posts = posts.filter(categories__contains = categories)
+        return posts
+
+    @staticmethod
+    def get_validator_querysets(posts: QuerySet) -> list:
+        """
+        Every table a serialized post with comments is built from; pass this to ConditionalHelper.respond
+        """
+        return [
+            posts,
+            Comment.objects.filter(post__in = posts),
+            Author.objects.filter(post__in = posts),
+        ]
+
     def add_comments_and_count(author: Author, post):
         try:
             if author:
@@ -13,7 +48,7 @@ def add_comments_and_count(author: Author, post):
                 node_config = None
 
             if node_config:
-                print("im in here")
+                logger.debug(f'PostHelper: add_comments_and_count: fetching comments from {node_config}')
                 path = f'{post.get_url()}/comments'
                 
                 response = node_config.get_comments_for_post(path)
@@ -32,5 +67,5 @@ def add_comments_and_count(author: Author, post):
                 return post
 
         except Exception as e:
-            print(e)
+            logger.exception(e)
 
@@ -0,0 +1,50 @@
+from contextvars import ContextVar
+
+
+class RequestCache:
+    """
+    Objects looked up during the current request, so looking them up again doesn't hit the database; e.g. inboxes,
+    see Inbox.get_for_author_id.
+
+    Scoped to a request by RequestCacheMiddleware. Outside a request (commands, shell) nothing is cached. Only cache
+    objects that the request's own writes keep up to date.
+
+    Example how to use::
+
+        token = RequestCache.start()
+        try:
+            ...
+        finally:
+            RequestCache.end(token)
+    """
+    _current: ContextVar = ContextVar('request_cache', default=None)
+
+    @staticmethod
+    def start():
+        return RequestCache._current.set({})
+
+    @staticmethod
+    def end(token):
+        RequestCache._current.reset(token)
+
+    @staticmethod
+    def get(namespace: str, key: str):
+        """Returns the cached object, or None if there is none"""
+        cache = RequestCache._current.get()
+        if cache is None:
+            return None
+        return cache.get((namespace, key))
+
+    @staticmethod
+    def get_many(namespace: str, keys: list) -> dict:
+        """Returns the cached objects by key; keys that aren't cached are left out"""
+        cache = RequestCache._current.get()
+        if cache is None:
+            return {}
+        return {key: cache[(namespace, key)] for key in keys if (namespace, key) in cache}
+
+    @staticmethod
+    def set(namespace: str, key: str, value):
+        cache = RequestCache._current.get()
+        if cache is not None:
+            cache[(namespace, key)] = value
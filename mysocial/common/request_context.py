@@ -0,0 +1,82 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+# collapses literals and IN lists so the same query with different arguments has one fingerprint
+FINGERPRINT_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+\b'), '?'),
+    (re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)', re.IGNORECASE), 'IN (...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+class RequestContext:
+    """
+    Per-request bookkeeping: database queries, their duration and fingerprints, and outbound HTTP calls.
+
+    The current context lives in a ContextVar, so code deep in helpers and node configs can record into it without
+    having the request passed along. Outside a request, get_current() returns None and nothing is recorded.
+
+    Example how to use::
+
+        context, token = RequestContext.start()
+        try:
+            ...
+        finally:
+            RequestContext.end(token)
+    """
+    _current: ContextVar = ContextVar('request_context', default=None)
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.query_fingerprints = Counter()
+        self.http_count = 0
+        self.http_seconds = 0.0
+
+    @staticmethod
+    def start():
+        context = RequestContext()
+        return context, RequestContext._current.set(context)
+
+    @staticmethod
+    def end(token):
+        RequestContext._current.reset(token)
+
+    @staticmethod
+    def get_current() -> Optional['RequestContext']:
+        return RequestContext._current.get()
+
+    def record_query(self, sql: str, seconds: float):
+        self.query_count += 1
+        self.query_seconds += seconds
+        self.query_fingerprints[RequestContext.fingerprint(sql)] += 1
+
+    def record_http(self, seconds: float):
+        self.http_count += 1
+        self.http_seconds += seconds
+
+    def get_duplicate_queries(self, limit: int = 3) -> list:
+        """Returns the most repeated (fingerprint, count) pairs; repeats usually mean an N+1"""
+        return [(sql, count) for sql, count in self.query_fingerprints.most_common(limit) if count > 1]
+
+    def get_elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Pass to connection.execute_wrapper to record every query"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(sql, time.perf_counter() - start)
+
+    @staticmethod
+    def fingerprint(sql: str) -> str:
+        for pattern, replacement in FINGERPRINT_PATTERNS:
+            sql = pattern.sub(replacement, sql)
+        return sql.strip()
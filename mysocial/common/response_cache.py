@@ -0,0 +1,143 @@
+import hashlib
+import time
+from typing import Awaitable, Callable, Optional
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from common.conditional_helper import ConditionalHelper
+from mysocial.settings import base
+
+
+class ResponseCache:
+    """
+    Caches the rendered JSON of endpoints that return the same payload to every caller of the same class.
+
+    Entries are keyed by endpoint, scope (e.g. an author id), caller class (user, node or anonymous) and query
+    parameters. Invalidation gives an endpoint and scope a new generation, which orphans the old entries; see the
+    post_save and post_delete receivers in each app's signals.py. Generations are the time they were made in
+    nanoseconds, so one that was evicted from the cache is never made again and its entries can't come back.
+
+    TTLs per endpoint live in RESPONSE_CACHE_TTL in settings/base.py. A TTL of 0 turns caching off for that endpoint.
+    They are all 0 unless the cache is shared by every process (see CACHES), since an invalidation only reaches the
+    cache of the process that made it.
+
+    Example how to use::
+
+        return ResponseCache.get_or_render(request, ResponseCache.PUBLIC_POSTS, build_response)
+    """
+    PUBLIC_POSTS = 'public_posts'
+    AUTHORS = 'authors'
+    AUTHOR_POSTS = 'author_posts'
+
+    KEY_PREFIX = 'response'
+    GENERATION_KEY_PREFIX = 'response_generation'
+
+    @staticmethod
+    def get_or_render(request: Request, endpoint: str, build_response: Callable[[], HttpResponse],
+                      scope: str = '') -> HttpResponse:
+        """
+        Returns the cached response for this request if there is one, otherwise builds, renders and caches it.
+
+        Only successful JSON responses are cached. Validators (ETag and Last-Modified) are cached along with the
+        content, so a conditional GET on a cache hit is answered without touching the database.
+        """
+        ttl = ResponseCache.get_ttl(request, endpoint)
+        if not ttl:
+            return build_response()
+
+        key = ResponseCache.make_key(request, endpoint, scope)
+        cached = cache.get(key)
+        if cached is not None:
+            return ResponseCache._from_cache(request, cached)
+
+        return ResponseCache._store(request, key, ttl, build_response())
+
+    @staticmethod
+    async def aget_or_render(request: Request, endpoint: str, build_response: Callable[[], Awaitable[HttpResponse]],
+                             scope: str = '') -> HttpResponse:
+        """Same as get_or_render, for async views; build_response is awaited. The cache is read synchronously, so
+        it should be one that answers quickly (local memory or a nearby server)."""
+        ttl = ResponseCache.get_ttl(request, endpoint)
+        if not ttl:
+            return await build_response()
+
+        key = ResponseCache.make_key(request, endpoint, scope)
+        cached = cache.get(key)
+        if cached is not None:
+            return ResponseCache._from_cache(request, cached)
+
+        return ResponseCache._store(request, key, ttl, await build_response())
+
+    @staticmethod
+    def get_ttl(request: Request, endpoint: str) -> int:
+        """0 if the response to this request shouldn't be cached"""
+        if getattr(request.accepted_renderer, 'format', None) != 'json':
+            return 0
+        return base.RESPONSE_CACHE_TTL.get(endpoint, 0)
+
+    @staticmethod
+    def invalidate(endpoint: str, scope: str = ''):
+        """Drops every cached response of endpoint for scope"""
+        cache.set(ResponseCache._make_generation_key(endpoint, scope), time.time_ns(), None)
+
+    @staticmethod
+    def make_key(request: Request, endpoint: str, scope: str = '') -> str:
+        generation = ResponseCache._get_generation(endpoint, scope)
+        query = '&'.join(f'{key}={value}' for key, value in sorted(request.query_params.lists()))
+        query_hash = hashlib.md5(query.encode('utf-8')).hexdigest()
+        caller_class = ConditionalHelper.get_caller_class(request)
+        return f'{ResponseCache.KEY_PREFIX}:{endpoint}:{scope}:{generation}:{caller_class}:{query_hash}'
+
+    @staticmethod
+    def _get_generation(endpoint: str, scope: str) -> int:
+        generation_key = ResponseCache._make_generation_key(endpoint, scope)
+        generation = cache.get(generation_key)
+        if generation is None:
+            # never invalidated, or evicted; a new one orphans whatever was cached under the old one
+            cache.add(generation_key, time.time_ns(), None)
+            generation = cache.get(generation_key)
+        return generation
+
+    @staticmethod
+    def _make_generation_key(endpoint: str, scope: str) -> str:
+        return f'{ResponseCache.GENERATION_KEY_PREFIX}:{endpoint}:{scope}'
+
+    @staticmethod
+    def _store(request: Request, key: str, ttl: int, response: HttpResponse) -> HttpResponse:
+        if not isinstance(response, Response) or response.status_code != 200:
+            return response
+
+        content = request.accepted_renderer.render(response.data, request.accepted_media_type)
+        # setting the content marks the response as rendered so DRF does not render it a second time
+        response.content = content
+        response['Content-Type'] = request.accepted_media_type
+        cache.set(key, {
+            'content': content,
+            'content_type': request.accepted_media_type,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }, ttl)
+        return response
+
+    @staticmethod
+    def _from_cache(request: Request, cached: dict) -> HttpResponse:
+        last_modified: Optional[int] = None
+        if cached['last_modified']:
+            last_modified = parse_http_date_safe(cached['last_modified'])
+
+        if cached['etag'] or last_modified:
+            not_modified = get_conditional_response(request, etag=cached['etag'], last_modified=last_modified)
+            if not_modified is not None:
+                return not_modified
+
+        response = HttpResponse(cached['content'], content_type=cached['content_type'])
+        if cached['etag']:
+            response.headers['ETag'] = cached['etag']
+        if cached['last_modified']:
+            response.headers['Last-Modified'] = cached['last_modified']
+        return response
@@ -1,5 +1,9 @@
 import datetime
+import logging
+from contextlib import contextmanager
 
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from authors.models.author import Author
@@ -7,10 +11,30 @@
 from mysocial.settings import base
 from post.models import ContentType, Post, Visibility
 
+logger = logging.getLogger(__name__)
+
 
 class TestHelper:
     DEFAULT_PASSWORD = '1234567'
 
+    @staticmethod
+    @contextmanager
+    def assert_max_queries(testcase, max_queries: int, using: str = 'default'):
+        """
+        Fails testcase if the block runs more than max_queries queries; catches N+1s creeping back into an endpoint
+
+        Example how to use::
+
+            with TestHelper.assert_max_queries(self, 5):
+                self.client.get('/posts/public/')
+        """
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        queries = '\n'.join(query['sql'] for query in context.captured_queries)
+        testcase.assertLessEqual(len(context), max_queries,
+                                 f'{len(context)} queries ran, expected at most {max_queries}:\n{queries}')
+
     @staticmethod
     def overwrite_node(username: str, password: str, remote_username: str, remote_password: str, host: str):
         try:
@@ -18,7 +42,7 @@ def overwrite_node(username: str, password: str, remote_username: str, remote_pa
         except Author.DoesNotExist:
             return TestHelper.create_node(username, password, remote_username, remote_password, host)
         except Exception as e:
-            print(f"Unknown error: {e}")
+            logger.warning(f"TestHelper: unknown error: {e}")
             return None
 
         node_author.set_password(password)
@@ -65,7 +89,7 @@ def overwrite_author(username: str, other_args: dict = {}):
         except Author.DoesNotExist:
             return TestHelper.create_author(username, other_args)
         except Exception as e:
-            print(f"Unknown error: {e}")
+            logger.warning(f"TestHelper: unknown error: {e}")
 
     @staticmethod
     def create_author(username: str, other_args: dict = None) -> Author:
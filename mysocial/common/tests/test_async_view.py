@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from common.async_view import AsyncViewMixin
+from common.fast_json import FastJSON
+from remote_nodes.node_config_base import NodeConfigBase
+from remote_nodes.remote_client import AsyncRemoteClient, RemoteCallMetrics
+
+
+class SlowView(AsyncViewMixin, APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    async def get(self, request):
+        # two remote calls that take 0.2s each
+        await asyncio.gather(asyncio.sleep(0.2), asyncio.sleep(0.2))
+        return Response({'type': 'async'})
+
+    def post(self, request):
+        return Response({'type': 'sync'})
+
+
+class TestAsyncView(SimpleTestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = SlowView.as_view()
+
+    def test_view_is_async(self):
+        self.assertTrue(asyncio.iscoroutinefunction(self.view))
+
+    def test_async_handler(self):
+        start = time.perf_counter()
+        response = async_to_sync(self.view)(self.factory.get('/slow/'))
+        seconds = time.perf_counter() - start
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'type': 'async'})
+        # the calls overlapped
+        self.assertLess(seconds, 0.35)
+
+    def test_sync_handler(self):
+        response = async_to_sync(self.view)(self.factory.post('/slow/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'type': 'sync'})
+
+    def test_method_not_allowed(self):
+        response = async_to_sync(self.view)(self.factory.delete('/slow/'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_async_remote_client(self):
+        RemoteCallMetrics.reset()
+        client = AsyncRemoteClient('TestNode')
+        sent = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            sent.append(request)
+            return httpx.Response(201, content=b'{}')
+
+        async def send():
+            client._clients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+            return await client.post('http://127.0.0.1:8080/authors/1/inbox', data=b'{"type": "post"}',
+                                     auth=('node', 'password'))
+
+        response = async_to_sync(send)()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sent[0].content, b'{"type": "post"}')
+        self.assertIn('Authorization', sent[0].headers)
+        metrics = RemoteCallMetrics.render_prometheus()
+        self.assertIn('remote_requests_total{node="TestNode",method="POST",endpoint="/authors/{id}/inbox",status="201"} 1',
+                      metrics)
+
+    def test_async_remote_client_per_loop(self):
+        client = AsyncRemoteClient('TestNode')
+
+        async def get_twice():
+            return await client.get_client(), await client.get_client()
+
+        first, second = async_to_sync(get_twice)()
+        other_loop = async_to_sync(client.get_client)()
+
+        # one client per loop, closed when the loop shut down
+        self.assertIs(first, second)
+        self.assertIsNot(first, other_loop)
+        self.assertTrue(first.is_closed)
+        self.assertTrue(other_loop.is_closed)
+
+    def test_node_config_async_fallback(self):
+        class OverridingNode(NodeConfigBase):
+            def get_all_author_jsons(self, params: dict):
+                return [{'type': 'author', 'params': params}]
+
+        # skip __init__, it looks up the node's author
+        node_config = object.__new__(OverridingNode)
+
+        self.assertTrue(node_config.overrides('get_all_author_jsons'))
+        self.assertFalse(node_config.overrides('get_author_via_url'))
+        author_jsons = async_to_sync(node_config.aget_all_author_jsons)({'page': 1})
+        self.assertEqual(author_jsons, [{'type': 'author', 'params': {'page': 1}}])
+
+    def test_node_config_bulk_inbox(self):
+        sent = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            sent.append(request)
+            if request.url.path == '/inbox/bulk':
+                items = FastJSON.loads(request.content)['items']
+                return httpx.Response(200, json={'type': 'inbox-bulk', 'items': [
+                    {'author': item['author'], 'status': 200 if i == 0 else 404} for i, item in enumerate(items)]})
+            return httpx.Response(200, content=b'{}')
+
+        def create_node_config(supports_bulk_inbox: bool) -> NodeConfigBase:
+            node_config = object.__new__(NodeConfigBase)
+            node_config.supports_bulk_inbox = supports_bulk_inbox
+            node_config.username, node_config.password = 'node', 'password'
+            node_config.async_client = AsyncRemoteClient('TestNode')
+            return node_config
+
+        items = [({'type': 'post'}, f'http://domain.herokuapp.com/authors/{i}') for i in range(3)]
+
+        async def send(node_config: NodeConfigBase):
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+            node_config.async_client._clients[asyncio.get_running_loop()] = client
+            return await node_config.asend_many_to_remote_inbox(items)
+
+        responses = async_to_sync(send)(create_node_config(True))
+        self.assertEqual([request.url.path for request in sent], ['/inbox/bulk'])
+        self.assertEqual([response.status_code for response in responses], [200, 404, 404])
+
+        sent.clear()
+        responses = async_to_sync(send)(create_node_config(False))
+        self.assertEqual(sorted(request.url.path for request in sent), [f'/authors/{i}/inbox' for i in range(3)])
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200])
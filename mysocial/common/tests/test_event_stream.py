@@ -0,0 +1,49 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from common.event_stream import EventStreamResponse, StreamingASGIHandler, _receive
+
+
+class TestEventStream(SimpleTestCase):
+    def test_format_event(self):
+        self.assertEqual(EventStreamResponse.format_event('{"a": 1}'), 'data: {"a": 1}\n\n')
+        self.assertEqual(EventStreamResponse.format_event('one\ntwo', event_id=7, event='post'),
+                         'id: 7\nevent: post\ndata: one\ndata: two\n\n')
+
+    def test_stops_on_disconnect(self):
+        state = {'closed': False}
+
+        async def events():
+            try:
+                yield 'data: first\n\n'
+                # a stream that would wait forever for the next event
+                await asyncio.Event().wait()
+            finally:
+                state['closed'] = True
+
+        sent = []
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+            if message.get('body'):
+                disconnect.set()
+
+        async def run():
+            # what StreamingASGIHandler.handle does
+            _receive.set(receive)
+            handler = object.__new__(StreamingASGIHandler)
+            await asyncio.wait_for(handler.send_response(EventStreamResponse(events()), send), 1)
+
+        async_to_sync(run)()
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'Content-Type', b'text/event-stream'), sent[0]['headers'])
+        self.assertEqual(sent[1]['body'], b'data: first\n\n')
+        self.assertEqual(len(sent), 2)
+        self.assertTrue(state['closed'])
@@ -0,0 +1,34 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from common.fast_json import FastJSON, FastJSONRenderer
+
+
+class TestFastJSON(SimpleTestCase):
+    def test_matches_drf_renderer(self):
+        data = {
+            'id': uuid.uuid4(),
+            'published': datetime.datetime(2022, 11, 17, 21, 7, 41, tzinfo=datetime.timezone.utc),
+            'count': Decimal('1.5'),
+            'title': 'café',
+            'items': [1, None, True],
+        }
+
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_round_trip(self):
+        item_id = uuid.uuid4()
+
+        raw = FastJSON.dumps_str({'type': 'post', 'id': item_id})
+
+        self.assertIsInstance(raw, str)
+        self.assertEqual(FastJSON.loads(raw), {'type': 'post', 'id': str(item_id)})
+
+    def test_malformed_input(self):
+        with self.assertRaises(json.JSONDecodeError):
+            FastJSON.loads('{not json')
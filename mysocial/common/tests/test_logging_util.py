@@ -0,0 +1,96 @@
+import io
+import json
+import logging
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common.logging_util import JSONFormatter, LoggingUtil, RateLimitFilter, RequestIdMiddleware
+
+
+class TestLoggingUtil(SimpleTestCase):
+    @staticmethod
+    def make_record(level=logging.WARNING, lineno=10, **extra) -> logging.LogRecord:
+        record = logging.LogRecord('remote_nodes.team12_local', level, 'team12_local.py', lineno, 'failed: %s', ('x',),
+                                   None)
+        for key, value in extra.items():
+            setattr(record, key, value)
+        return record
+
+    def test_rate_limit_per_call_site(self):
+        rate_limit = RateLimitFilter(burst=2, window_seconds=60, sample_every=3)
+
+        passed = [rate_limit.filter(self.make_record()) for _ in range(8)]
+
+        # 2 in the burst, then every third one
+        self.assertEqual(passed, [True, True, False, False, True, False, False, True])
+        # other call sites and info records are not affected
+        self.assertTrue(rate_limit.filter(self.make_record(lineno=20)))
+        self.assertTrue(all(rate_limit.filter(self.make_record(level=logging.INFO)) for _ in range(10)))
+
+    def test_rate_limit_reports_suppressed(self):
+        rate_limit = RateLimitFilter(burst=1, window_seconds=60, sample_every=2)
+        records = [self.make_record() for _ in range(3)]
+
+        for record in records:
+            rate_limit.filter(record)
+
+        self.assertEqual(records[2].suppressed, 1)
+
+    def test_json_formatter(self):
+        record = self.make_record(request_id='abc', queries=3)
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        self.assertEqual(entry['message'], 'failed: x')
+        self.assertEqual(entry['level'], 'WARNING')
+        self.assertEqual(entry['request_id'], 'abc')
+        self.assertEqual(entry['queries'], 3)
+
+    def test_json_formatter_skips_unknown_extras(self):
+        record = self.make_record(request=RequestFactory().post('/tokens/', {'password': 'hunter2'}), secret='x')
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        self.assertNotIn('request', entry)
+        self.assertNotIn('secret', entry)
+        self.assertEqual(entry['method'], 'POST')
+        self.assertEqual(entry['path'], '/tokens/')
+
+    def test_request_id_middleware(self):
+        seen = []
+
+        def get_response(request):
+            seen.append(LoggingUtil.get_request_id())
+            return HttpResponse()
+
+        middleware = RequestIdMiddleware(get_response)
+        response = middleware(RequestFactory().get('/', HTTP_X_REQUEST_ID='from-other-node'))
+        self.assertEqual(response.headers['X-Request-ID'], 'from-other-node')
+
+        # garbage ids are replaced
+        response = middleware(RequestFactory().get('/', HTTP_X_REQUEST_ID='bad id\n'))
+        self.assertNotEqual(response.headers['X-Request-ID'], 'bad id\n')
+        self.assertEqual(seen[1], response.headers['X-Request-ID'])
+        self.assertIsNone(LoggingUtil.get_request_id())
+
+
+class TestRequestLogging(APITestCase):
+    def test_client_error_does_not_log_body(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JSONFormatter())
+        logger = logging.getLogger('django.request')
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+
+        response = self.client.post('/tokens/', {'username': 'nobody', 'password': 'hunter2-secret'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        entry = json.loads(stream.getvalue().splitlines()[-1])
+        self.assertEqual(entry['method'], 'POST')
+        self.assertEqual(entry['path'], '/tokens/')
+        self.assertEqual(entry['status_code'], 401)
+        self.assertNotIn('hunter2-secret', stream.getvalue())
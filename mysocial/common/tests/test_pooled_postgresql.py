@@ -0,0 +1,40 @@
+import psycopg2
+from django.test import SimpleTestCase
+
+from common.pooled_postgresql.base import ConnectionPools, DatabaseWrapper
+
+
+class TestPooledPostgresql(SimpleTestCase):
+    def setUp(self):
+        self.settings_dict = {
+            'ENGINE': 'common.pooled_postgresql',
+            'NAME': 'mysocialdb',
+            'USER': 'mysocialuser',
+            'PASSWORD': 'password',
+            'HOST': 'localhost',
+            'PORT': '5432',
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': True,
+            # no connections allowed, so nothing is opened
+            'OPTIONS': {'POOL': {'MIN_SIZE': 0, 'MAX_SIZE': 0, 'TIMEOUT': 0.1}},
+            'TIME_ZONE': None,
+            'AUTOCOMMIT': True,
+            'ATOMIC_REQUESTS': False,
+            'TEST': {},
+        }
+        self.wrapper = DatabaseWrapper(self.settings_dict, alias='test_pool')
+
+    def test_pool_options_not_passed_to_postgres(self):
+        conn_params = self.wrapper.get_connection_params()
+        self.assertNotIn('POOL', conn_params)
+        self.assertEqual(conn_params['database'], 'mysocialdb')
+
+    def test_exhausted_pool_times_out(self):
+        conn_params = self.wrapper.get_connection_params()
+
+        with self.assertRaises(psycopg2.OperationalError):
+            self.wrapper.get_new_connection(conn_params)
+
+        metrics = ConnectionPools.render_prometheus()
+        self.assertIn('db_pool_timeouts_total{alias="test_pool"} 1', metrics)
+        self.assertIn('db_pool_connections_in_use{alias="test_pool"} 0', metrics)
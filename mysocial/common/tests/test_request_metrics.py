@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from common.request_context import RequestContext
+from common.test_helper import TestHelper
+from mysocial.settings import base
+
+
+class TestRequestContext(SimpleTestCase):
+    def test_fingerprint_ignores_arguments(self):
+        first = RequestContext.fingerprint("SELECT * FROM post WHERE id = 1 AND title = 'a'")
+        second = RequestContext.fingerprint("SELECT * FROM post WHERE id = 22 AND title = 'it''s'")
+        in_list = RequestContext.fingerprint('SELECT * FROM post WHERE id IN (%s, %s, %s)')
+
+        self.assertEqual(first, second)
+        self.assertEqual(in_list, 'SELECT * FROM post WHERE id IN (...)')
+
+    def test_duplicate_queries(self):
+        context = RequestContext()
+        for i in range(3):
+            context.record_query(f'SELECT * FROM comment WHERE post_id = {i}', 0.001)
+        context.record_query('SELECT * FROM post', 0.001)
+
+        self.assertEqual(context.query_count, 4)
+        self.assertEqual(context.get_duplicate_queries(), [('SELECT * FROM comment WHERE post_id = ?', 3)])
+
+
+class TestRequestMetricsMiddleware(APITestCase):
+    def setUp(self) -> None:
+        self.author = TestHelper.create_author('author')
+        self.client.force_login(self.author)
+
+    def test_server_timing(self):
+        with mock.patch.object(base, 'REQUEST_METRICS_ENABLED', True):
+            with TestHelper.assert_max_queries(self, 10) as queries:
+                response = self.client.get(f'/authors/{self.author.official_id}/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        server_timing = response.headers['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', server_timing)
+        self.assertIn('desc="0 calls"', server_timing)
+
+    def test_disabled(self):
+        response = self.client.get(f'/authors/{self.author.official_id}/')
+
+        self.assertNotIn('Server-Timing', response.headers)
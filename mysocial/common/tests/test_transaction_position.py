@@ -0,0 +1,14 @@
+from django.test import SimpleTestCase
+
+from common.transaction_position import TransactionPosition
+
+
+class TestTransactionPosition(SimpleTestCase):
+    def test_parse(self):
+        self.assertEqual(TransactionPosition.parse(TransactionPosition.format((812, 45))), (812, 45))
+        # plain ids are from before transactions were recorded
+        self.assertEqual(TransactionPosition.parse('45'), (0, 45))
+
+        for token in ('', 'first', '1.2.3', '-1', '3.-1'):
+            with self.assertRaises(ValueError):
+                TransactionPosition.parse(token)
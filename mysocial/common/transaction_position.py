@@ -0,0 +1,59 @@
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+class TransactionPosition:
+    """
+    Positions in a log of rows that remember the transaction that wrote them (pg_current_xact_id()), for readers that
+    resume where they stopped: ChangeFeed and InboxStream.
+
+    Ids are handed out when rows are written but the rows only become visible when their transaction commits, so
+    reading in id order can pass a row that commits later. Rows are read in (transaction_id, id) order instead, and only
+    once their transaction is older than every one still running (pg_snapshot_xmin): no row can show up later before a
+    position that was already read.
+
+    Example how to use::
+
+        entries = ChangeEntry.objects.filter(TransactionPosition.get_after_condition(since),
+                                             TransactionPosition.get_settled_condition())
+        entries = entries.order_by('transaction_id', 'id')
+    """
+
+    XMIN_SQL = 'pg_snapshot_xmin(pg_current_snapshot())::text::bigint'
+
+    @staticmethod
+    def get_after_condition(position: tuple) -> Q:
+        transaction_id, row_id = position
+        # the >= is implied but lets an index on (transaction_id, id) start at the position
+        return Q(transaction_id__gte=transaction_id) & (Q(transaction_id__gt=transaction_id) | Q(id__gt=row_id))
+
+    @staticmethod
+    def get_settled_condition() -> Q:
+        """The rows of transactions older than every running one; those of the reader's own are final to it too"""
+        return Q(transaction_id__lt=RawSQL(TransactionPosition.XMIN_SQL, [])) | \
+            Q(transaction_id=RawSQL('pg_current_xact_id_if_assigned()::text::bigint', []))
+
+    @staticmethod
+    def get_unsettled_start() -> tuple:
+        """The position before every row that isn't settled yet; where a reader that only wants what's new starts"""
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT {TransactionPosition.XMIN_SQL}')
+            return cursor.fetchone()[0], 0
+
+    @staticmethod
+    def format(position: tuple) -> str:
+        return f'{position[0]}.{position[1]}'
+
+    @staticmethod
+    def parse(token: str) -> tuple:
+        """
+        :return: (transaction_id, id) from a token of format; a plain id, as tokens were before transactions were
+        recorded, is a position among the rows written before that
+        :raises ValueError: if token isn't a position
+        """
+        transaction_id, _, row_id = token.rpartition('.')
+        position = (int(transaction_id or 0), int(row_id))
+        if min(position) < 0:
+            raise ValueError(token)
+        return position
@@ -1,6 +1,8 @@
+import asyncio
 import logging
 import types
 
+from asgiref.sync import sync_to_async
 from django.http.response import HttpResponse, HttpResponseNotFound
 from rest_framework.request import Request
 
@@ -32,7 +34,7 @@ def get_followers(target: Author):
         else:
             node_config: NodeConfigBase = base.REMOTE_CONFIG.get(target.host)
             if node_config is None:
-                print(f"FollowUtil: get_followers: missing NodeConfig: {target.host}")
+                logger.warning(f"FollowUtil: get_followers: missing NodeConfig: {target.host}")
                 return []
             follower_list = node_config.get_all_followers(target)
             follower_url_list = []
@@ -50,7 +52,7 @@ def get_followers(target: Author):
             if err is None:
                 author_list.append(author)
             else:
-                print(f"get_followers: Failed getting author from url {author_url} with error: {err}")
+                logger.warning(f"get_followers: Failed getting author from url {author_url} with error: {err}")
 
         return author_list
 
@@ -62,7 +64,7 @@ def get_follow_object(cls, request: Request, target_id: str, follower_id: str) -
         except Follow.DoesNotExist:
             return None, HttpResponseNotFound("User not exist on our end")
         except Exception as e:
-            print(f"{cls}: {e}")
+            logger.warning(f"{cls}: {e}")
             return None, HttpResponseNotFound("User not exist on our end")
 
         try:
@@ -71,7 +73,7 @@ def get_follow_object(cls, request: Request, target_id: str, follower_id: str) -
             return None, HttpResponseNotFound(
                 "The given follower does not seem to exist as a user in any connected nodes")
         except Exception as e:
-            print(f"{cls}: {e}")
+            logger.warning(f"{cls}: {e}")
             return None, HttpResponseNotFound("The given follower does not seem to exist as a user")
 
         if target.is_local():
@@ -86,13 +88,13 @@ def get_follow_object(cls, request: Request, target_id: str, follower_id: str) -
             except Follow.DoesNotExist:
                 return None, HttpResponseNotFound("User does not follow the following author on our end")
             except Exception as e:
-                print(f"{cls}: {e}")
+                logger.warning(f"{cls}: {e}")
                 return None, HttpResponseNotFound("User does not follow the following author on our end")
         else:
             # trust THEIR data
             node_config: NodeConfigBase = base.REMOTE_CONFIG.get(target.host)
             if node_config is None:
-                print(f"{cls}: get: unknown host: {target.host}")
+                logger.warning(f"{cls}: get: unknown host: {target.host}")
                 return None, HttpResponseNotFound()
 
             follow = node_config.get_remote_follow(target, follower)
@@ -150,7 +152,37 @@ def get_following_authors(actor: Author):
             if err is None:
                 author_list.append(author)
             else:
-                print(f"get_followers: Failed getting author from url {author_url} with error: {err}")
+                logger.warning(f"get_followers: Failed getting author from url {author_url} with error: {err}")
+
+        return author_list
+
+    @staticmethod
+    async def aget_following_authors(actor: Author):
+        """Async version of get_following_authors; remote authors are fetched at the same time"""
+        following_ids = await sync_to_async(list)(
+            Follow.objects.values_list('target', flat=True).filter(actor=actor.get_url(), has_accepted=True))
+        return await FollowUtil._afrom_author_urls(following_ids)
+
+    @staticmethod
+    async def aget_followers(target: Author):
+        """Async version of get_followers; remote followers of a local author are fetched at the same time"""
+        if not target.is_local():
+            return await sync_to_async(FollowUtil.get_followers)(target)
+
+        follower_url_list = await sync_to_async(list)(
+            Follow.objects.values_list('actor', flat=True).filter(target=target.get_url(), has_accepted=True))
+        return await FollowUtil._afrom_author_urls(follower_url_list)
+
+    @staticmethod
+    async def _afrom_author_urls(author_urls: list) -> list:
+        results = await asyncio.gather(*[AuthorUtil.afrom_author_url_to_author(url) for url in author_urls])
+
+        author_list = []
+        for author_url, (author, err) in zip(author_urls, results):
+            if err is None:
+                author_list.append(author)
+            else:
+                logger.warning(f"get_followers: Failed getting author from url {author_url} with error: {err}")
 
         return author_list
 
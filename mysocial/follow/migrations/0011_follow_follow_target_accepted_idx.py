@@ -0,0 +1,17 @@
+# Generated by Django 4.1.2 on 2026-10-19 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('follow', '0010_alter_follow_remote_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['target', 'has_accepted'], name='follow_target_accepted_idx'),
+        ),
+    ]
@@ -45,8 +45,13 @@ def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
     class Meta:
+        # also the index for who an actor follows (actor comes first)
         unique_together = (('actor', 'target'),)
         get_latest_by = 'id'
+        indexes = [
+            # an author's followers and follow requests; see FollowUtil.get_followers
+            models.Index(fields=['target', 'has_accepted'], name='follow_target_accepted_idx'),
+        ]
 
     def get_author_actor(self) -> Author:
         """Get the author object for the given actor in actor url"""
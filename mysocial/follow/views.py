@@ -127,7 +127,7 @@ def get(request: Request, follow_id: str = None) -> HttpResponse:
         except Follow.DoesNotExist:
             return HttpResponseNotFound()
         except Exception as e:
-            print(f'IncomingRequestPutView: put: unknown error: {e}')
+            logger.warning(f'IncomingRequestPutView: put: unknown error: {e}')
             return HttpResponseBadRequest()
 
     @staticmethod
@@ -156,7 +156,7 @@ def put(request: Request, follow_id: str = None) -> HttpResponse:
         except Follow.DoesNotExist:
             return HttpResponseNotFound()
         except Exception as e:
-            print(f'IncomingRequestPutView: put: unknown error: {e}')
+            logger.warning(f'IncomingRequestPutView: put: unknown error: {e}')
             return HttpResponseBadRequest()
 
     @staticmethod
@@ -180,7 +180,7 @@ def delete(request: Request, follow_id: str = None) -> HttpResponse:
         except Follow.DoesNotExist:
             return HttpResponseNotFound()
         except Exception as e:
-            print(f'IncomingRequestPutView: put: unknown error: {e}')
+            logger.warning(f'IncomingRequestPutView: put: unknown error: {e}')
             return HttpResponseBadRequest()
 
 
@@ -223,7 +223,7 @@ def get(request: Request, author_id: str = None) -> HttpResponse:
         except Author.DoesNotExist:
             return HttpResponseNotFound()
         except Exception as e:
-            print(f"FollowersView: get: unknown errr: {e}")
+            logger.warning(f"FollowersView: get: unknown errr: {e}")
             return HttpResponseNotFound()
 
         if not author.is_local():
@@ -315,7 +315,7 @@ def post(request: Request, author_id: str = None) -> HttpResponse:
             except Author.DoesNotExist:
                 return HttpResponseNotFound()
             except Exception as e:
-                print(f"FollowersView: Unknown error: {e}")
+                logger.warning(f"FollowersView: Unknown error: {e}")
                 return HttpResponseNotFound()
 
             if target_author.is_local():
@@ -349,7 +349,7 @@ def post_local_follow_local(request: Request, author_target: Author) -> HttpResp
         except IntegrityError:
             return HttpResponseBadRequest('You\'re either following this account or have already made a follow request')
         except Exception as e:
-            print(f'FollowersView: post: unknown error: {e}')
+            logger.warning(f'FollowersView: post: unknown error: {e}')
             return HttpResponseBadRequest()
         return Response(data=data, status=201)
 
@@ -357,7 +357,7 @@ def post_local_follow_local(request: Request, author_target: Author) -> HttpResp
     def post_local_follow_remote(request: Request, author_target: Author) -> HttpResponse:
         node_config: NodeConfigBase = base.REMOTE_CONFIG.get(author_target.host)
         if node_config is None:
-            print(f"post_local_follow_remote: missing config for host: {author_target.host}")
+            logger.warning(f"post_local_follow_remote: missing config for host: {author_target.host}")
             return HttpResponseNotFound()
         response_json = node_config.post_local_follow_remote(request.user, author_target)
         if isinstance(response_json, int):
@@ -380,7 +380,7 @@ def post_local_follow_remote(request: Request, author_target: Author) -> HttpRes
         except IntegrityError:
             return HttpResponseBadRequest('You\'re either following this account or have already made a follow request')
         except Exception as e:
-            print(f'FollowersView: post_local_follow_remote: post: unknown error: {e}')
+            logger.warning(f'FollowersView: post_local_follow_remote: post: unknown error: {e}')
             return HttpResponseBadRequest()
         return Response(data=data, status=201)
 
@@ -402,7 +402,7 @@ def post_remote_follow_local(request: Request, author_id: str = None) -> HttpRes
             actor_url = request.data['actor']
             actor, err = AuthorUtil.from_author_url_to_author(actor_url)
             if err is not None:
-                print(f'FollowersView: post_remote_follow_local: Author cannot be found: {actor_url}')
+                logger.warning(f'FollowersView: post_remote_follow_local: Author cannot be found: {actor_url}')
                 return HttpResponseNotFound(
                     f'FollowersView: post_remote_follow_local: Author cannot be found: {actor_url}')
 
@@ -415,13 +415,13 @@ def post_remote_follow_local(request: Request, author_id: str = None) -> HttpRes
             serializers = FollowRequestSerializer(follow)
             data = serializers.data
         except Author.DoesNotExist:
-            print(f"Local author does not exist: {author_id}")
+            logger.warning(f"Local author does not exist: {author_id}")
             return HttpResponseNotFound()
         except IntegrityError as e:
-            print(f'Integrity error: {e}')
+            logger.warning(f'Integrity error: {e}')
             return HttpResponseBadRequest('You\'re either following this account or have already made a follow request')
         except Exception as e:
-            print(f'FollowersView: post: unknown error: {e}')
+            logger.warning(f'FollowersView: post: unknown error: {e}')
             return HttpResponseBadRequest()
         normal_success = 201
         if target.host in (Team14Local.domain, Team14Main.domain):
@@ -474,7 +474,7 @@ def get(request: Request, target_id: str, follower_id: str) -> HttpResponse:
         try:
             follow_json = follow_serializer.data
         except Exception as e:
-            print(f'FollowersIndividualView: Bad serialization error: {e}')
+            logger.warning(f'FollowersIndividualView: Bad serialization error: {e}')
             return HttpResponseNotFound()
 
         if follow.has_accepted:
@@ -582,15 +582,15 @@ def delete(cls, request: Request, target_id: str, follower_id: str):
             if not target.is_local():
                 node_config: NodeConfigBase = base.REMOTE_CONFIG.get(target.host)
                 if node_config is None:
-                    print(f"FollowersIndividualView: delete: cannot find node_config: {target.host}")
+                    logger.warning(f"FollowersIndividualView: delete: cannot find node_config: {target.host}")
                     return HttpResponseNotFound()
                 # todo
                 response = node_config.delete_local_follow_remote(author_target=follow.get_author_target(),
                                                                   author_actor=follow.get_author_actor())
                 if response is int:
-                    print(f"{cls}: delete: unknown status code: {response}")
+                    logger.warning(f"{cls}: delete: unknown status code: {response}")
         except Exception as e:
-            print(f'{cls}: delete: unknown error: {e}')
+            logger.warning(f'{cls}: delete: unknown error: {e}')
 
         follow_serializer = FollowRequestSerializer(follow)
         follow_json = follow_serializer.data
@@ -1,4 +1,18 @@
 from django.contrib import admin
-from .models import Inbox
+from .models import DeliveryStatus, Inbox, InboxDelivery
 
-admin.site.register(Inbox)
\ No newline at end of file
+admin.site.register(Inbox)
+
+
+class InboxDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'node', 'target_author_id', 'status', 'status_code', 'attempts', 'created', 'processed')
+    list_filter = ('status',)
+    readonly_fields = ('node', 'target_author_id', 'created', 'processed')
+    actions = ('retry',)
+
+    @admin.action(description='Process again')
+    def retry(self, request, queryset):
+        queryset.update(status=DeliveryStatus.PENDING, attempts=0, status_code=None, error='', processed=None)
+
+
+admin.site.register(InboxDelivery, InboxDeliveryAdmin)
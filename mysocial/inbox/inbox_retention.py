@@ -0,0 +1,98 @@
+import logging
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from inbox.models import ArchivedInboxItem, Inbox, InboxItem
+from mysocial.settings import base
+
+logger = logging.getLogger(__name__)
+
+
+class InboxRetention:
+    """
+    Moves the items that are past base.INBOX_RETENTION out of their inboxes and into ArchivedInboxItem, a batch per
+    transaction, so it can run (and be stopped) while the server is up; see compact_inboxes.
+
+    Example how to use::
+
+        retention = InboxRetention(base.INBOX_RETENTION)
+        for inbox_id in retention.get_inbox_ids(now):
+            retention.compact(inbox_id, now)
+    """
+
+    def __init__(self, retention: dict = None):
+        retention = base.INBOX_RETENTION if retention is None else retention
+        self.max_items = retention.get('MAX_ITEMS')
+        self.max_age_days = retention.get('MAX_AGE_DAYS')
+        self.type_rules = {item_type.lower(): rule for item_type, rule in retention.get('TYPES', {}).items()}
+        self.kept_types = [item_type for item_type, rule in self.type_rules.items() if rule.get('KEEP')]
+
+    def get_items(self):
+        """Items the rules apply to"""
+        return InboxItem.objects.exclude(type__in=self.kept_types)
+
+    def get_expired_condition(self, now: datetime) -> Q:
+        """Items older than the max age of their type; an empty Q if no type has one"""
+        overridden_types = [item_type for item_type, rule in self.type_rules.items()
+                            if 'MAX_AGE_DAYS' in rule and item_type not in self.kept_types]
+        condition = Q()
+        if self.max_age_days is not None:
+            condition |= Q(received__lt=now - timedelta(days=self.max_age_days)) & ~Q(type__in=overridden_types)
+        for item_type in overridden_types:
+            max_age_days = self.type_rules[item_type]['MAX_AGE_DAYS']
+            if max_age_days is not None:
+                condition |= Q(type=item_type, received__lt=now - timedelta(days=max_age_days))
+        return condition
+
+    def get_inbox_ids(self, now: datetime) -> list:
+        """Ids of the inboxes that have something to archive"""
+        inbox_ids = set()
+        expired = self.get_expired_condition(now)
+        if expired:
+            inbox_ids.update(self.get_items().filter(expired).values_list('inbox_id', flat=True).distinct())
+        if self.max_items is not None:
+            inbox_ids.update(self.get_items().values('inbox_id').annotate(count=Count('id'))
+                             .filter(count__gt=self.max_items).values_list('inbox_id', flat=True))
+        return sorted(inbox_ids)
+
+    def get_archivable_ids(self, inbox_id, now: datetime, limit: int) -> set:
+        """Up to limit items of each rule: the expired ones, oldest first, and the ones past max items"""
+        items = self.get_items().filter(inbox_id=inbox_id)
+        item_ids = set()
+        expired = self.get_expired_condition(now)
+        if expired:
+            item_ids.update(items.filter(expired).order_by('received', 'id').values_list('id', flat=True)[:limit])
+        if self.max_items is not None:
+            newest_first = items.order_by('-received', '-id').values_list('id', flat=True)
+            item_ids.update(newest_first[self.max_items:self.max_items + limit])
+        return item_ids
+
+    def compact(self, inbox_id, now: datetime, batch_size: int = 500) -> int:
+        """
+        Archives everything the rules say should go from the inbox.
+
+        :return: How many items were archived
+        """
+        archived = 0
+        while True:
+            item_ids = self.get_archivable_ids(inbox_id, now, batch_size)
+            if not item_ids:
+                return archived
+
+            with transaction.atomic():
+                items = list(InboxItem.objects.select_for_update().filter(id__in=item_ids))
+                ArchivedInboxItem.objects.bulk_create([ArchivedInboxItem.from_inbox_item(item, now) for item in items],
+                                                      ignore_conflicts=True)
+                InboxItem.objects.filter(id__in=[item.id for item in items]).delete()
+                # cached copies of the inbox are stale now; see ConditionalHelper. now is when the run started, so it
+                # could be older than the inbox's last change
+                Inbox.objects.filter(official_id=inbox_id).update(
+                    updated_at=Greatest(F('updated_at'), timezone.now()))
+            archived += len(items)
+            if len(items) == 0:
+                # removed since we looked, e.g. the inbox was cleared
+                return archived
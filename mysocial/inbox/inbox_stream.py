@@ -0,0 +1,161 @@
+import asyncio
+import contextlib
+import logging
+import weakref
+from collections import defaultdict
+
+import psycopg2
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from common.event_stream import EventStreamResponse
+from common.fast_json import FastJSON
+from common.transaction_position import TransactionPosition
+from inbox.models import Inbox, InboxItem
+
+logger = logging.getLogger(__name__)
+
+
+class InboxNotifier:
+    """
+    Wakes up inbox streams when their inbox gets new items.
+
+    Every event loop (so every ASGI worker) has one connection that LISTENs on Inbox.NOTIFY_CHANNEL, shared by all of
+    its streams; Inbox.add_to_inboxes sends the NOTIFY. Without the connection (e.g. it dropped), streams still find
+    new items at their next heartbeat.
+    """
+    _notifiers = weakref.WeakKeyDictionary()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.connection = None
+        self.lock = asyncio.Lock()
+        self.subscribers = defaultdict(set)
+
+    @staticmethod
+    def get() -> 'InboxNotifier':
+        loop = asyncio.get_running_loop()
+        notifier = InboxNotifier._notifiers.get(loop)
+        if notifier is None:
+            notifier = InboxNotifier(loop)
+            InboxNotifier._notifiers[loop] = notifier
+        return notifier
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, inbox_id: str):
+        """Yields an asyncio.Event that is set whenever the inbox gets items"""
+        await self.listen()
+        event = asyncio.Event()
+        self.subscribers[inbox_id].add(event)
+        try:
+            yield event
+        finally:
+            self.subscribers[inbox_id].discard(event)
+            if not self.subscribers[inbox_id]:
+                del self.subscribers[inbox_id]
+
+    async def listen(self):
+        async with self.lock:
+            if self.connection is not None:
+                return
+            try:
+                self.connection = await sync_to_async(InboxNotifier.connect, thread_sensitive=False)()
+            except psycopg2.Error as e:
+                logger.warning(f'InboxNotifier: could not listen, streams fall back to heartbeats: {e}')
+                return
+            self.loop.add_reader(self.connection.fileno(), self.on_readable)
+
+    @staticmethod
+    def connect():
+        connection = psycopg2.connect(**connections['default'].get_connection_params())
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {Inbox.NOTIFY_CHANNEL}')
+        return connection
+
+    def on_readable(self):
+        try:
+            self.connection.poll()
+        except psycopg2.Error as e:
+            logger.warning(f'InboxNotifier: lost the connection: {e}')
+            self.close()
+            return
+
+        inbox_ids = {notify.payload for notify in self.connection.notifies}
+        self.connection.notifies.clear()
+        for inbox_id in inbox_ids:
+            for event in self.subscribers.get(inbox_id, ()):
+                event.set()
+
+    def close(self):
+        if self.connection is None:
+            return
+        with contextlib.suppress(Exception):
+            self.loop.remove_reader(self.connection.fileno())
+        with contextlib.suppress(Exception):
+            self.connection.close()
+        self.connection = None
+        # anything missed in between is picked up when they look
+        for events in self.subscribers.values():
+            for event in events:
+                event.set()
+
+
+class InboxStream:
+    """
+    The Server-Sent Events of an inbox; see InboxStreamView. Event ids are positions (see TransactionPosition), so a
+    client that reconnects gets the items it missed, even ones that were added by a transaction that committed late.
+    An item held back behind another inbox's transaction is sent at the next heartbeat at the latest.
+    """
+    HEARTBEAT_SECONDS = 15
+    # how long clients wait before reconnecting
+    RETRY_MILLISECONDS = 5000
+    # items sent per database read
+    BATCH_SIZE = 100
+
+    @staticmethod
+    def get_items_after(inbox: Inbox, position: tuple, types: list) -> list:
+        """The next items after position whose transactions settled, in order"""
+        items = inbox.inbox_items.filter(TransactionPosition.get_after_condition(position),
+                                         TransactionPosition.get_settled_condition())
+        if types is not None:
+            items = items.filter(type__in=types)
+        return list(items.order_by('transaction_id', 'id')[:InboxStream.BATCH_SIZE])
+
+    @staticmethod
+    def get_start() -> tuple:
+        """Where a stream of only new items starts; items that committed just before may be sent too"""
+        return TransactionPosition.get_unsettled_start()
+
+    @staticmethod
+    def format_item(item: InboxItem) -> str:
+        return EventStreamResponse.format_event(FastJSON.dumps_str(item.data),
+                                                event_id=TransactionPosition.format((item.transaction_id, item.id)),
+                                                event=item.type)
+
+    @staticmethod
+    def format_retry() -> str:
+        return f'retry: {InboxStream.RETRY_MILLISECONDS}\n\n'
+
+    @staticmethod
+    async def stream(inbox: Inbox, position: tuple, types: list):
+        """Yields the items after position, then new items as they arrive, with a heartbeat comment when idle"""
+        yield InboxStream.format_retry()
+        notifier = InboxNotifier.get()
+        async with notifier.subscribe(str(inbox.official_id)) as new_items:
+            while True:
+                # cleared before reading, so items that arrive while we read wake us up again right away
+                new_items.clear()
+                items = await sync_to_async(InboxStream.get_items_after)(inbox, position, types)
+                for item in items:
+                    yield InboxStream.format_item(item)
+                    position = (item.transaction_id, item.id)
+                if len(items) == InboxStream.BATCH_SIZE:
+                    continue
+
+                try:
+                    await asyncio.wait_for(new_items.wait(), InboxStream.HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': heartbeat\n\n'
+                    # in case the connection dropped since
+                    await notifier.listen()
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+
+from authors.models.author import Author
+from authors.serializers.author_serializer import AuthorSerializer
+from authors.util import AuthorUtil
+from comment.serializers import InboxCommentSerializer
+from common.fast_json import FastJSON
+from inbox.models import DeliveryStatus, Inbox, InboxDelivery, ItemType
+from likes.models import Like, LikeType
+from likes.serializers import LikeSerializer
+from mysocial.settings import base
+from post.serializer import InboxPostSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class InboxUtil:
+    @staticmethod
+    async def aforward_to_followers(data: dict, followers: list) -> list:
+        """
+        Adds data (e.g. a post) to the inbox of every follower. Local inboxes are written directly; remote inboxes
+        get it through their node (see asend_many_to_remote_inbox), and all remote calls are made at the same time.
+
+        :param data: json of the item
+        :param followers: Authors, local or remote; see FollowUtil.get_followers
+        :return: List of (follower, response) for every remote follower, in order. If the call failed, the response
+        is the exception it raised.
+
+        Errors writing local inboxes are raised.
+        """
+        local_followers = [follower for follower in followers if follower.is_local()]
+        remote_followers = [follower for follower in followers if not follower.is_local()]
+
+        _, responses = await asyncio.gather(
+            sync_to_async(InboxUtil.add_to_local_inboxes)(data, local_followers),
+            InboxUtil.asend_many_to_remote_inbox([(data, follower) for follower in remote_followers]),
+        )
+        return list(zip(remote_followers, responses))
+
+    @staticmethod
+    def add_to_local_inboxes(data: dict, followers: list):
+        if not followers:
+            return
+        inboxes = Inbox.get_for_author_ids([follower.official_id for follower in followers])
+        missing = [follower for follower in followers if str(follower.official_id) not in inboxes]
+        if missing:
+            raise Inbox.DoesNotExist(f'InboxUtil: no inbox for {missing}')
+        Inbox.add_to_inboxes(list(inboxes.values()), data)
+
+    @staticmethod
+    def add_to_local_inboxes_in_bulk(entries: list, resolve_actors: bool = False) -> list:
+        """
+        Adds posts, comments and likes that nodes sent to the inboxes of our authors; what POST
+        /authors/{AUTHOR_ID}/inbox does for one item, but validated together and saved in one transaction. See
+        BulkInboxView.
+
+        :param entries: (author, item) pairs; author is the url or id of the local author whose inbox gets the item
+        :param resolve_actors: Fetch the author of every like from its node, like POSTing it alone does. Otherwise the
+        author json in the like is used when it has one.
+        :return: A result per entry, in order: {'status': the status code POSTing it alone would have had, 'error'}
+
+        Errors writing to the database are raised.
+        """
+        results = [{'status': status.HTTP_200_OK} for _ in entries]
+        author_ids = [InboxUtil.get_author_id(author) for author, _ in entries]
+        inboxes = Inbox.get_for_author_ids([author_id for author_id in author_ids if author_id is not None])
+
+        # (result, inbox, data) of the items that can be added, and the likes they need
+        pending = []
+        likes = {}
+        for (_, item), author_id, result in zip(entries, author_ids, results):
+            if author_id is None:
+                InboxUtil.fail(result, status.HTTP_400_BAD_REQUEST, 'author should be the url of one of our authors')
+                continue
+            inbox = inboxes.get(author_id)
+            if inbox is None:
+                InboxUtil.fail(result, status.HTTP_404_NOT_FOUND, f'Could not get inbox for author: {author_id}')
+                continue
+
+            item_type = str(item.get('type', '')).lower()
+            if item_type in (ItemType.POST, ItemType.COMMENT):
+                serializer = InboxPostSerializer if item_type == ItemType.POST else InboxCommentSerializer
+                serializer = serializer(data = item)
+                if not serializer.is_valid():
+                    InboxUtil.fail(result, status.HTTP_400_BAD_REQUEST, serializer.errors)
+                    continue
+                pending.append((result, inbox, serializer.data))
+            elif item_type == ItemType.LIKE:
+                like, err = InboxUtil.to_like(item, resolve_actors)
+                if err is not None:
+                    InboxUtil.fail(result, status.HTTP_400_BAD_REQUEST, err)
+                    continue
+                if (like.author_id, like.object) in likes:
+                    InboxUtil.fail(result, status.HTTP_400_BAD_REQUEST, 'Liked twice in this request')
+                    continue
+                likes[(like.author_id, like.object)] = like
+                pending.append((result, inbox, like))
+            else:
+                # follow requests go to /authors/{AUTHOR_ID}/followers/
+                InboxUtil.fail(result, status.HTTP_400_BAD_REQUEST, 'Could not find item type')
+
+        # likes that already exist are refused, same as for one item
+        existing = set()
+        if likes:
+            existing = set(Like.objects.filter(author_id__in = {author_id for author_id, _ in likes},
+                                               object__in = {like_object for _, like_object in likes})
+                           .values_list('author_id', 'object'))
+        items = []
+        for result, inbox, data in pending:
+            if isinstance(data, Like):
+                if (data.author_id, data.object) in existing:
+                    InboxUtil.fail(result, status.HTTP_400_BAD_REQUEST, 'Could not create Like object. Maybe you '
+                                                                        'tried to like something twice')
+                    continue
+                data = LikeSerializer(data).data
+            items.append((inbox, data))
+
+        with transaction.atomic():
+            new_likes = [like for key, like in likes.items() if key not in existing]
+            # a like saved by a request running at the same time is skipped rather than failing the batch
+            Like.objects.bulk_create(new_likes, ignore_conflicts = True)
+            Inbox.add_items(items)
+        return results
+
+    @staticmethod
+    def process_deliveries(batch_size: int = 100) -> int:
+        """
+        Adds the oldest pending InboxDeliveries to their inboxes, like POSTing them without Prefer would have, and
+        records the result of each. Workers running at the same time take different deliveries.
+
+        The batch is claimed first, so no row stays locked while the authors of its likes are fetched from their nodes.
+
+        :return: How many deliveries were processed; 0 when none are pending
+        """
+        deliveries = InboxUtil.claim_deliveries(batch_size)
+        if deliveries:
+            InboxUtil.process_delivery_batch(deliveries)
+            InboxDelivery.objects.bulk_update(deliveries,
+                                              ['status', 'attempts', 'status_code', 'error', 'processed'])
+        return len(deliveries)
+
+    @staticmethod
+    def claim_deliveries(batch_size: int) -> list:
+        """Marks the oldest pending deliveries as processing and returns them; claims of workers that died are let go"""
+        now = timezone.now()
+        InboxDelivery.objects.filter(
+            status=DeliveryStatus.PROCESSING,
+            claimed__lt=now - timedelta(seconds=InboxDelivery.CLAIM_TIMEOUT_SECONDS),
+        ).update(status=DeliveryStatus.PENDING)
+
+        with transaction.atomic():
+            deliveries = list(InboxDelivery.objects.select_for_update(skip_locked=True)
+                              .filter(status=DeliveryStatus.PENDING).order_by('id')[:batch_size])
+            for delivery in deliveries:
+                delivery.status = DeliveryStatus.PROCESSING
+                delivery.claimed = now
+            InboxDelivery.objects.bulk_update(deliveries, ['status', 'claimed'])
+        return deliveries
+
+    @staticmethod
+    def process_delivery_batch(deliveries: list):
+        """Updates the deliveries with their results, without saving them"""
+        try:
+            # the sender is not waiting, so the author of every like is fetched like for a single POST; the items
+            # are saved in a transaction of their own once that's done
+            results = InboxUtil.add_to_local_inboxes_in_bulk(
+                [(str(delivery.target_author_id), delivery.data) for delivery in deliveries], resolve_actors=True)
+        except Exception as e:
+            if len(deliveries) > 1:
+                # one at a time, so a delivery that keeps raising doesn't hold back the others
+                for delivery in deliveries:
+                    InboxUtil.process_delivery_batch([delivery])
+                return
+            logger.exception(e)
+            delivery = deliveries[0]
+            delivery.attempts += 1
+            delivery.error = f'{type(e).__name__}: {e}'
+            if delivery.attempts >= InboxDelivery.MAX_ATTEMPTS:
+                delivery.status = DeliveryStatus.FAILED
+                delivery.processed = timezone.now()
+            else:
+                delivery.status = DeliveryStatus.PENDING
+            return
+
+        processed = timezone.now()
+        for delivery, result in zip(deliveries, results):
+            delivery.attempts += 1
+            delivery.status_code = result['status']
+            delivery.status = DeliveryStatus.DONE if result['status'] == status.HTTP_200_OK else DeliveryStatus.FAILED
+            delivery.error = FastJSON.dumps_str(result['error']) if 'error' in result else ''
+            delivery.processed = processed
+
+    @staticmethod
+    def get_author_id(author: str) -> str:
+        """The id of an author url (or id), or None if it isn't one"""
+        try:
+            return str(uuid.UUID(AuthorUtil.from_author_url_to_local_id(author.rstrip('/'))))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def to_like(item: dict, resolve_actor: bool) -> (Like, str):
+        """Same as InboxView.remote_likes_local; see add_to_local_inboxes_in_bulk"""
+        actor_url = item.get('actor')
+        json_author = item.get('author')
+        if not actor_url and isinstance(json_author, dict):
+            actor_url = json_author.get('url') or json_author.get('id')
+        if not isinstance(actor_url, str) or not isinstance(item.get('object'), str):
+            return None, 'A like needs an actor (or author) and an object'
+
+        if resolve_actor or not isinstance(json_author, dict):
+            requesting_author, err = AuthorUtil.from_author_url_to_author(actor_url)
+            if err is not None:
+                return None, f'Could not get remote requesting author from url: {actor_url}'
+            json_author = AuthorSerializer(requesting_author).data
+
+        object_id = item['object']
+        object_type = LikeType.COMMENT if 'comment' in object_id else LikeType.POST
+        like = Like(author = json_author, author_id = AuthorUtil.from_author_url_to_local_id(actor_url.rstrip('/')),
+                    object = object_id, object_type = object_type)
+        return like, None
+
+    @staticmethod
+    def fail(result: dict, status_code: int, error):
+        result['status'] = status_code
+        result['error'] = error
+
+    @staticmethod
+    async def asend_to_remote_inbox(data: dict, follower: Author):
+        node_config = base.REMOTE_CONFIG.get(follower.host)
+        if node_config is None:
+            raise ValueError(f'InboxUtil: missing NodeConfig: {follower.host}')
+        return await node_config.asend_to_remote_inbox(data=data, target_author_url=follower.get_url())
+
+    @staticmethod
+    async def asend_many_to_remote_inbox(items: list) -> list:
+        """
+        Sends many items to remote inboxes with one call per node when the node has a bulk inbox (see
+        NodeConfigBase.send_many_to_remote_inbox). The calls to different nodes are made at the same time.
+
+        :param items: (data, author) pairs; the authors are remote
+        :return: The response of every item, in order, or the exception sending it raised
+        """
+        responses = [None] * len(items)
+        indexes_by_host = {}
+        for index, (_, author) in enumerate(items):
+            if author.host in base.REMOTE_CONFIG:
+                indexes_by_host.setdefault(author.host, []).append(index)
+            else:
+                responses[index] = ValueError(f'InboxUtil: missing NodeConfig: {author.host}')
+
+        hosts = list(indexes_by_host)
+        node_responses = await asyncio.gather(*[
+            base.REMOTE_CONFIG[host].asend_many_to_remote_inbox(
+                [(items[index][0], items[index][1].get_url()) for index in indexes_by_host[host]])
+            for host in hosts
+        ], return_exceptions=True)
+        for host, host_responses in zip(hosts, node_responses):
+            indexes = indexes_by_host[host]
+            if isinstance(host_responses, Exception):
+                host_responses = [host_responses] * len(indexes)
+            for index, response in zip(indexes, host_responses):
+                responses[index] = response
+        return responses
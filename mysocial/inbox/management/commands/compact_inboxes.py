@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inbox.inbox_retention import InboxRetention
+
+
+class Command(BaseCommand):
+    help = 'Moves the inbox items that are past INBOX_RETENTION to the archive; safe to run while the server is up'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='items archived per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='only list the inboxes with items to archive')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        retention = InboxRetention()
+        inbox_ids = retention.get_inbox_ids(now)
+        if options['dry_run']:
+            for inbox_id in inbox_ids:
+                self.stdout.write(str(inbox_id))
+            self.stdout.write(self.style.SUCCESS(f'{len(inbox_ids)} inboxes have items to archive'))
+            return
+
+        total = 0
+        for inbox_id in inbox_ids:
+            archived = retention.compact(inbox_id, now, options['batch_size'])
+            if archived:
+                self.stdout.write(f'{inbox_id}: archived {archived} items')
+            total += archived
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} items from {len(inbox_ids)} inboxes'))
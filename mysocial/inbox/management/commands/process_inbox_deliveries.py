@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inbox.inbox_util import InboxUtil
+
+
+class Command(BaseCommand):
+    help = 'Adds the items nodes sent with "Prefer: respond-async" to their inboxes (see InboxDelivery); the worker ' \
+           'process of the Procfile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='stop once nothing is pending instead of waiting')
+        parser.add_argument('--batch-size', type=int, default=100, help='deliveries added per transaction')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='seconds to wait before looking again when nothing is pending')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = InboxUtil.process_deliveries(options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {total} deliveries'))
@@ -0,0 +1,20 @@
+# Generated by Django 4.1.2 on 2026-10-19 10:30
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inbox',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.2 on 2026-10-19 16:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def merge_duplicate_inboxes(apps, schema_editor):
+    """Before an author can only have one inbox: keeps each author's oldest inbox, with the items of all of them"""
+    Inbox = apps.get_model('inbox', 'Inbox')
+    Author = apps.get_model(settings.AUTH_USER_MODEL)
+
+    duplicated_author_ids = (Inbox.objects.values('author_id').annotate(count=models.Count('official_id'))
+                             .filter(count__gt=1).values_list('author_id', flat=True))
+    for author_id in list(duplicated_author_ids):
+        inboxes = list(Inbox.objects.filter(author_id=author_id).order_by('updated_at'))
+        kept = inboxes[0]
+        for inbox in inboxes[1:]:
+            kept.items += inbox.items
+        kept.save()
+        Inbox.objects.filter(official_id__in=[inbox.official_id for inbox in inboxes[1:]]).delete()
+
+    # authors bulk created without the post_save signal never got one
+    Inbox.objects.bulk_create([Inbox(author=author) for author in Author.objects.filter(inbox__isnull=True)])
+    # the new rows' author foreign keys are checked at commit; check them now, since Postgres won't ALTER inbox_inbox
+    # below while those checks are pending
+    schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inbox', '0002_inbox_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_inboxes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='inbox',
+            name='author',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
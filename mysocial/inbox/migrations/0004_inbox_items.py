@@ -0,0 +1,64 @@
+# Generated by Django 4.1.2 on 2026-10-19 16:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import json
+
+
+def move_items_to_table(apps, schema_editor):
+    """Every item of an inbox's items array becomes an InboxItem, in the same order"""
+    Inbox = apps.get_model('inbox', 'Inbox')
+    InboxItem = apps.get_model('inbox', 'InboxItem')
+
+    for inbox in Inbox.objects.exclude(items=[]).iterator(chunk_size=100):
+        inbox_items = []
+        for item in inbox.items:
+            data = json.loads(item) if isinstance(item, str) else item
+            # when each arrived wasn't stored; ids keep their order
+            inbox_items.append(InboxItem(inbox=inbox, type=str(data.get('type', ''))[:20].lower(), data=data,
+                                         received=inbox.updated_at))
+        InboxItem.objects.bulk_create(inbox_items)
+
+
+def move_items_to_array(apps, schema_editor):
+    Inbox = apps.get_model('inbox', 'Inbox')
+    InboxItem = apps.get_model('inbox', 'InboxItem')
+
+    for inbox in Inbox.objects.iterator(chunk_size=100):
+        items = InboxItem.objects.filter(inbox=inbox).order_by('received', 'id').values_list('data', flat=True)
+        inbox.items = [json.dumps(data) for data in items]
+        inbox.save(update_fields=['items'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbox', '0003_inbox_author_one_to_one'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxItem',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('type', models.CharField(max_length=20)),
+                ('data', models.JSONField()),
+                ('received', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inbox', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_items', to='inbox.inbox')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='inboxitem',
+            index=models.Index(fields=['inbox', '-received', '-id'], name='inboxitem_inbox_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inboxitem',
+            index=models.Index(fields=['inbox', 'type', '-received', '-id'], name='inboxitem_inbox_type_idx'),
+        ),
+        migrations.RunPython(move_items_to_table, move_items_to_array),
+        migrations.RemoveField(
+            model_name='inbox',
+            name='items',
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inbox', '0004_inbox_items'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxDelivery',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('target_author_id', models.UUIDField()),
+                ('data', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed', models.DateTimeField(blank=True, null=True)),
+                ('node', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'inbox deliveries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='inboxdelivery',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['id'], name='inboxdelivery_pending_idx'),
+        ),
+    ]
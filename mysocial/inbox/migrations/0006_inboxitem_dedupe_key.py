@@ -0,0 +1,73 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:09
+
+from django.db import migrations, models
+import hashlib
+
+
+def get_url(value) -> str:
+    if isinstance(value, dict):
+        value = value.get('id') or value.get('url')
+    return str(value).rstrip('/') if value else ''
+
+
+def get_dedupe_key(item_type: str, data: dict) -> str:
+    """InboxItem.get_dedupe_key as of this migration"""
+    if item_type in ('like', 'follow'):
+        actor = data.get('actor') or data.get('author')
+        target = data.get('object')
+        identity = f'{get_url(actor)} {get_url(target)}' if actor and target else None
+    else:
+        identity = get_url(data.get('id') or data.get('url'))
+    if not identity:
+        return None
+    return hashlib.sha256(f'{item_type} {identity}'.encode('utf-8')).hexdigest()
+
+
+def set_dedupe_keys(apps, schema_editor):
+    """Keys every item; of the items an inbox has more than once, only the first one is kept"""
+    InboxItem = apps.get_model('inbox', 'InboxItem')
+
+    seen = set()
+    keyed = []
+    duplicate_ids = []
+    for item in InboxItem.objects.order_by('id').only('id', 'inbox_id', 'type', 'data').iterator(chunk_size=1000):
+        item.dedupe_key = get_dedupe_key(item.type, item.data if isinstance(item.data, dict) else {})
+        if item.dedupe_key is None:
+            continue
+        if (item.inbox_id, item.dedupe_key) in seen:
+            duplicate_ids.append(item.id)
+            continue
+        seen.add((item.inbox_id, item.dedupe_key))
+        keyed.append(item)
+
+    InboxItem.objects.filter(id__in=duplicate_ids).delete()
+    InboxItem.objects.bulk_update(keyed, ['dedupe_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbox', '0005_inbox_delivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inboxitem',
+            name='dedupe_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(set_dedupe_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='inboxitem',
+            constraint=models.UniqueConstraint(fields=('inbox', 'dedupe_key'), name='inboxitem_inbox_dedupe_key_uniq'),
+        ),
+        migrations.AddField(
+            model_name='inboxdelivery',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='inboxdelivery',
+            constraint=models.UniqueConstraint(fields=('node', 'idempotency_key'), name='inboxdelivery_idempotency_key_uniq'),
+        ),
+    ]
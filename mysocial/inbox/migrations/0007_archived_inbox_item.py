@@ -0,0 +1,35 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbox', '0006_inboxitem_dedupe_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedInboxItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('type', models.CharField(max_length=20)),
+                ('data', models.JSONField()),
+                ('received', models.DateTimeField()),
+                ('dedupe_key', models.CharField(blank=True, max_length=64, null=True)),
+                ('archived', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inbox', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_items', to='inbox.inbox')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedinboxitem',
+            index=models.Index(fields=['inbox', '-received', '-id'], name='archived_inbox_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedinboxitem',
+            index=models.Index(fields=['inbox', 'type', '-received', '-id'], name='archived_inbox_type_idx'),
+        ),
+    ]
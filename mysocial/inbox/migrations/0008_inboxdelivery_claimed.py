@@ -0,0 +1,27 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbox', '0007_archived_inbox_item'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inboxdelivery',
+            name='claimed',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='inboxdelivery',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='inboxdelivery',
+            index=models.Index(condition=models.Q(('status', 'processing')), fields=['claimed'], name='inboxdelivery_claimed_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:53
+
+from django.db import migrations, models
+
+# stamps every new item with the transaction that adds it; see TransactionPosition
+CREATE_TRIGGER = '''
+CREATE FUNCTION inbox_item_transaction_id() RETURNS trigger AS $$
+BEGIN
+    NEW.transaction_id := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER inbox_item_transaction_id_trigger BEFORE INSERT ON inbox_inboxitem
+    FOR EACH ROW EXECUTE PROCEDURE inbox_item_transaction_id();
+'''
+
+DROP_TRIGGER = '''
+DROP TRIGGER IF EXISTS inbox_item_transaction_id_trigger ON inbox_inboxitem;
+DROP FUNCTION IF EXISTS inbox_item_transaction_id();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inbox', '0008_inboxdelivery_claimed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inboxitem',
+            name='transaction_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='inboxitem',
+            index=models.Index(fields=['inbox', 'transaction_id', 'id'], name='inboxitem_inbox_position_idx'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
@@ -1,10 +1,12 @@
-import json
-
-from django.db import models
+from django.db import connection, models
+import hashlib
 import uuid
-from django.contrib.postgres.fields import ArrayField
+from datetime import datetime
+
+from django.utils import timezone
 
-from common.uuid_encoder import UUIDEncoder
+from common.fast_json import FastJSON
+from common.request_cache import RequestCache
 
 
 # Create your models here.
@@ -16,10 +18,237 @@ class ItemType(models.TextChoices):
 
 class Inbox(models.Model):
     type = 'inbox'
-    author = models.ForeignKey('authors.Author', on_delete = models.CASCADE)
+    # every author has exactly one; made when the author is (see authors/signals.py)
+    author = models.OneToOneField('authors.Author', on_delete = models.CASCADE)
     official_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
-    items = ArrayField(models.JSONField(), blank = True, default = list)
+    # row version for conditional GETs; see ConditionalHelper. Bumped whenever items are added or removed
+    updated_at = models.DateTimeField(auto_now = True)
+
+    CACHE_NAMESPACE = 'inbox'
+    # Postgres NOTIFY channel; the payload is the inbox's id. See InboxNotifier
+    NOTIFY_CHANNEL = 'inbox_items'
+
+    @property
+    def items(self) -> list:
+        """Every item as a json string, oldest first; what this used to store. Prefer querying inbox_items"""
+        items = self.inbox_items.order_by('received', 'id').values_list('data', flat=True)
+        return [FastJSON.dumps_str(data) for data in items]
 
     def add_to_inbox(self, data):
-        self.items.append(json.dumps(data, cls=UUIDEncoder))
-        self.save()
+        Inbox.add_to_inboxes([self], data)
+
+    def clear(self):
+        """Deletes every item, archived ones too"""
+        self.inbox_items.all().delete()
+        self.archived_items.all().delete()
+        Inbox.touch([self])
+
+    @staticmethod
+    def add_to_inboxes(inboxes: list, data):
+        """Same as calling add_to_inbox on every inbox, but in three queries"""
+        Inbox.add_items([(inbox, data) for inbox in inboxes])
+
+    @staticmethod
+    def add_items(items: list):
+        """
+        Adds different items to different inboxes in three queries, e.g. a batch from another node (see
+        BulkInboxView). Items an inbox already has (see InboxItem.get_dedupe_key) are skipped, so adding the same
+        item again, e.g. when a node retries, is harmless.
+
+        :param items: (inbox, data) pairs, in the order they arrived
+        """
+        if not items:
+            return
+        received = timezone.now()
+        InboxItem.objects.bulk_create([
+            InboxItem(inbox=inbox, type=InboxItem.get_item_type(data), data=FastJSON.loads(FastJSON.dumps(data)),
+                      received=received, dedupe_key=InboxItem.get_dedupe_key(data))
+            for inbox, data in items
+        ], ignore_conflicts=True)
+        inboxes = list({inbox.official_id: inbox for inbox, _ in items}.values())
+        Inbox.touch(inboxes, received)
+        Inbox.notify(inboxes)
+
+    @staticmethod
+    def notify(inboxes: list):
+        """Wakes up the streams (see InboxStreamView) of these inboxes, in every process, once the transaction commits"""
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, inbox_id) FROM unnest(%s::text[]) AS inbox_id',
+                           [Inbox.NOTIFY_CHANNEL, [str(inbox.official_id) for inbox in inboxes]])
+
+    @staticmethod
+    def touch(inboxes: list, updated_at: datetime = None):
+        updated_at = updated_at or timezone.now()
+        Inbox.objects.filter(official_id__in=[inbox.official_id for inbox in inboxes]).update(updated_at=updated_at)
+        for inbox in inboxes:
+            inbox.updated_at = updated_at
+
+    @staticmethod
+    def get_for_author_id(author_id) -> 'Inbox':
+        """
+        Gets the inbox, and its author, of the author with the given id in one query. Inboxes already looked up during
+        this request come from the RequestCache.
+
+        :throws: Inbox.DoesNotExist if the author has no inbox, e.g. it's a remote author
+        """
+        author_id = str(author_id)
+        inbox = RequestCache.get(Inbox.CACHE_NAMESPACE, author_id)
+        if inbox is None:
+            inbox = Inbox.objects.select_related('author').get(author_id=author_id)
+            RequestCache.set(Inbox.CACHE_NAMESPACE, author_id, inbox)
+        return inbox
+
+    @staticmethod
+    def get_for_author_ids(author_ids: list) -> dict:
+        """
+        Same as get_for_author_id for many authors, in one query at most.
+
+        :return: Inboxes by author id (as str). Authors without an inbox are left out.
+        """
+        author_ids = [str(author_id) for author_id in author_ids]
+        inboxes = RequestCache.get_many(Inbox.CACHE_NAMESPACE, author_ids)
+        missing_ids = [author_id for author_id in author_ids if author_id not in inboxes]
+        if missing_ids:
+            for inbox in Inbox.objects.select_related('author').filter(author_id__in=missing_ids):
+                author_id = str(inbox.author_id)
+                RequestCache.set(Inbox.CACHE_NAMESPACE, author_id, inbox)
+                inboxes[author_id] = inbox
+        return inboxes
+
+
+class InboxItem(models.Model):
+    """One post, comment, follow or like sent to an inbox"""
+    id = models.BigAutoField(primary_key=True)
+    inbox = models.ForeignKey(Inbox, on_delete=models.CASCADE, related_name='inbox_items')
+    # lower case, e.g. "follow" for a "Follow"; see ItemType
+    type = models.CharField(max_length=20)
+    data = models.JSONField()
+    received = models.DateTimeField(default=timezone.now)
+    # the same item in the same inbox has the same key; see get_dedupe_key
+    dedupe_key = models.CharField(max_length=64, null=True, blank=True)
+    # the transaction that added it, set by a database trigger (see migration 0009); streams read items in
+    # (transaction_id, id) order, see InboxStream. 0 for items added before it was recorded
+    transaction_id = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # an inbox newest first, all of it or only some types; see InboxView.get
+            models.Index(fields=['inbox', '-received', '-id'], name='inboxitem_inbox_received_idx'),
+            models.Index(fields=['inbox', 'type', '-received', '-id'], name='inboxitem_inbox_type_idx'),
+            # what an inbox's stream resumes from; see InboxStream
+            models.Index(fields=['inbox', 'transaction_id', 'id'], name='inboxitem_inbox_position_idx'),
+        ]
+        constraints = [
+            # also the index duplicates are found with; items without a key are never duplicates
+            models.UniqueConstraint(fields=['inbox', 'dedupe_key'], name='inboxitem_inbox_dedupe_key_uniq'),
+        ]
+
+    @staticmethod
+    def get_item_type(data) -> str:
+        return str(data.get('type', ''))[:20].lower()
+
+    @staticmethod
+    def get_dedupe_key(data) -> str:
+        """
+        What identifies an item: its type and id (or url); for likes and follows, which have no id, who and what.
+        Hashed, since urls can be long.
+
+        :return: The key, or None if the item has nothing to identify it by
+        """
+        item_type = InboxItem.get_item_type(data)
+        if item_type in (ItemType.LIKE, ItemType.FOLLOW):
+            actor = data.get('actor') or data.get('author')
+            target = data.get('object')
+            identity = f'{InboxItem.get_url(actor)} {InboxItem.get_url(target)}' if actor and target else None
+        else:
+            identity = InboxItem.get_url(data.get('id') or data.get('url'))
+        if not identity:
+            return None
+        return hashlib.sha256(f'{item_type} {identity}'.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_url(value) -> str:
+        """The url of an author or object given as json (e.g. a follow's actor) or as its url"""
+        if isinstance(value, dict):
+            value = value.get('id') or value.get('url')
+        return str(value).rstrip('/') if value else ''
+
+
+class ArchivedInboxItem(models.Model):
+    """An InboxItem moved out of its inbox by compact_inboxes; see InboxRetention and InboxArchiveView"""
+    # the id it had as an InboxItem, so paging through the archive and the inbox works the same
+    id = models.BigIntegerField(primary_key=True)
+    inbox = models.ForeignKey(Inbox, on_delete=models.CASCADE, related_name='archived_items')
+    type = models.CharField(max_length=20)
+    data = models.JSONField()
+    received = models.DateTimeField()
+    dedupe_key = models.CharField(max_length=64, null=True, blank=True)
+    archived = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['inbox', '-received', '-id'], name='archived_inbox_received_idx'),
+            models.Index(fields=['inbox', 'type', '-received', '-id'], name='archived_inbox_type_idx'),
+        ]
+
+    @staticmethod
+    def from_inbox_item(item: InboxItem, archived: datetime) -> 'ArchivedInboxItem':
+        return ArchivedInboxItem(id=item.id, inbox_id=item.inbox_id, type=item.type, data=item.data,
+                                 received=item.received, dedupe_key=item.dedupe_key, archived=archived)
+
+
+class DeliveryStatus(models.TextChoices):
+    PENDING = 'pending'
+    # claimed by a worker that is adding it; see InboxUtil.process_deliveries
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+
+
+class InboxDelivery(models.Model):
+    """
+    An item a node POSTed to an inbox with `Prefer: respond-async`. It was accepted without being looked at; the
+    process_inbox_deliveries worker validates it and adds it to the inbox, or records why it couldn't.
+
+    Items POSTed with an Idempotency-Key and added right away are kept too, already done, to recognize the key.
+    """
+    id = models.BigAutoField(primary_key=True)
+    # the node that sent it; only it can see the delivery (see InboxDeliveryView)
+    node = models.ForeignKey('authors.Author', null=True, on_delete=models.SET_NULL, related_name='+')
+    target_author_id = models.UUIDField()
+    data = models.JSONField()
+    status = models.CharField(max_length=10, choices=DeliveryStatus.choices, default=DeliveryStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # what POSTing the item without Prefer would have answered, or the exception the worker ran into
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created = models.DateTimeField(default=timezone.now)
+    processed = models.DateTimeField(null=True, blank=True)
+    # when a worker last claimed it
+    claimed = models.DateTimeField(null=True, blank=True)
+    # the Idempotency-Key header of the request, if the node sent one; see InboxView.post_idempotently
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True)
+
+    # attempts before a delivery that keeps raising is failed
+    MAX_ATTEMPTS = 5
+    # a claim this old is taken to belong to a worker that died, and the delivery is pending again
+    CLAIM_TIMEOUT_SECONDS = 15 * 60
+    MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+    class Meta:
+        verbose_name_plural = 'inbox deliveries'
+        indexes = [
+            # the worker's queue, oldest first
+            models.Index(fields=['id'], name='inboxdelivery_pending_idx', condition=models.Q(status='pending')),
+            models.Index(fields=['claimed'], name='inboxdelivery_claimed_idx',
+                         condition=models.Q(status='processing')),
+        ]
+        constraints = [
+            # also how a repeated key is found
+            models.UniqueConstraint(fields=['node', 'idempotency_key'], name='inboxdelivery_idempotency_key_uniq'),
+        ]
+
+    def get_status_path(self) -> str:
+        return f'/inbox/deliveries/{self.id}'
@@ -1,16 +1,17 @@
 # models
-from common.uuid_encoder import UUIDEncoder
-from .models import Inbox
-from authors.models.author import Author
-from post.models import Post
-from comment.models import Comment
-import json
+from .models import Inbox, InboxDelivery, ItemType
 
 # serializing
 from rest_framework import serializers
 from authors.serializers.author_serializer import AuthorSerializer
 
 class InboxSerializer(serializers.ModelSerializer):
+    """
+    An inbox and a page of its items, newest first, e.g. InboxSerializer(inbox, context={'items': page}). Without
+    items in the context, it has every item of DEFAULT_TYPES.
+    """
+    DEFAULT_TYPES = [ItemType.POST]
+
     author = serializers.SerializerMethodField()
     items = serializers.SerializerMethodField()
 
@@ -19,43 +20,55 @@ def get_author(self, obj):
         return author
     
     def get_items(self, obj):
-        item_list = []
-        for item in obj.items:
-            if isinstance(item, str):
-                item = json.loads(item)
-
-            if item.get('type') == 'post':
-                item_list.append(item)
-        
-        item_list.reverse()
-        return item_list
+        items = self.context.get('items')
+        if items is None:
+            items = obj.inbox_items.order_by('-received', '-id')
+            if self.DEFAULT_TYPES is not None:
+                items = items.filter(type__in=self.DEFAULT_TYPES)
+        return [item.data for item in items]
     
     class Meta:
         model = Inbox
         fields = ('type', 'author', 'items')
 
-class AllInboxSerializer(serializers.ModelSerializer):
-    author = serializers.SerializerMethodField()
-    items = serializers.SerializerMethodField()
+class AllInboxSerializer(InboxSerializer):
+    DEFAULT_TYPES = None
 
-    def get_author(self, obj):
-        author = AuthorSerializer(obj.author).data
-        return author
-    
-    def get_items(self, obj):
-        item_list = []
-    
-        for item in obj.items:
-            if isinstance(item, str):
-                item = json.loads(item)
+class BulkInboxEntrySerializer(serializers.Serializer):
+    author = serializers.CharField(help_text='Url (or id) of the local author whose inbox gets the item')
+    item = serializers.JSONField(help_text='What would be POSTed to the author\'s inbox: a post, comment or like')
 
-            item_list.append(item)
+    def validate_item(self, value):
+        if not isinstance(value, dict) or 'type' not in value:
+            raise serializers.ValidationError('item should be an object with a type')
+        return value
 
-        item_list.reverse()
-        return item_list
-    
-    class Meta:
-        model = Inbox
-        fields = ('type', 'author', 'items')
+class BulkInboxSerializer(serializers.Serializer):
+    """The body of POST /inbox/bulk; see BulkInboxView"""
+    MAX_ITEMS = 500
+
+    type = serializers.CharField(required=False, default='inbox-bulk')
+    items = BulkInboxEntrySerializer(many=True, allow_empty=False, max_length=MAX_ITEMS)
+
+class BulkInboxResultSerializer(serializers.Serializer):
+    author = serializers.CharField()
+    status = serializers.IntegerField(help_text='The status code POSTing the item alone would have had')
+    error = serializers.JSONField(required=False)
 
-    
\ No newline at end of file
+class BulkInboxResultsSerializer(serializers.Serializer):
+    type = serializers.CharField(default='inbox-bulk')
+    items = BulkInboxResultSerializer(many=True, help_text='One per item, in order')
+
+class InboxDeliverySerializer(serializers.ModelSerializer):
+    """An item accepted with Prefer: respond-async, and what became of it; see InboxDelivery"""
+    type = serializers.SerializerMethodField()
+    author = serializers.UUIDField(source='target_author_id')
+    statusCode = serializers.IntegerField(source='status_code', allow_null=True,
+                                          help_text='What POSTing the item without Prefer would have answered')
+
+    def get_type(self, obj) -> str:
+        return 'inbox-delivery'
+
+    class Meta:
+        model = InboxDelivery
+        fields = ('type', 'id', 'author', 'status', 'statusCode', 'error', 'created', 'processed')
@@ -1,9 +1,17 @@
 import json
+import re
+from datetime import timedelta
+from io import StringIO
 
+from django.core.management import call_command
+from django.utils import timezone
+
+from common.request_cache import RequestCache
 from common.test_helper import TestHelper
 from rest_framework import status
 from rest_framework.test import APITestCase
-from inbox.models import Inbox
+from inbox.inbox_retention import InboxRetention
+from inbox.models import DeliveryStatus, Inbox, InboxDelivery, InboxItem
 from unittest import skip
 from post.serializer import PostSerializer
 class InboxTestCase(APITestCase):
@@ -147,6 +155,202 @@ def test_get_diff_author_fails(self):
     '''
     Helper Functions
     '''
+    def test_get_filtered_and_incremental(self):
+        author1_inbox = Inbox.objects.get(author = self.author1)
+        author1_inbox.add_to_inbox(self.author2_post)
+        author1_inbox.add_to_inbox({'type': 'Follow', 'summary': 'author2 wants to follow author1'})
+        author1_inbox.add_to_inbox({'type': 'comment', 'comment': 'first'})
+
+        self.client.force_login(self.author1)
+        request = f"/authors/{self.author1.official_id}/inbox"
+
+        response = self.client.get(request, {'type': 'follow,comment', 'size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['type'] for item in response.data['items']], ['comment'])
+
+        response = self.client.get(request, {'type': 'follow,comment', 'after': response.data['next']})
+        self.assertEqual([item['type'] for item in response.data['items']], ['Follow'])
+        self.assertNotIn('next', response.data)
+
+        # polling with the latest of the last response only returns what arrived since
+        response = self.client.get(f"{request}/all")
+        self.assertEqual(len(response.data['items']), 3)
+        author1_inbox.add_to_inbox({'type': 'like', 'object': self.author2_post['id']})
+        response = self.client.get(f"{request}/all", {'since': response.data['latest']})
+        self.assertEqual([item['type'] for item in response.data['items']], ['like'])
+
+    def test_stream_resumes_from_position(self):
+        inbox = Inbox.objects.get(author = self.author1)
+        inbox.add_to_inbox({'type': 'post', 'id': 'post-0'})
+        self.client.force_login(self.author1)
+        request = f"/authors/{self.author1.official_id}/inbox/stream"
+
+        response = self.client.get(f"{request}?last_event_id=0")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event_ids = re.findall(r'^id: (.*)$', response.content.decode(), re.MULTILINE)
+        self.assertEqual(len(event_ids), 1)
+
+        # the event id is where a reconnecting client resumes from
+        inbox.add_to_inbox({'type': 'post', 'id': 'post-1'})
+        response = self.client.get(request, HTTP_LAST_EVENT_ID = event_ids[0])
+        data = re.findall(r'^data: (.*)$', response.content.decode(), re.MULTILINE)
+        self.assertEqual([json.loads(item) for item in data], [{'type': 'post', 'id': 'post-1'}])
+
+        response = self.client.get(f"{request}?last_event_id=first")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_add_to_many_inboxes(self):
+        author3 = TestHelper.create_author(username = "author3")
+        token = RequestCache.start()
+        try:
+            with self.assertNumQueries(1):
+                inboxes = Inbox.get_for_author_ids([self.author1.official_id, author3.official_id])
+            with self.assertNumQueries(3):
+                Inbox.add_to_inboxes(list(inboxes.values()), self.author2_post)
+            # the handles are cached for the rest of the request
+            with self.assertNumQueries(0):
+                author1_inbox = Inbox.get_for_author_id(self.author1.official_id)
+        finally:
+            RequestCache.end(token)
+
+        self.assertEqual(len(author1_inbox.items), 1)
+        for author in (self.author1, author3):
+            items = Inbox.objects.get(author = author).items
+            self.assertEqual([json.loads(item)['id'] for item in items], [self.author2_post['id']])
+
+    def test_bulk_add_from_node(self):
+        author3 = TestHelper.create_author(username = "author3")
+        node = TestHelper.create_node("bulk_node", "bulk_node", "bulk_node", "bulk_node", "127.0.0.1:8080")
+        like = {
+            'type': 'Like',
+            'author': {'type': 'author', 'id': 'http://127.0.0.1:8080/authors/1d1f9e14-8bba-4e52-8d1f-3f1c4b4e2a11',
+                       'url': 'http://127.0.0.1:8080/authors/1d1f9e14-8bba-4e52-8d1f-3f1c4b4e2a11',
+                       'displayName': 'remote'},
+            'object': self.author2_post['id'],
+        }
+        payload = {'type': 'inbox-bulk', 'items': [
+            {'author': self.author1.get_url(), 'item': self.author2_post},
+            {'author': author3.get_url(), 'item': self.author2_post},
+            {'author': str(author3.official_id), 'item': like},
+            {'author': author3.get_url(), 'item': like},
+            {'author': author3.get_url(), 'item': {'type': 'post', 'title': 'missing fields'}},
+            {'author': 'http://127.0.0.1:8000/authors/db1d4b6a-2ad9-4b5c-9bf0-0bb4d3f2f4b7', 'item': like},
+        ]}
+
+        response = self.client.post('/inbox/bulk', payload, format = "json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_login(self.author1)
+        response = self.client.post('/inbox/bulk', payload, format = "json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(node)
+        response = self.client.post('/inbox/bulk', payload, format = "json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status'] for result in response.data['items']], [200, 200, 200, 400, 400, 404])
+
+        self.assertEqual(len(Inbox.objects.get(author = self.author1).items), 1)
+        items = [json.loads(item) for item in Inbox.objects.get(author = author3).items]
+        self.assertEqual([item['type'] for item in items], ['post', 'Like'])
+
+    def test_accept_then_process(self):
+        node = TestHelper.create_node("async_node", "async_node", "async_node", "async_node", "127.0.0.1:8080")
+        self.client.force_login(node)
+        request = f"/authors/{self.author1.official_id}/inbox"
+
+        response = self.client.post(request, self.author2_post, format = "json", HTTP_PREFER = "respond-async")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        location = response['Location']
+        bad = self.client.post(request, {'type': 'post', 'title': 'missing fields'}, format = "json",
+                               HTTP_PREFER = "respond-async").data
+        self.assertEqual(len(Inbox.objects.get(author = self.author1).items), 0)
+
+        call_command('process_inbox_deliveries', '--once', stdout = StringIO())
+
+        self.assertEqual(len(Inbox.objects.get(author = self.author1).items), 1)
+        response = self.client.get(location)
+        self.assertEqual((response.data['status'], response.data['statusCode']), ('done', 200))
+        response = self.client.get(f"/inbox/deliveries/{bad['id']}")
+        self.assertEqual((response.data['status'], response.data['statusCode']), ('failed', 400))
+        self.assertIn('description', response.data['error'])
+
+        # only the node that sent it can see it
+        self.client.force_login(self.author1)
+        self.assertEqual(self.client.get(location).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.logout()
+        self.assertEqual(self.client.get(location).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_claimed_deliveries(self):
+        claimed = InboxDelivery.objects.create(target_author_id = self.author1.official_id, data = self.author2_post,
+                                               status = DeliveryStatus.PROCESSING, claimed = timezone.now())
+        abandoned = InboxDelivery.objects.create(
+            target_author_id = self.author1.official_id, data = self.author2_post, status = DeliveryStatus.PROCESSING,
+            claimed = timezone.now() - timedelta(seconds = InboxDelivery.CLAIM_TIMEOUT_SECONDS + 1))
+
+        call_command('process_inbox_deliveries', '--once', stdout = StringIO())
+
+        # another worker is still on the first; the second was let go by a worker that died
+        claimed.refresh_from_db()
+        abandoned.refresh_from_db()
+        self.assertEqual(claimed.status, DeliveryStatus.PROCESSING)
+        self.assertEqual((abandoned.status, abandoned.attempts), (DeliveryStatus.DONE, 1))
+        self.assertEqual(len(Inbox.objects.get(author = self.author1).items), 1)
+
+    def test_duplicates_are_skipped(self):
+        author1_inbox = Inbox.objects.get(author = self.author1)
+        author1_inbox.add_to_inbox(self.author2_post)
+        Inbox.add_items([(author1_inbox, self.author2_post), (author1_inbox, {**self.author2_post, 'title': 'edited'})])
+        self.assertEqual(len(author1_inbox.items), 1)
+
+        like = {'type': 'Like', 'author': {'id': self.author2.get_url()}, 'object': self.author2_post['id']}
+        author1_inbox.add_to_inbox(like)
+        author1_inbox.add_to_inbox({**like, 'author': {'id': f'{self.author2.get_url()}/'}})
+        self.assertEqual(len(author1_inbox.items), 2)
+
+    def test_idempotency_key(self):
+        node = TestHelper.create_node("retry_node", "retry_node", "retry_node", "retry_node", "127.0.0.1:8080")
+        self.client.force_login(node)
+        request = f"/authors/{self.author1.official_id}/inbox"
+
+        response = self.client.post(request, self.author2_post, format = "json", HTTP_IDEMPOTENCY_KEY = "post-1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(request, self.author2_post, format = "json", HTTP_IDEMPOTENCY_KEY = "post-1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertEqual(len(Inbox.objects.get(author = self.author1).items), 1)
+
+        response = self.client.post(f"/authors/{self.author2.official_id}/inbox", self.author2_post, format = "json",
+                                    HTTP_IDEMPOTENCY_KEY = "post-1")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_compact_to_archive(self):
+        author1_inbox = Inbox.objects.get(author = self.author1)
+        for i in range(3):
+            author1_inbox.add_to_inbox({'type': 'post', 'id': f'post-{i}'})
+        author1_inbox.add_to_inbox({'type': 'Follow', 'actor': {'id': 'actor'}, 'object': {'id': 'object'}})
+        author1_inbox.add_to_inbox({'type': 'Like', 'actor': 'actor', 'object': 'post-0'})
+        InboxItem.objects.filter(type = 'like').update(received = timezone.now() - timedelta(days = 31))
+
+        retention = InboxRetention({'MAX_ITEMS': 2, 'TYPES': {'follow': {'KEEP': True}, 'like': {'MAX_AGE_DAYS': 30}}})
+        now = timezone.now()
+        # changed after the run started
+        changed = now + timedelta(seconds = 1)
+        Inbox.objects.filter(official_id = author1_inbox.official_id).update(updated_at = changed)
+        self.assertEqual(retention.get_inbox_ids(now), [author1_inbox.official_id])
+        self.assertEqual(retention.compact(author1_inbox.official_id, now, batch_size = 1), 2)
+        self.assertEqual(retention.get_inbox_ids(now), [])
+        self.assertGreaterEqual(Inbox.objects.get(author = self.author1).updated_at, changed)
+
+        # the follow is kept, the like expired, and only the newest 2 of the rest stay
+        remaining = [json.loads(item) for item in Inbox.objects.get(author = self.author1).items]
+        self.assertEqual([item.get('id') for item in remaining], ['post-1', 'post-2', None])
+
+        self.client.force_login(self.author1)
+        response = self.client.get(f"/authors/{self.author1.official_id}/inbox/archive")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['type'] for item in response.data['items']], ['post', 'Like'])
+
     def add_comment_to_inbox(self):
         comment = self.create_comment()
         request = f"/authors/{self.author1.official_id}/inbox"
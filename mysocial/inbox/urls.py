@@ -4,4 +4,8 @@
 urlpatterns = [
   path('authors/<uuid:author_id>/inbox', views.InboxView.as_view()),
   path('authors/<uuid:author_id>/inbox/all', views.AllInboxView.as_view()),
+  path('authors/<uuid:author_id>/inbox/archive', views.InboxArchiveView.as_view()),
+  path('authors/<uuid:author_id>/inbox/stream', views.InboxStreamView.as_view()),
+  path('inbox/bulk', views.BulkInboxView.as_view()),
+  path('inbox/deliveries/<int:delivery_id>', views.InboxDeliveryView.as_view()),
 ]
@@ -5,48 +5,123 @@
 from rest_framework.request import Request
 from rest_framework import status
 import logging
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import JSONRenderer
+from common.async_view import AsyncViewMixin
+from common.conditional_helper import ConditionalHelper
+from common.event_stream import EventStreamRenderer, EventStreamResponse
+from common.pagination_helper import PaginationHelper
 from common.simple_auth import SimpleAuth
+from common.transaction_position import TransactionPosition
+from inbox.inbox_util import InboxUtil
 from remote_nodes.remote_util import RemoteUtil
 from mysocial.settings import base
+from authors.permissions import NodeIsAuthenticated
 from authors.util import AuthorUtil
 import json
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 
 # models
-from .models import Inbox
+from .models import DeliveryStatus, Inbox, InboxDelivery
+from inbox.inbox_stream import InboxStream
 from authors.models.author import Author
 from inbox.models import ItemType
 from likes.models import Like, LikeType
 
 # serializing
-from inbox.serializers import InboxSerializer, AllInboxSerializer
+from inbox.serializers import InboxSerializer, AllInboxSerializer, BulkInboxSerializer, BulkInboxResultsSerializer, \
+    InboxDeliverySerializer
 from post.serializer import InboxPostSerializer
 from comment.serializers import InboxCommentSerializer
 from follow.serializers.follow_serializer import FollowRequestSerializer
 from authors.serializers.author_serializer import AuthorSerializer
 from likes.serializers import LikeSerializer
 
-logger = logging.getLogger("mylogger")
+logger = logging.getLogger(__name__)
 
 class InboxView(GenericAPIView):
     serializer_class = InboxSerializer
 
+    # items in a response when the client asks for no page, and at most
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
+
+    OPEN_API_PARAMETERS = PaginationHelper.KEYSET_OPEN_API_PARAMETERS + [
+        OpenApiParameter(name='type', location=OpenApiParameter.QUERY,
+                         description='Comma separated item types to return, e.g. "comment,like", or "all".',
+                         required=False, type=str),
+        OpenApiParameter(name='since', location=OpenApiParameter.QUERY,
+                         description='Optional ISO 8601 timestamp, e.g. the "latest" of a previous response. Only '
+                                     'returns items that arrived after it.',
+                         required=False, type=str),
+    ]
+
     def get_queryset(self):
         return Inbox.objects.all()
 
     ## GET /authors/{AUTHOR_ID}/inbox
+    @extend_schema(parameters=OPEN_API_PARAMETERS, responses=InboxSerializer)
     def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """
+        Posts in the inbox, newest first, DEFAULT_PAGE_SIZE at a time unless size is given. Pass type for other items.
+
+        To poll, pass the "latest" of the last response as since; pass the "next" cursor as after for older items.
+        """
         try:
             if SimpleAuth.authorize_user(kwargs['author_id'], request) == False:
                 return HttpResponse(status=status.HTTP_403_FORBIDDEN)
 
-            author = Author.get_author(kwargs["author_id"])
-            inbox = Inbox.objects.get(author = author)
-            serializer = InboxSerializer(inbox)
-            return Response(serializer.data, status = status.HTTP_200_OK)
+            inbox = Inbox.get_for_author_id(kwargs["author_id"])
+            return InboxView.respond_with_items(request, inbox, InboxSerializer)
 
         except Exception as e:
-            print(e)
+            logger.exception(e)
             return HttpResponseNotFound()
+
+    @staticmethod
+    def respond_with_items(request: Request, inbox: Inbox, serializer_class, items = None) -> HttpResponse:
+        """Responds with a page of items; those of the inbox unless items (e.g. its archived ones) is given"""
+        since, err = PaginationHelper.parse_since(request)
+        if err is not None:
+            return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
+
+        items = inbox.inbox_items.all() if items is None else items
+        types = InboxView.get_types(request, serializer_class.DEFAULT_TYPES)
+        if types is not None:
+            items = items.filter(type__in = types)
+        if since is not None:
+            items = items.filter(received__gt = since)
+        items = items.order_by('-received', '-id')
+
+        def build_response():
+            page, next_cursor, err = PaginationHelper.paginate_queryset(
+                request, items, key_field = 'received', id_field = 'id',
+                default_size = InboxView.DEFAULT_PAGE_SIZE, max_size = InboxView.MAX_PAGE_SIZE)
+            if err is not None:
+                return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
+
+            page = list(page)
+            data = serializer_class(inbox, context = {'items': page}).data
+            # older pages don't know the newest item
+            if 'after' not in request.query_params:
+                latest = page[0].received if page else since
+                if latest is not None:
+                    data['latest'] = latest.isoformat()
+            if next_cursor is not None:
+                data['next'] = next_cursor
+            return Response(data, status = status.HTTP_200_OK)
+
+        return ConditionalHelper.respond_for_instances(request, [inbox, inbox.author], build_response)
+
+    @staticmethod
+    def get_types(request: Request, default_types: list = None) -> list:
+        """Parses the type query parameter; None means every type"""
+        if 'type' not in request.query_params:
+            return default_types
+        types = [item_type.strip().lower() for item_type in request.query_params['type'].split(',')]
+        return None if 'all' in types else types
     
     # DELETE /authors/{AUTHOR_ID}/inbox
     def delete(self, request: Request, *args, **kwargs) -> HttpResponse:
@@ -54,13 +129,11 @@ def delete(self, request: Request, *args, **kwargs) -> HttpResponse:
             if SimpleAuth.authorize_user(kwargs['author_id'], request) == False:
                 return HttpResponse(status=status.HTTP_403_FORBIDDEN)
 
-            author = Author.get_author(kwargs["author_id"])
-            inbox = Inbox.objects.get(author = author)
-            inbox.items = []
-            inbox.save()
+            inbox = Inbox.get_for_author_id(kwargs["author_id"])
+            inbox.clear()
             return Response(status = status.HTTP_204_NO_CONTENT)
         except Exception as e:
-            print(e)
+            logger.exception(e)
             return HttpResponseNotFound()
 
 
@@ -76,29 +149,117 @@ def post(self, request: Request, *args, **kwargs) -> HttpResponse:
         1. Local user adding to local inbox
         2. Local user adding to remote inbox
         3. Remote user adding to local inbox
+
+        Nodes can send `Prefer: respond-async` to get a 202 right away instead; see accept_delivery. Nodes can also
+        send an `Idempotency-Key`; see post_idempotently.
         """
         try:
             node: Author = request.user
             if not node.is_authenticated:
                 return HttpResponseNotFound()
-            
-            type = request.data['type'].lower()
-
-            if type == ItemType.LIKE:
-                return self.handle_likes(request, node, **kwargs)
-            elif type == ItemType.POST:
-                return self.handle_post(request, node, **kwargs)
-            elif type == ItemType.COMMENT:
-                return self.handle_comment(request, node, **kwargs)
-            elif type == ItemType.FOLLOW:
-                pass
-            else:
-                return Response("Could not find item type", status = status.HTTP_400_BAD_REQUEST)
+
+            if node.is_authenticated_node:
+                idempotency_key = request.headers.get('Idempotency-Key')
+                if idempotency_key:
+                    return self.post_idempotently(request, node, idempotency_key, **kwargs)
+                if InboxView.prefers_async(request):
+                    return InboxView.accept_delivery(request, node, kwargs['author_id'])
+
+            return self.add_item(request, node, **kwargs)
                 
         except Exception as e:
-            print(e)
+            logger.exception(e)
             return HttpResponseNotFound()
+
+    def add_item(self, request, node, **kwargs):
+        type = request.data['type'].lower()
+
+        if type == ItemType.LIKE:
+            return self.handle_likes(request, node, **kwargs)
+        elif type == ItemType.POST:
+            return self.handle_post(request, node, **kwargs)
+        elif type == ItemType.COMMENT:
+            return self.handle_comment(request, node, **kwargs)
+        elif type == ItemType.FOLLOW:
+            pass
+        else:
+            return Response("Could not find item type", status = status.HTTP_400_BAD_REQUEST)
+
+    def post_idempotently(self, request, node, idempotency_key: str, **kwargs):
+        """
+        Same as post, but when a node sends the same Idempotency-Key again (e.g. it retries after a timeout), it gets
+        the result of the first request and the item isn't added again. Only successful requests are remembered, as
+        InboxDeliveries, so failed ones can be retried as is.
+        """
+        if len(idempotency_key) > InboxDelivery.MAX_IDEMPOTENCY_KEY_LENGTH:
+            return Response(f"Idempotency-Key is longer than {InboxDelivery.MAX_IDEMPOTENCY_KEY_LENGTH} characters",
+                            status = status.HTTP_400_BAD_REQUEST)
+
+        delivery = InboxDelivery.objects.filter(node = node, idempotency_key = idempotency_key).first()
+        if delivery is not None:
+            return InboxView.replay_delivery(request, delivery, kwargs['author_id'])
+        if InboxView.prefers_async(request):
+            return InboxView.accept_delivery(request, node, kwargs['author_id'], idempotency_key)
+
+        response = self.add_item(request, node, **kwargs)
+        if response is not None and 200 <= response.status_code < 300:
+            delivery = InboxDelivery(node = node, target_author_id = kwargs['author_id'], data = request.data,
+                                     idempotency_key = idempotency_key, status = DeliveryStatus.DONE, attempts = 1,
+                                     status_code = response.status_code, processed = timezone.now())
+            try:
+                with transaction.atomic():
+                    delivery.save()
+            except IntegrityError:
+                # the same request running at the same time remembered it first
+                pass
+        return response
     
+    @staticmethod
+    def prefers_async(request: Request) -> bool:
+        """True if the request has `Prefer: respond-async` (RFC 7240)"""
+        preferences = request.headers.get('Prefer', '').split(',')
+        return 'respond-async' in [preference.split(';')[0].strip().lower() for preference in preferences]
+
+    @staticmethod
+    def accept_delivery(request: Request, node: Author, author_id, idempotency_key: str = None) -> HttpResponse:
+        """
+        Answers a node right away with 202 and the InboxDelivery, whose Location it can GET later; the
+        process_inbox_deliveries worker does what post would have done.
+        """
+        if not isinstance(request.data, dict) or 'type' not in request.data:
+            return Response("Could not find item type", status = status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                delivery = InboxDelivery.objects.create(node = node, target_author_id = author_id, data = request.data,
+                                                        idempotency_key = idempotency_key)
+        except IntegrityError:
+            # the same request running at the same time got in first
+            delivery = InboxDelivery.objects.get(node = node, idempotency_key = idempotency_key)
+            return InboxView.replay_delivery(request, delivery, author_id)
+        return InboxView.to_delivery_response(request, delivery)
+
+    @staticmethod
+    def to_delivery_response(request: Request, delivery: InboxDelivery) -> HttpResponse:
+        response = Response(InboxDeliverySerializer(delivery).data, status = status.HTTP_202_ACCEPTED)
+        response['Location'] = request.build_absolute_uri(delivery.get_status_path())
+        response['Preference-Applied'] = 'respond-async'
+        return response
+
+    @staticmethod
+    def replay_delivery(request: Request, delivery: InboxDelivery, author_id) -> HttpResponse:
+        """Answers a request whose Idempotency-Key was seen before; see post_idempotently"""
+        if str(delivery.target_author_id) != str(author_id):
+            return Response("Idempotency-Key was already used for another inbox",
+                            status = status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        if delivery.status == DeliveryStatus.PENDING or InboxView.prefers_async(request):
+            response = InboxView.to_delivery_response(request, delivery)
+        else:
+            response = Response(InboxDeliverySerializer(delivery).data, status = delivery.status_code)
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
     def handle_post(self, request, node, **kwargs):
         '''
         Find what scenario we are dealing with:
@@ -171,7 +332,7 @@ def handle_comment(self, request, node, **kwargs):
 
     def send_post_or_comment_to_local_inbox(self, request, serializer, target_author):
         try:
-            inbox = Inbox.objects.get(author = target_author)
+            inbox = Inbox.get_for_author_id(target_author.official_id)
         except:
             return Response(f'Could not get inbox for local author: {target_author}', status.HTTP_400_BAD_REQUEST)
 
@@ -260,7 +421,7 @@ def local_likes_local(self, request, target_author):
             requesting_author_id = self.request.user.get_id()
             requesting_author = Author.get_author(requesting_author_id)
             json_author = AuthorSerializer(requesting_author).data
-            print(json_author)
+            logger.debug(json_author)
         except:
             return Response(f"Could not get local author {requesting_author_id}", status = status.HTTP_400_BAD_REQUEST)
 
@@ -271,7 +432,7 @@ def local_likes_local(self, request, target_author):
 
         # step three
         try:
-            inbox = Inbox.objects.get(author = target_author)
+            inbox = Inbox.get_for_author_id(target_author.official_id)
             inbox.add_to_inbox(like_data) 
         except:
             return Response(f"Could not add to inbox for local author: {target_author.display_name}", status = status.HTTP_400_BAD_REQUEST)
@@ -302,8 +463,8 @@ def remote_likes_local(self, request, **kwargs):
         
         # step three
         try:
-            target_author = Author.get_author(kwargs["author_id"])
-            inbox = Inbox.objects.get(author = target_author)
+            inbox = Inbox.get_for_author_id(kwargs["author_id"])
+            target_author = inbox.author
             inbox.add_to_inbox(like_data) 
         except:
             return Response(f"Could not add to inbox for author id: {kwargs['author_id']}", status = status.HTTP_400_BAD_REQUEST)
@@ -323,23 +484,149 @@ def create_like(self, request, json_author, requesting_author_id):
             return LikeSerializer(like).data
 
         except Exception as e:
-            print(e)
+            logger.exception(e)
             return None
 
 class AllInboxView(GenericAPIView):
     serializer_class = AllInboxSerializer
 
     ## GET /authors/{AUTHOR_ID}/inbox/all
+    @extend_schema(parameters=InboxView.OPEN_API_PARAMETERS, responses=AllInboxSerializer)
     def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """Same as GET /authors/{AUTHOR_ID}/inbox, but has every type of item unless type is given"""
         try:
             if SimpleAuth.authorize_user(kwargs['author_id'], request) == False:
                 return HttpResponse(status=status.HTTP_403_FORBIDDEN)
 
-            author = Author.get_author(kwargs["author_id"])
-            inbox = Inbox.objects.get(author = author)
-            serializer = AllInboxSerializer(inbox)
-            return Response(serializer.data, status = status.HTTP_200_OK)
+            inbox = Inbox.get_for_author_id(kwargs["author_id"])
+            return InboxView.respond_with_items(request, inbox, AllInboxSerializer)
 
         except Exception as e:
-            print(e)
-            return HttpResponseNotFound()
\ No newline at end of file
+            logger.exception(e)
+            return HttpResponseNotFound()
+
+class InboxArchiveView(GenericAPIView):
+    serializer_class = AllInboxSerializer
+
+    def get_queryset(self):
+        return Inbox.objects.all()
+
+    ## GET /authors/{AUTHOR_ID}/inbox/archive
+    @extend_schema(parameters=InboxView.OPEN_API_PARAMETERS, responses=AllInboxSerializer)
+    def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """
+        Same as GET /authors/{AUTHOR_ID}/inbox/all, but for the items that were moved out of the inbox because they're
+        past the server's retention rules (see INBOX_RETENTION in docs/server.md)
+        """
+        try:
+            if SimpleAuth.authorize_user(kwargs['author_id'], request) == False:
+                return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+            inbox = Inbox.get_for_author_id(kwargs["author_id"])
+            return InboxView.respond_with_items(request, inbox, AllInboxSerializer, inbox.archived_items.all())
+
+        except Exception as e:
+            logger.exception(e)
+            return HttpResponseNotFound()
+
+class InboxStreamView(AsyncViewMixin, GenericAPIView):
+    serializer_class = AllInboxSerializer
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    def get_queryset(self):
+        return Inbox.objects.all()
+
+    ## GET /authors/{AUTHOR_ID}/inbox/stream
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='type', location=OpenApiParameter.QUERY,
+                             description='Comma separated item types to stream, e.g. "post,comment". All by default.',
+                             required=False, type=str),
+            OpenApiParameter(name='last_event_id', location=OpenApiParameter.QUERY,
+                             description='Same as the Last-Event-ID header, for the first connection: streams the '
+                                         'items after this event id. Only new items by default.',
+                             required=False, type=str),
+        ],
+        responses={(200, 'text/event-stream'): str},
+    )
+    async def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """
+        Server-Sent Events of the items arriving in the inbox; use it with the browser's EventSource instead of polling.
+
+        Every item is an event whose id is its position in the inbox, whose event is its type (e.g. "post") and whose
+        data is the item. EventSource sends the last id it saw when it reconnects, and gets the items it missed.
+        A comment is sent every InboxStream.HEARTBEAT_SECONDS when there's nothing new.
+
+        When we're not served through ASGI (see web.sh), the response has the items there are and ends; EventSource then
+        reconnects after the retry delay, so it works like polling.
+        """
+        if not request.user.is_authenticated or SimpleAuth.authorize_user(kwargs['author_id'], request) == False:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        last_event_id = request.headers.get('Last-Event-ID', request.query_params.get('last_event_id'))
+        if last_event_id is not None:
+            try:
+                last_event_id = TransactionPosition.parse(last_event_id)
+            except ValueError:
+                return Response('last_event_id should be an event id from this stream', status.HTTP_400_BAD_REQUEST)
+
+        try:
+            inbox = await sync_to_async(Inbox.get_for_author_id)(kwargs['author_id'])
+        except Inbox.DoesNotExist:
+            return HttpResponseNotFound()
+        if last_event_id is None:
+            last_event_id = await sync_to_async(InboxStream.get_start)()
+        types = InboxView.get_types(request)
+
+        if getattr(request, 'supports_event_streams', False):
+            return EventStreamResponse(InboxStream.stream(inbox, last_event_id, types))
+
+        items = await sync_to_async(InboxStream.get_items_after)(inbox, last_event_id, types)
+        events = [InboxStream.format_retry()] + [InboxStream.format_item(item) for item in items]
+        return HttpResponse(''.join(events), content_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+class BulkInboxView(GenericAPIView):
+    serializer_class = BulkInboxSerializer
+    permission_classes = [NodeIsAuthenticated]
+
+    ## POST /inbox/bulk
+    @extend_schema(request=BulkInboxSerializer, responses=BulkInboxResultsSerializer)
+    def post(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """
+        For nodes: adds many posts, comments and likes to the inboxes of many of our authors in one request. Same as
+        POSTing every item to /authors/{AUTHOR_ID}/inbox, but the items are validated together and saved in one
+        transaction. At most BulkInboxSerializer.MAX_ITEMS at a time.
+
+        Every item gets a result, in order, with the status code POSTing it alone would have had. Items that fail
+        don't stop the others from being added.
+        """
+        serializer = BulkInboxSerializer(data = request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        entries = serializer.validated_data['items']
+
+        results = InboxUtil.add_to_local_inboxes_in_bulk([(entry['author'], entry['item']) for entry in entries])
+        for entry, result in zip(entries, results):
+            result['author'] = entry['author']
+
+        added = sum(1 for result in results if result['status'] == status.HTTP_200_OK)
+        logger.info(f'BulkInboxView: {request.user}: added {added} of {len(entries)} items')
+        return Response({'type': 'inbox-bulk', 'items': results}, status = status.HTTP_200_OK)
+
+
+class InboxDeliveryView(GenericAPIView):
+    serializer_class = InboxDeliverySerializer
+    permission_classes = [NodeIsAuthenticated]
+
+    def get_queryset(self):
+        return InboxDelivery.objects.all()
+
+    ## GET /inbox/deliveries/{DELIVERY_ID}
+    def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """For nodes: what became of an item they POSTed to an inbox with `Prefer: respond-async`"""
+        try:
+            delivery = InboxDelivery.objects.get(id = kwargs['delivery_id'], node = request.user)
+        except InboxDelivery.DoesNotExist:
+            return HttpResponseNotFound()
+        return Response(InboxDeliverySerializer(delivery).data, status = status.HTTP_200_OK)
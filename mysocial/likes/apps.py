@@ -4,3 +4,6 @@
 class LikesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'likes'
+
+    def ready(self):
+        import likes.signals
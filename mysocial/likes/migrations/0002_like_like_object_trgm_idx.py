@@ -0,0 +1,21 @@
+# Generated by Django 4.1.2 on 2026-10-19 16:54
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('likes', '0001_initial'),
+    ]
+
+    operations = [
+        # gin_trgm_ops comes from pg_trgm
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='like',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['object'], name='like_object_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 # Create your models here.
 
@@ -13,5 +14,10 @@ class Like(models.Model):
     object_type = models.CharField(choices = LikeType.choices, max_length= 20)
 
     class Meta:
+        # also the index for an author's likes (author_id comes first)
         unique_together = ('author_id', 'object')
+        indexes = [
+            # the likes on a post or comment are found by a substring of the object's url; see LikeView
+            GinIndex(fields=['object'], name='like_object_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
 
@@ -0,0 +1,19 @@
+import re
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.response_cache import ResponseCache
+from likes.models import Like
+
+# the liked object is a url like http://host/authors/{AUTHOR_ID}/posts/{POST_ID}
+AUTHOR_ID_PATTERN = re.compile(r'/authors/([^/]+)/')
+
+
+@receiver([post_save, post_delete], sender = Like)
+def invalidate_like_responses(sender, instance, **kwargs):
+    ResponseCache.invalidate(ResponseCache.PUBLIC_POSTS)
+
+    match = AUTHOR_ID_PATTERN.search(instance.object)
+    if match is not None:
+        ResponseCache.invalidate(ResponseCache.AUTHOR_POSTS, match.group(1))
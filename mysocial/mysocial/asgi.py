@@ -9,8 +9,13 @@
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysocial.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysocial.settings.production')
 
-application = get_asgi_application()
+# same as django.core.asgi.get_asgi_application, with a handler that can also stream Server-Sent Events
+django.setup(set_prefix=False)
+
+from common.event_stream import StreamingASGIHandler  # noqa: E402; needs the apps loaded
+
+application = StreamingASGIHandler()
@@ -49,31 +49,64 @@
     'drf_spectacular',
 ]
 
+# Structured logging; see common/logging_util.py
+# Every module logs with logging.getLogger(__name__). Records go out as one JSON object per line, tagged with the
+# request id, from a background thread. Repeated warnings from the same line (e.g. a node that is down) are sampled.
+LOG_LEVEL = os.getenv('DJANGO_LOG_LEVEL', 'INFO')
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'common.logging_util.JSONFormatter',
+        },
+    },
     'filters': {
-        'require_debug_true': {
-            '()': 'django.utils.log.RequireDebugTrue',
+        'request_id': {
+            '()': 'common.logging_util.RequestIdFilter',
+        },
+        'rate_limit': {
+            '()': 'common.logging_util.RateLimitFilter',
+            'burst': int(os.getenv('LOG_RATE_LIMIT_BURST', 10)),
+            'window_seconds': int(os.getenv('LOG_RATE_LIMIT_WINDOW_SECONDS', 60)),
+            'sample_every': int(os.getenv('LOG_RATE_LIMIT_SAMPLE_EVERY', 100)),
         },
     },
     'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'filters': ['require_debug_true'],
+        'structured': {
+            '()': 'common.logging_util.QueueStreamHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': 'json',
+            'filters': ['request_id', 'rate_limit'],
         },
     },
+    'root': {
+        'handlers': ['structured'],
+        'level': LOG_LEVEL,
+    },
     'loggers': {
-        'mylogger': {
-            'handlers': ['console'],
-            'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
-            'propagate': True,
+        # replaces django's default console and mail_admins handlers
+        'django': {
+            'level': LOG_LEVEL,
+            'propagate': False,
+            'handlers': ['structured'],
+        },
+        # every query at DEBUG is too much even when debugging; use REQUEST_METRICS_ENABLED instead
+        'django.db.backends': {
+            'level': 'INFO',
         },
     },
 }
 
+# per-request query, db time and outbound http numbers; see common/middleware.py
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'false').lower() == 'true'
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'common.logging_util.RequestIdMiddleware',
+    'common.middleware.RequestMetricsMiddleware',
+    'common.middleware.RequestCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -107,6 +140,15 @@
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'common.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'common.fast_json.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'PAGE_SIZE': 100,
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.BasicAuthentication',
@@ -156,7 +198,13 @@
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
 STATIC_URL = '/static/'
-django_on_heroku.settings(locals())
+# logging=False: it would replace our LOGGING above
+django_on_heroku.settings(locals(), logging=False)
+# django_on_heroku adds WhiteNoise's middleware, which is sync only; ours is the same but can also be awaited under ASGI
+MIDDLEWARE = list(dict.fromkeys(
+    'common.middleware.StaticFilesMiddleware' if middleware == 'whitenoise.middleware.WhiteNoiseMiddleware' else middleware
+    for middleware in MIDDLEWARE
+))
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'staticfiles/static')]
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 CORS_ALLOW_CREDENTIALS = True
@@ -194,13 +242,72 @@
     'x-csrftoken',
     'x-requested-with',
     'host',  # special header for team12
+    'if-none-match',  # conditional GETs; see ConditionalHelper
+    'if-modified-since',
+    'x-request-id',
 )
 
 CORS_EXPOSE_HEADERS = [
     'set-cookie',
     'cookie',
+    'etag',
+    'last-modified',
+    'server-timing',
+    'x-request-id',
 ]
 
+# caches
+# per-process memory by default. CACHE_CONFIG (Heroku config var, json) replaces it, e.g. with one every process
+# shares: {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "mysocial_cache"}; release.sh makes
+# its table
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mysocial',
+    }
+}
+
+# seconds a rendered response stays cached per endpoint, see common/response_cache.py; 0 disables caching. Only used
+# with a CACHE_CONFIG: invalidating a per-process cache leaves the other workers serving the old response
+RESPONSE_CACHE_TTL = {
+    'public_posts': 30,
+    'authors': 60,
+    'author_posts': 30,
+}
+
+# how long items stay in an inbox before compact_inboxes moves them to its archive (see InboxRetention). MAX_ITEMS is
+# per inbox and MAX_AGE_DAYS in days; None is no limit. TYPES has rules per item type: its own MAX_AGE_DAYS, or KEEP
+# to never archive the type (kept items don't count towards MAX_ITEMS). Heroku: INBOX_RETENTION config var (json)
+INBOX_RETENTION = {
+    'MAX_ITEMS': 1000,
+    'MAX_AGE_DAYS': 365,
+    'TYPES': {
+        'follow': {'KEEP': True},
+        'like': {'MAX_AGE_DAYS': 30},
+    },
+}
+
+# the local copy of other nodes' authors (see AuthorDirectory). sync_remote_authors crawls a node every
+# SYNC_INTERVAL_SECONDS, PAGE_SIZE authors at a time, up to MAX_PAGES. A node's copy is used instead of asking it until
+# its last complete crawl is MAX_AGE_SECONDS old. Heroku: REMOTE_AUTHOR_DIRECTORY config var (json)
+REMOTE_AUTHOR_DIRECTORY = {
+    'SYNC_INTERVAL_SECONDS': 15 * 60,
+    'MAX_AGE_SECONDS': 60 * 60,
+    'PAGE_SIZE': 100,
+    'MAX_PAGES': 100,
+}
+
+# the local copy of posts of remote authors local authors follow (see PostReplication). replicate_remote_posts syncs
+# each of them every SYNC_INTERVAL_SECONDS, PAGE_SIZE posts at a time, up to MAX_PAGES, until it reaches posts it already
+# has. The copy is used for timelines and shares until its last sync is MAX_AGE_SECONDS old. Heroku: POST_REPLICATION
+# config var (json)
+POST_REPLICATION = {
+    'SYNC_INTERVAL_SECONDS': 5 * 60,
+    'MAX_AGE_SECONDS': 30 * 60,
+    'PAGE_SIZE': 50,
+    'MAX_PAGES': 20,
+}
+
 # docs
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Sociocon API',
@@ -243,6 +350,26 @@
 if REMOTE_NODE_CREDENTIALS_KEY in os.environ:
     REMOTE_NODE_CREDENTIALS = json.loads(os.environ[REMOTE_NODE_CREDENTIALS_KEY])
 
+INBOX_RETENTION_KEY = 'INBOX_RETENTION'
+if INBOX_RETENTION_KEY in os.environ:
+    INBOX_RETENTION = json.loads(os.environ[INBOX_RETENTION_KEY])
+
+REMOTE_AUTHOR_DIRECTORY_KEY = 'REMOTE_AUTHOR_DIRECTORY'
+if REMOTE_AUTHOR_DIRECTORY_KEY in os.environ:
+    # only the keys given are changed
+    REMOTE_AUTHOR_DIRECTORY.update(json.loads(os.environ[REMOTE_AUTHOR_DIRECTORY_KEY]))
+
+CACHE_CONFIG_KEY = 'CACHE_CONFIG'
+if CACHE_CONFIG_KEY in os.environ:
+    CACHES['default'] = json.loads(os.environ[CACHE_CONFIG_KEY])
+else:
+    RESPONSE_CACHE_TTL = {endpoint: 0 for endpoint in RESPONSE_CACHE_TTL}
+
+POST_REPLICATION_KEY = 'POST_REPLICATION'
+if POST_REPLICATION_KEY in os.environ:
+    # only the keys given are changed
+    POST_REPLICATION.update(json.loads(os.environ[POST_REPLICATION_KEY]))
+
 
 """
 Dictionary of domain/host and domain config (class NodeConfigBase) pair
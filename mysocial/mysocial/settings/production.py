@@ -22,5 +22,11 @@
 if DATABASE_CONFIG_KEY in os.environ:
     DATABASES.update(json.loads(os.environ[DATABASE_CONFIG_KEY]))
 
+for database in DATABASES.values():
+    # reuse a connection across requests instead of opening one to the remote database every time; a reused
+    # connection is checked first. For a pool instead, see common.pooled_postgresql and docs/server.md
+    database.setdefault('CONN_MAX_AGE', 60)
+    database.setdefault('CONN_HEALTH_CHECKS', True)
+
 if base.CURRENT_DOMAIN is None:
     base.CURRENT_DOMAIN = 'socioecon.herokuapp.com'
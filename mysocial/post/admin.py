@@ -1,4 +1,8 @@
 from django.contrib import admin
-from .models import Post
+from .models import CategoryCount, ChangeEntry, Post, ReplicatedAuthor, ReplicatedPost
 
-admin.site.register(Post)
\ No newline at end of file
+admin.site.register(Post)
+admin.site.register(CategoryCount)
+admin.site.register(ReplicatedAuthor)
+admin.site.register(ReplicatedPost)
+admin.site.register(ChangeEntry)
@@ -0,0 +1,168 @@
+import asyncio
+from typing import Optional
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+
+from authors.models.author import Author
+from comment.models import Comment
+from comment.serializers import CommentSerializer
+from common.base_util import BaseUtil
+from common.event_stream import EventStreamResponse
+from common.fast_json import FastJSON
+from common.transaction_position import TransactionPosition
+from likes.models import Like
+from likes.serializers import LikeSerializer
+from mysocial.settings import base
+from post.models import ChangeAction, ChangeEntry, ChangeKind, Post, Visibility
+from post.post_search import PostSearch
+from post.serializer import PostSerializer
+
+
+class ChangeFeed:
+    """
+    The creates, updates and deletes of our posts, comments and likes, in the order they happened, read from
+    ChangeEntry. Peers that mirror us read it from where they stopped (see ChangeFeedView) instead of downloading every
+    author's posts again, so a sync costs as much as what changed.
+
+    Changes carry the object as it is now, not as it was then: a post that was deleted, or that the reader can't see
+    anymore, comes as a tombstone instead, so applying the changes in order always ends with what we have. Nodes see
+    every post; authors see the ones PostSearch would show them that aren't unlisted.
+
+    The changes are in the order their transactions were numbered in, then written in, and a reader's place is the
+    position of the last one it got. Only the changes of transactions older than every one still running are served,
+    so none can show up later before a position that was already read; see TransactionPosition.
+
+    Example how to use::
+
+        entries = ChangeFeed.get_entries(since=(0, 0), size=100)
+        items = ChangeFeed.to_items(entries, reader=None)
+    """
+    DEFAULT_SIZE = 100
+    MAX_SIZE = 1000
+    POLL_SECONDS = 5
+    # how long clients wait before reconnecting to the stream
+    RETRY_MILLISECONDS = 5000
+
+    @staticmethod
+    def get_entries(since: tuple, size: int, author_id: Optional[str] = None) -> list:
+        """The size entries after the position since that settled, oldest first"""
+        return list(ChangeFeed.get_queryset(since, author_id)[:size])
+
+    @staticmethod
+    def get_queryset(since: tuple, author_id: Optional[str] = None) -> QuerySet:
+        """The entries after the position since whose transactions settled, in order; see TransactionPosition"""
+        entries = ChangeEntry.objects.filter(TransactionPosition.get_after_condition(since),
+                                             TransactionPosition.get_settled_condition())
+        if author_id is not None:
+            entries = entries.filter(author_id=author_id)
+        return entries.order_by('transaction_id', 'id')
+
+    @staticmethod
+    def to_items(entries: list, reader: Optional[Author]) -> list:
+        """
+        The changes as they are served, reading the objects still there in one query per kind. Likes of things that
+        aren't ours are left out.
+
+        :param reader: The author reading, whose friends' friends-only posts are the only ones served to them; posts
+        they can't see, unlisted ones and the comments and likes on both come as tombstones. None for nodes, which get
+        everything.
+        """
+        ids = {kind: [entry.object_id for entry in entries if entry.kind == kind] for kind in ChangeKind.values}
+        # the posts liked are read with the changed ones, to tell if the reader may see the likes
+        liked_post_ids = [str(entry.post_id) for entry in entries if entry.kind == ChangeKind.LIKE and entry.post_id]
+        posts = {post.get_id(): post for post in
+                 Post.objects.select_related('author').filter(official_id__in=ids[ChangeKind.POST] + liked_post_ids)}
+        comments = {comment.get_id(): comment for comment in
+                    Comment.objects.select_related('post__author').filter(official_id__in=ids[ChangeKind.COMMENT])}
+        likes = {str(like.id): like for like in Like.objects.filter(id__in=ids[ChangeKind.LIKE])}
+        friend_ids = None
+        if reader is not None and (posts or comments or likes):
+            friend_ids = set(PostSearch.get_friend_ids(reader)) | {reader.official_id}
+
+        items = []
+        for entry in entries:
+            if entry.kind == ChangeKind.POST:
+                post = posts.get(entry.object_id)
+                if post is not None and ChangeFeed.is_visible(post, friend_ids):
+                    changed = PostSerializer(post).data
+                else:
+                    changed = ChangeFeed.get_tombstone(entry, ChangeFeed.get_post_url(entry))
+            elif entry.kind == ChangeKind.COMMENT:
+                comment = comments.get(entry.object_id)
+                if comment is not None and ChangeFeed.is_visible(comment.post, friend_ids):
+                    changed = CommentSerializer(comment).data
+                else:
+                    comment_url = f'{ChangeFeed.get_post_url(entry)}/comments/{entry.object_id}'
+                    changed = ChangeFeed.get_tombstone(entry, comment_url)
+            else:
+                if entry.data is None or urlparse(entry.data.get('object', '')).netloc != base.CURRENT_DOMAIN:
+                    continue
+                like = likes.get(entry.object_id)
+                liked_post = posts.get(str(entry.post_id))
+                if like is not None and (friend_ids is None or
+                                         liked_post is not None and ChangeFeed.is_visible(liked_post, friend_ids)):
+                    changed = LikeSerializer(like).data
+                else:
+                    changed = {**entry.data, 'type': 'tombstone', 'formerType': ChangeKind.LIKE}
+
+            items.append({
+                'type': 'change',
+                'id': TransactionPosition.format((entry.transaction_id, entry.id)),
+                'action': ChangeAction.DELETE if changed['type'] == 'tombstone' else entry.action,
+                'published': entry.created,
+                'object': changed,
+            })
+        return items
+
+    @staticmethod
+    def is_visible(post: Post, friend_ids: Optional[set]) -> bool:
+        """
+        :param friend_ids: The reader's friends and the reader, like PostSearch.get_visible_condition; None for nodes
+        """
+        if friend_ids is None:
+            return True
+        return not post.unlisted and (post.visibility == Visibility.PUBLIC or post.author_id in friend_ids)
+
+    @staticmethod
+    def get_post_url(entry: ChangeEntry) -> str:
+        return f'{BaseUtil.get_http_or_https()}{base.CURRENT_DOMAIN}/authors/{entry.author_id}/posts/{entry.post_id}'
+
+    @staticmethod
+    def get_tombstone(entry: ChangeEntry, url: str) -> dict:
+        return {'type': 'tombstone', 'formerType': entry.kind, 'id': url}
+
+    @staticmethod
+    def get_page(since: tuple, size: int, reader: Optional[Author],
+                 author_id: Optional[str] = None) -> (list, tuple, bool):
+        """
+        :return: The changes after since, the position to read the next ones from, and if there may be more right away
+        """
+        entries = ChangeFeed.get_entries(since, size, author_id)
+        next_since = (entries[-1].transaction_id, entries[-1].id) if entries else since
+        return ChangeFeed.to_items(entries, reader), next_since, len(entries) == size
+
+    @staticmethod
+    def format_item(item: dict) -> str:
+        return EventStreamResponse.format_event(FastJSON.dumps_str(item), event_id=item['id'],
+                                                event=item['object']['type'])
+
+    @staticmethod
+    def format_retry() -> str:
+        return f'retry: {ChangeFeed.RETRY_MILLISECONDS}\n\n'
+
+    @staticmethod
+    async def stream(since: tuple, reader: Optional[Author], author_id: Optional[str] = None):
+        """Yields the changes after since, then new ones once their transactions settle, with a heartbeat when idle"""
+        yield ChangeFeed.format_retry()
+        while True:
+            items, since, has_more = await sync_to_async(ChangeFeed.get_page)(since, ChangeFeed.MAX_SIZE, reader,
+                                                                              author_id)
+            for item in items:
+                yield ChangeFeed.format_item(item)
+            if has_more:
+                continue
+
+            await asyncio.sleep(ChangeFeed.POLL_SECONDS)
+            yield ': heartbeat\n\n'
@@ -0,0 +1,59 @@
+import io
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from authors.models.author import Author
+from common.fast_json import FastJSONParser, FastJSONRenderer, orjson
+from post.models import Post
+from post.serializer import PostSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compares DRF\'s JSON renderer and parser against ours on a public feed of unsaved posts; needs no database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='number of posts in the feed')
+        parser.add_argument('--repeat', type=int, default=20, help='number of renders to average over')
+
+    def handle(self, *args, **options):
+        feed = self.build_feed(options['posts'])
+        repeat = options['repeat']
+        self.stdout.write(f'Feed of {len(feed)} posts; orjson is {"installed" if orjson else "missing"}')
+
+        results = {}
+        for name, renderer in (('drf', JSONRenderer()), ('fast', FastJSONRenderer())):
+            render_seconds = timeit.timeit(lambda: renderer.render(feed), number=repeat) / repeat
+            results[name] = (render_seconds, renderer.render(feed))
+
+        for name, parser in (('drf', JSONParser()), ('fast', FastJSONParser())):
+            content = results[name][1]
+            parse_seconds = timeit.timeit(lambda: parser.parse(io.BytesIO(content)), number=repeat) / repeat
+            render_seconds = results[name][0]
+            self.stdout.write(f'{name:>5}: render {render_seconds * 1000:8.2f} ms, parse {parse_seconds * 1000:8.2f} ms, '
+                              f'{len(content)} bytes')
+
+        self.stdout.write(f'render speedup: {results["drf"][0] / results["fast"][0]:.1f}x')
+
+    @staticmethod
+    def build_feed(count: int) -> list:
+        """Builds the same shape as /posts/public/: serialized posts with their comments inlined"""
+        author = Author(username='benchmark', display_name='benchmark', host='127.0.0.1:8000')
+        published = timezone.now()
+
+        feed = []
+        for i in range(count):
+            post = Post(author=author, title=f'post {i}', description='benchmark post', content='lorem ipsum ' * 20,
+                        categories=['benchmark', 'json'], published=published)
+            data = PostSerializer(post).data
+            data['commentsSrc'] = {
+                'type': 'comments',
+                'post': data['url'],
+                'id': data['comments'],
+                'comments': [],
+            }
+            feed.append(data)
+        return feed
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from post.models import CategoryCount
+
+
+class Command(BaseCommand):
+    help = 'Recounts the public posts of every category (see CategoryCount), e.g. after posts were changed in bulk. ' \
+           'Counts of posts saved while it runs may be off by one, so run it when things are quiet.'
+
+    def handle(self, *args, **options):
+        CategoryCount.recount()
+        self.stdout.write(self.style.SUCCESS(f'{CategoryCount.objects.filter(count__gt=0).count()} categories'))
@@ -0,0 +1,87 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from authors.models.author import Author
+from benchmarks.seed import BenchmarkSeed
+from comment.models import Comment
+from follow.models import Follow
+from inbox.models import Inbox
+from likes.models import Like, LikeType
+from post.change_feed import ChangeFeed
+from post.models import CategoryCount, Post, Visibility
+
+SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class Command(BaseCommand):
+    help = 'EXPLAINs the query behind every list endpoint and flags the ones that read a whole table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help='seed the benchmark data set first (see BenchmarkSeed); it is rolled back afterwards')
+        parser.add_argument('--analyze', action='store_true', help='run the queries too (EXPLAIN ANALYZE)')
+        parser.add_argument('--strict', action='store_true', help='fail if any query does a sequential scan')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                BenchmarkSeed().seed('http://127.0.0.1:8080')
+                with connection.cursor() as cursor:
+                    # fresh rows have no statistics; without them the planner guesses
+                    cursor.execute('ANALYZE')
+
+            flagged = self.explain_all(options['analyze'])
+            transaction.set_rollback(True)
+
+        if flagged:
+            message = f'{len(flagged)} queries do sequential scans: {", ".join(flagged)}'
+            if options['strict']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No sequential scans'))
+
+    def explain_all(self, analyze: bool) -> list:
+        author = Author.get_all_authors().first()
+        post = Post.objects.filter(author=author).first()
+        if author is None or post is None:
+            raise CommandError('Need at least one local author with a post; use --seed')
+        author_url = author.get_url()
+
+        flagged = []
+        for name, queryset in Command.get_list_queries(author, author_url, post).items():
+            plan = queryset.explain(analyze=analyze)
+            seq_scans = SEQ_SCAN.findall(plan)
+            style = self.style.WARNING if seq_scans else self.style.SUCCESS
+            self.stdout.write(style(f'== {name}: {", ".join(seq_scans) or "index only"}'))
+            self.stdout.write(plan)
+            if seq_scans:
+                flagged.append(name)
+        return flagged
+
+    @staticmethod
+    def get_list_queries(author: Author, author_url: str, post: Post) -> dict:
+        """The queries our list endpoints run, by endpoint"""
+        return {
+            'GET /authors/': Author.get_all_authors(),
+            'GET /posts/public/': Post.objects.filter(visibility=Visibility.PUBLIC),
+            'GET /posts/public/?category=': Post.objects.filter(visibility=Visibility.PUBLIC,
+                                                                categories__contains=post.categories[:1]),
+            'GET /authors/{id}/posts/': Post.objects.filter(author=author, unlisted=False).order_by('-published'),
+            'GET /authors/{id}/posts/ (own)': Post.objects.filter(author=author).order_by('-published'),
+            'GET /authors/{id}/posts/{id}/comments/':
+                Comment.objects.filter(post=post).order_by('-published', '-official_id'),
+            'GET /authors/{id}/followers/': Follow.objects.filter(target=author_url, has_accepted=True),
+            'GET /authors/{id}/following/posts/': Follow.objects.filter(actor=author_url, has_accepted=True),
+            'GET /follows/incoming/': Follow.objects.filter(target=author_url, has_accepted=False),
+            'GET /follows/outgoing/': Follow.objects.filter(actor=author_url, has_accepted=False),
+            'GET /authors/{id}/liked': Like.objects.filter(author_id=author.get_id()),
+            'GET /authors/{id}/posts/{id}/likes':
+                Like.objects.filter(object__contains=f'/posts/{post.get_id()}', object_type=LikeType.POST),
+            'GET /categories/': CategoryCount.objects.filter(count__gt=0).order_by('-count', '-category'),
+            'GET /changes': ChangeFeed.get_queryset((0, 0)),
+            'GET /changes?author=': ChangeFeed.get_queryset((0, 0), author.official_id),
+            'GET /authors/{id}/inbox/': Inbox.objects.select_related('author').filter(author_id=author.official_id),
+        }
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from mysocial.settings import base
+from post.post_replication import PostReplication
+from remote_nodes.remote_util import RemoteUtil
+
+
+class Command(BaseCommand):
+    help = "Copies the posts of every remote author a local author follows into ReplicatedPost (see " \
+           "PostReplication), each author once every SYNC_INTERVAL_SECONDS of POST_REPLICATION"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='stop once every due author was synced instead of waiting')
+        parser.add_argument('--full', action='store_true',
+                            help='sync every author, due or not, reading all their posts to pick up edits and deletes')
+        parser.add_argument('--interval', type=float, default=60.0,
+                            help='seconds to wait before looking for due authors again')
+
+    def handle(self, *args, **options):
+        if not base.REMOTE_CONFIG:
+            # what the web process does when it loads mysocial/urls.py
+            RemoteUtil.setup()
+
+        replication = PostReplication()
+        while True:
+            for author in replication.sync(timezone.now(), options['full']):
+                if author.error:
+                    self.stdout.write(self.style.WARNING(f'{author.url}: {author.error}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{author.url}: {author.posts.count()} posts, newest {author.high_water}'))
+
+            if options['once'] or options['full']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,53 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:14
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# what Post.search_vector holds; content is only searchable if it is text (not base64 images or files). The
+# 'english' configuration has to match PostSearch.CONFIG
+CREATE_TRIGGER = '''
+CREATE FUNCTION post_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(array_to_string(NEW.categories, ' '), '')), 'C') ||
+        setweight(to_tsvector('english', CASE WHEN NEW."contentType" IN ('text/plain', 'text/markdown')
+                                              THEN coalesce(NEW.content, '') ELSE '' END), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER post_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, categories, content, "contentType" ON post_post
+    FOR EACH ROW EXECUTE PROCEDURE post_search_vector_update();
+
+-- fills in existing posts
+UPDATE post_post SET title = title;
+'''
+
+DROP_TRIGGER = '''
+DROP TRIGGER IF EXISTS post_search_vector_trigger ON post_post;
+DROP FUNCTION IF EXISTS post_search_vector_update();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0008_post_post_author_unlisted_pub_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='post_search_vector_idx'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
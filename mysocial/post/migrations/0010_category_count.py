@@ -0,0 +1,45 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:16
+
+import django.contrib.postgres.indexes
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_categories(apps, schema_editor):
+    """CategoryCount.recount as of this migration"""
+    Post = apps.get_model('post', 'Post')
+    CategoryCount = apps.get_model('post', 'CategoryCount')
+
+    counts = Counter()
+    public_posts = Post.objects.filter(visibility='public', unlisted=False)
+    for categories in public_posts.values_list('categories', flat=True).iterator():
+        counts.update(set(categories))
+    CategoryCount.objects.bulk_create([CategoryCount(category=category, count=count)
+                                       for category, count in counts.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0009_post_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryCount',
+            fields=[
+                ('category', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['categories'], name='post_categories_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categorycount',
+            index=models.Index(fields=['-count', '-category'], name='categorycount_count_idx'),
+        ),
+        migrations.RunPython(count_categories, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0010_category_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplicatedAuthor',
+            fields=[
+                ('url', models.CharField(max_length=1000, primary_key=True, serialize=False)),
+                ('host', models.CharField(max_length=255)),
+                ('remote_id', models.CharField(max_length=255)),
+                ('high_water', models.DateTimeField(blank=True, null=True)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('synced', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReplicatedPost',
+            fields=[
+                ('url', models.CharField(max_length=1000, primary_key=True, serialize=False)),
+                ('post_id', models.CharField(max_length=255)),
+                ('published', models.DateTimeField(blank=True, null=True)),
+                ('data', models.JSONField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('fetched', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posts', to='post.replicatedauthor')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='replicatedauthor',
+            index=models.Index(fields=['remote_id', 'host'], name='replicatedauthor_id_host_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='replicatedpost',
+            index=models.Index(fields=['author', '-published'], name='replicatedpost_author_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='replicatedpost',
+            index=models.Index(fields=['author', 'post_id'], name='replicatedpost_author_post_idx'),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:26
+
+from django.db import migrations, models
+
+# appends a ChangeEntry for every insert, update and delete of posts, comments and likes, in the changing transaction.
+# created is clock_timestamp() rather than now(), the start of the transaction; 0013 records the transaction too
+CREATE_TRIGGERS = '''
+CREATE FUNCTION change_entry_action(operation text) RETURNS text AS $$
+    SELECT CASE operation WHEN 'INSERT' THEN 'create' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE FUNCTION post_change_entry() RETURNS trigger AS $$
+DECLARE
+    changed post_post;
+BEGIN
+    IF TG_OP = 'DELETE' THEN changed := OLD; ELSE changed := NEW; END IF;
+    INSERT INTO post_changeentry (created, kind, action, object_id, post_id, author_id)
+    VALUES (clock_timestamp(), 'post', change_entry_action(TG_OP), changed.official_id::text, changed.official_id,
+            changed.author_id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION comment_change_entry() RETURNS trigger AS $$
+DECLARE
+    changed comment_comment;
+BEGIN
+    IF TG_OP = 'DELETE' THEN changed := OLD; ELSE changed := NEW; END IF;
+    -- Django deletes a post's comments before the post, so it's still there
+    INSERT INTO post_changeentry (created, kind, action, object_id, post_id, author_id)
+    VALUES (clock_timestamp(), 'comment', change_entry_action(TG_OP), changed.official_id::text, changed.post_id,
+            (SELECT author_id FROM post_post WHERE official_id = changed.post_id));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION like_change_entry() RETURNS trigger AS $$
+DECLARE
+    changed likes_like;
+BEGIN
+    IF TG_OP = 'DELETE' THEN changed := OLD; ELSE changed := NEW; END IF;
+    -- the liked object is a url like http://host/authors/{AUTHOR_ID}/posts/{POST_ID}[/comments/{COMMENT_ID}]
+    INSERT INTO post_changeentry (created, kind, action, object_id, post_id, author_id, data)
+    VALUES (clock_timestamp(), 'like', change_entry_action(TG_OP), changed.id::text,
+            substring(changed.object FROM '/posts/([0-9a-fA-F-]{36})')::uuid,
+            substring(changed.object FROM '/authors/([0-9a-fA-F-]{36})/posts/')::uuid,
+            jsonb_build_object('type', 'Like', 'author', changed.author, 'object', changed.object));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER post_change_entry_trigger AFTER INSERT OR UPDATE OR DELETE ON post_post
+    FOR EACH ROW EXECUTE PROCEDURE post_change_entry();
+CREATE TRIGGER comment_change_entry_trigger AFTER INSERT OR UPDATE OR DELETE ON comment_comment
+    FOR EACH ROW EXECUTE PROCEDURE comment_change_entry();
+CREATE TRIGGER like_change_entry_trigger AFTER INSERT OR UPDATE OR DELETE ON likes_like
+    FOR EACH ROW EXECUTE PROCEDURE like_change_entry();
+
+-- existing rows are logged as created, so reading the feed from the start gets everything
+INSERT INTO post_changeentry (created, kind, action, object_id, post_id, author_id)
+SELECT clock_timestamp(), 'post', 'create', p.official_id::text, p.official_id, p.author_id
+FROM post_post p ORDER BY p.published, p.official_id;
+INSERT INTO post_changeentry (created, kind, action, object_id, post_id, author_id)
+SELECT clock_timestamp(), 'comment', 'create', c.official_id::text, c.post_id, p.author_id
+FROM comment_comment c JOIN post_post p ON p.official_id = c.post_id
+ORDER BY c.published, c.official_id;
+INSERT INTO post_changeentry (created, kind, action, object_id, post_id, author_id, data)
+SELECT clock_timestamp(), 'like', 'create', l.id::text,
+       substring(l.object FROM '/posts/([0-9a-fA-F-]{36})')::uuid,
+       substring(l.object FROM '/authors/([0-9a-fA-F-]{36})/posts/')::uuid,
+       jsonb_build_object('type', 'Like', 'author', l.author, 'object', l.object)
+FROM likes_like l ORDER BY l.id;
+'''
+
+DROP_TRIGGERS = '''
+DROP TRIGGER IF EXISTS like_change_entry_trigger ON likes_like;
+DROP TRIGGER IF EXISTS comment_change_entry_trigger ON comment_comment;
+DROP TRIGGER IF EXISTS post_change_entry_trigger ON post_post;
+DROP FUNCTION IF EXISTS like_change_entry();
+DROP FUNCTION IF EXISTS comment_change_entry();
+DROP FUNCTION IF EXISTS post_change_entry();
+DROP FUNCTION IF EXISTS change_entry_action(text);
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0011_replicated_posts'),
+        ('comment', '0005_comment_updated_at'),
+        ('likes', '0002_like_like_object_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('created', models.DateTimeField()),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('comment', 'Comment'), ('like', 'Like')], max_length=20)),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=20)),
+                ('object_id', models.TextField()),
+                ('post_id', models.UUIDField(blank=True, null=True)),
+                ('author_id', models.UUIDField(blank=True, null=True)),
+                ('data', models.JSONField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='changeentry',
+            index=models.Index(fields=['author_id', 'id'], name='changeentry_author_id_idx'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
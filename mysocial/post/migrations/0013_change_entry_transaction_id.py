@@ -0,0 +1,119 @@
+# Generated by Django 4.1.2 on 2026-10-19 17:46
+
+from django.db import migrations, models
+
+# the trigger functions of 0012, recording the transaction of every entry; see ChangeFeed.get_entries
+RECORD_TRANSACTIONS = '''
+CREATE OR REPLACE FUNCTION post_change_entry() RETURNS trigger AS $$
+DECLARE
+    changed post_post;
+BEGIN
+    IF TG_OP = 'DELETE' THEN changed := OLD; ELSE changed := NEW; END IF;
+    INSERT INTO post_changeentry (transaction_id, created, kind, action, object_id, post_id, author_id)
+    VALUES (pg_current_xact_id()::text::bigint, clock_timestamp(), 'post', change_entry_action(TG_OP),
+            changed.official_id::text, changed.official_id, changed.author_id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION comment_change_entry() RETURNS trigger AS $$
+DECLARE
+    changed comment_comment;
+BEGIN
+    IF TG_OP = 'DELETE' THEN changed := OLD; ELSE changed := NEW; END IF;
+    -- Django deletes a post's comments before the post, so it's still there
+    INSERT INTO post_changeentry (transaction_id, created, kind, action, object_id, post_id, author_id)
+    VALUES (pg_current_xact_id()::text::bigint, clock_timestamp(), 'comment', change_entry_action(TG_OP),
+            changed.official_id::text, changed.post_id,
+            (SELECT author_id FROM post_post WHERE official_id = changed.post_id));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION like_change_entry() RETURNS trigger AS $$
+DECLARE
+    changed likes_like;
+BEGIN
+    IF TG_OP = 'DELETE' THEN changed := OLD; ELSE changed := NEW; END IF;
+    -- the liked object is a url like http://host/authors/{AUTHOR_ID}/posts/{POST_ID}[/comments/{COMMENT_ID}]
+    INSERT INTO post_changeentry (transaction_id, created, kind, action, object_id, post_id, author_id, data)
+    VALUES (pg_current_xact_id()::text::bigint, clock_timestamp(), 'like', change_entry_action(TG_OP),
+            changed.id::text,
+            substring(changed.object FROM '/posts/([0-9a-fA-F-]{36})')::uuid,
+            substring(changed.object FROM '/authors/([0-9a-fA-F-]{36})/posts/')::uuid,
+            jsonb_build_object('type', 'Like', 'author', changed.author, 'object', changed.object));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+'''
+
+# the functions as 0012 made them
+DROP_TRANSACTIONS = '''
+CREATE OR REPLACE FUNCTION post_change_entry() RETURNS trigger AS $$
+DECLARE
+    changed post_post;
+BEGIN
+    IF TG_OP = 'DELETE' THEN changed := OLD; ELSE changed := NEW; END IF;
+    INSERT INTO post_changeentry (created, kind, action, object_id, post_id, author_id)
+    VALUES (clock_timestamp(), 'post', change_entry_action(TG_OP), changed.official_id::text,
+            changed.official_id, changed.author_id);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION comment_change_entry() RETURNS trigger AS $$
+DECLARE
+    changed comment_comment;
+BEGIN
+    IF TG_OP = 'DELETE' THEN changed := OLD; ELSE changed := NEW; END IF;
+    -- Django deletes a post's comments before the post, so it's still there
+    INSERT INTO post_changeentry (created, kind, action, object_id, post_id, author_id)
+    VALUES (clock_timestamp(), 'comment', change_entry_action(TG_OP), changed.official_id::text,
+            changed.post_id, (SELECT author_id FROM post_post WHERE official_id = changed.post_id));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION like_change_entry() RETURNS trigger AS $$
+DECLARE
+    changed likes_like;
+BEGIN
+    IF TG_OP = 'DELETE' THEN changed := OLD; ELSE changed := NEW; END IF;
+    -- the liked object is a url like http://host/authors/{AUTHOR_ID}/posts/{POST_ID}[/comments/{COMMENT_ID}]
+    INSERT INTO post_changeentry (created, kind, action, object_id, post_id, author_id, data)
+    VALUES (clock_timestamp(), 'like', change_entry_action(TG_OP), changed.id::text,
+            substring(changed.object FROM '/posts/([0-9a-fA-F-]{36})')::uuid,
+            substring(changed.object FROM '/authors/([0-9a-fA-F-]{36})/posts/')::uuid,
+            jsonb_build_object('type', 'Like', 'author', changed.author, 'object', changed.object));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0012_change_entry'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='changeentry',
+            name='changeentry_author_id_idx',
+        ),
+        migrations.AddField(
+            model_name='changeentry',
+            name='transaction_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='changeentry',
+            index=models.Index(fields=['transaction_id', 'id'], name='changeentry_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changeentry',
+            index=models.Index(fields=['author_id', 'transaction_id', 'id'], name='changeentry_author_pos_idx'),
+        ),
+        migrations.RunSQL(RECORD_TRANSACTIONS, DROP_TRANSACTIONS),
+    ]
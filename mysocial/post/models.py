@@ -1,7 +1,12 @@
-from django.db import models
+from collections import Counter
+
+from django.db import models, transaction
+from django.db.models import F
 from datetime import datetime
 import uuid
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 
 
 # AMANDA TO DO:
@@ -31,6 +36,8 @@ class Post(models.Model):
     description = models.CharField(max_length=500, blank = True)
     content = models.TextField(default = "", blank = True)
     unlisted = models.BooleanField(default=False)
+    # row version for conditional GETs; see ConditionalHelper
+    updated_at = models.DateTimeField(auto_now=True)
 
     # comments
     count = models.PositiveIntegerField(default = 0, blank = True)
@@ -39,6 +46,21 @@ class Post(models.Model):
 
     visibility = models.CharField(choices = Visibility.choices, default = Visibility.PUBLIC, max_length = 20)
     contentType = models.CharField(choices=ContentType.choices, default = ContentType.PLAIN, max_length = 20)
+    # title, description, categories and text content, weighted in that order; kept up to date by a database trigger
+    # (see migration 0009), so never set it. See PostSearch
+    search_vector = SearchVectorField(null = True, editable = False)
+
+    class Meta:
+        indexes = [
+            # an author's posts, newest first, with or without the unlisted ones; see CreationPostView.get
+            models.Index(fields=['author', 'unlisted', '-published'], name='post_author_unlisted_pub_idx'),
+            # the public feed; see PublicPostView
+            models.Index(fields=['visibility', '-published'], name='post_visibility_pub_idx'),
+            # full-text search; see PostSearchView
+            GinIndex(fields=['search_vector'], name='post_search_vector_idx'),
+            # ?category= on post listings (categories__contains); see PostHelper.filter_categories
+            GinIndex(fields=['categories'], name='post_categories_idx'),
+        ]
 
     def get_id(self) -> str:
         return str(self.official_id)
@@ -52,3 +74,144 @@ def get_comments_url(self) -> str:
         # note: we might have to refactor this if some other team has a funky comments url
         author_url = self.author.get_url().rstrip('/')
         return f'{author_url}/posts/{self.official_id}/comments'
+
+
+class CategoryCount(models.Model):
+    """
+    How many public, listed posts have a category; what CategoryView returns. Kept up to date by the receivers in
+    post/signals.py, so changes that skip signals (QuerySet.update, bulk_create) have to be followed by
+    `python manage.py count_categories`, which recounts from scratch.
+
+    Categories no post has anymore stay, with a count of 0, so a post adding one back never races a delete.
+    """
+    category = models.CharField(primary_key = True, max_length = 30)
+    count = models.IntegerField(default = 0)
+
+    class Meta:
+        indexes = [
+            # most used first; see CategoryView
+            models.Index(fields=['-count', '-category'], name='categorycount_count_idx'),
+        ]
+
+    @staticmethod
+    def get_counted_categories(visibility: str, unlisted: bool, categories: list) -> set:
+        """The categories a post with these fields counts towards"""
+        # fields of a post that was just created are as given, e.g. "False" for unlisted
+        if visibility != Visibility.PUBLIC or Post._meta.get_field('unlisted').to_python(unlisted):
+            return set()
+        return set(categories or [])
+
+    @staticmethod
+    def change(added: set, removed: set):
+        """Counts a post towards the added categories and no longer towards the removed ones"""
+        if not added and not removed:
+            return
+        with transaction.atomic():
+            if added:
+                CategoryCount.objects.bulk_create([CategoryCount(category=category) for category in sorted(added)],
+                                                  ignore_conflicts=True)
+                CategoryCount.objects.filter(category__in=added).update(count=F('count') + 1)
+            if removed:
+                CategoryCount.objects.filter(category__in=removed).update(count=F('count') - 1)
+
+    @staticmethod
+    def recount():
+        """Replaces every count with one counted from the posts"""
+        counts = Counter()
+        public_posts = Post.objects.filter(visibility=Visibility.PUBLIC, unlisted=False)
+        for categories in public_posts.values_list('categories', flat=True).iterator():
+            counts.update(set(categories))
+
+        with transaction.atomic():
+            CategoryCount.objects.all().delete()
+            CategoryCount.objects.bulk_create([CategoryCount(category=category, count=count)
+                                               for category, count in counts.items()])
+
+
+class ReplicatedAuthor(models.Model):
+    """
+    A remote author some local author follows, whose posts we keep a read-only copy of (ReplicatedPost); see
+    PostReplication. Deleted, with its posts, once nobody here follows them anymore.
+    """
+    # the Follow target, without the trailing slash
+    url = models.CharField(primary_key = True, max_length = 1000)
+    host = models.CharField(max_length = 255)
+    # whatever their node uses as id; not always a uuid
+    remote_id = models.CharField(max_length = 255)
+    # newest published of the copied posts; incremental syncs stop once they reach it
+    high_water = models.DateTimeField(null = True, blank = True)
+    # when the last sync started, finished or not
+    started = models.DateTimeField(null = True, blank = True)
+    # when the last sync that succeeded started; the copy is as old as this
+    synced = models.DateTimeField(null = True, blank = True)
+    # why the last sync failed, if it did
+    error = models.TextField(blank = True, default = '')
+
+    class Meta:
+        indexes = [
+            # finding the copy of a followed author; see PostReplication.get_posts
+            models.Index(fields=['remote_id', 'host'], name='replicatedauthor_id_host_idx'),
+        ]
+
+
+class ReplicatedPost(models.Model):
+    """A remote post as its node sent it, copied by PostReplication; never changed here"""
+    # the post's url, without the trailing slash
+    url = models.CharField(primary_key = True, max_length = 1000)
+    author = models.ForeignKey(ReplicatedAuthor, on_delete = models.CASCADE, related_name = 'posts')
+    # last part of the url; how SharePostView finds it
+    post_id = models.CharField(max_length = 255)
+    published = models.DateTimeField(null = True, blank = True)
+    data = models.JSONField()
+    # sha256 of data; rows are only rewritten when it changes
+    content_hash = models.CharField(max_length = 64)
+    fetched = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # an author's posts, newest first; see FollowingPostView
+            models.Index(fields=['author', '-published'], name='replicatedpost_author_pub_idx'),
+            models.Index(fields=['author', 'post_id'], name='replicatedpost_author_post_idx'),
+        ]
+
+
+class ChangeKind(models.TextChoices):
+    POST = "post"
+    COMMENT = "comment"
+    LIKE = "like"
+
+class ChangeAction(models.TextChoices):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+class ChangeEntry(models.Model):
+    """
+    One row per create, update or delete of a post, comment or like; see ChangeFeed. Rows are appended by database
+    triggers in the same transaction as the change (see migrations 0012 and 0013), so QuerySet.update and bulk deletes are
+    logged too. Never write or change them here.
+    """
+    # the order of the entries of a transaction
+    id = models.BigAutoField(primary_key = True)
+    # the writing transaction (pg_current_xact_id()); the log is in (transaction_id, id) order, see ChangeFeed. 0 for
+    # the entries logged before it was recorded
+    transaction_id = models.BigIntegerField(default = 0)
+    # when the row was written, not when its transaction started
+    created = models.DateTimeField()
+    kind = models.CharField(choices = ChangeKind.choices, max_length = 20)
+    action = models.CharField(choices = ChangeAction.choices, max_length = 20)
+    # the changed row's primary key
+    object_id = models.TextField()
+    # the post the change is on and its author, for tombstones and ?author=; null for likes of things that aren't posts
+    # or comments of ours
+    post_id = models.UUIDField(null = True, blank = True)
+    author_id = models.UUIDField(null = True, blank = True)
+    # the like itself (type, author, object), so it can still be told apart once it's deleted; null otherwise
+    data = models.JSONField(null = True, blank = True)
+
+    class Meta:
+        indexes = [
+            # the changes in order, and an author's; see ChangeFeedView
+            models.Index(fields=['transaction_id', 'id'], name='changeentry_position_idx'),
+            models.Index(fields=['author_id', 'transaction_id', 'id'], name='changeentry_author_pos_idx'),
+        ]
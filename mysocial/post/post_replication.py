@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import pathlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+from urllib.parse import urlparse
+
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from authors.models.author import Author
+from common.fast_json import FastJSON
+from follow.models import Follow
+from mysocial.settings import base
+from post.models import ReplicatedAuthor, ReplicatedPost
+
+logger = logging.getLogger(__name__)
+
+
+class PostReplication:
+    """
+    Keeps ReplicatedPost, a read-only copy of the posts of every remote author a local author follows, so timelines
+    (FollowingPostView) and shares (SharePostView) don't wait on other nodes. replicate_remote_posts syncs each
+    followed author every SYNC_INTERVAL_SECONDS of base.POST_REPLICATION, node by node.
+
+    A sync reads the author's posts newest first and stops at the first page that reaches the author's high water
+    mark (the newest published it already has), so it only downloads what's new. Edits and deletes of older posts are
+    picked up by a full sync (`replicate_remote_posts --full`). A copy is used until its last sync is MAX_AGE_SECONDS
+    old; past that, or before the first sync, the node is asked live like before.
+
+    Example how to use::
+
+        replication = PostReplication()
+        replication.sync(timezone.now())
+    """
+
+    def __init__(self, config: dict = None):
+        config = base.POST_REPLICATION if config is None else config
+        self.sync_interval = timedelta(seconds=config['SYNC_INTERVAL_SECONDS'])
+        self.page_size = config['PAGE_SIZE']
+        self.max_pages = config['MAX_PAGES']
+
+    @staticmethod
+    def get_url_key(url: str) -> str:
+        return str(url).rstrip('/')
+
+    @staticmethod
+    def get_followed_authors() -> dict:
+        """The remote authors local authors follow, as unsaved ReplicatedAuthors by url"""
+        followed = {}
+        for actor_url, target_url in Follow.objects.filter(has_accepted=True).values_list('actor', 'target'):
+            host = urlparse(target_url).netloc
+            if urlparse(actor_url).netloc != base.CURRENT_DOMAIN or host not in base.REMOTE_CONFIG:
+                continue
+            url = PostReplication.get_url_key(target_url)
+            followed[url] = ReplicatedAuthor(url=url, host=host, remote_id=pathlib.PurePath(url).name)
+        return followed
+
+    def sync(self, now: datetime, full: bool = False) -> list:
+        """
+        Starts copying newly followed authors, drops unfollowed ones and syncs the ones that are due (all of them if
+        full).
+
+        :return: The ReplicatedAuthors that were synced; check their error
+        """
+        followed = PostReplication.get_followed_authors()
+        ReplicatedAuthor.objects.bulk_create(list(followed.values()), ignore_conflicts=True)
+        # their posts go with them
+        ReplicatedAuthor.objects.exclude(url__in=list(followed.keys())).delete()
+
+        authors = ReplicatedAuthor.objects.all()
+        if not full:
+            authors = authors.filter(Q(started__isnull=True) | Q(started__lte=now - self.sync_interval))
+
+        authors_by_host = defaultdict(list)
+        for author in authors.order_by('host', 'url'):
+            authors_by_host[author.host].append(author)
+
+        synced = []
+        for host, host_authors in authors_by_host.items():
+            node_config = base.REMOTE_CONFIG.get(host)
+            for author in host_authors:
+                synced.append(self.sync_author(node_config, author, now, full))
+        return synced
+
+    def sync_author(self, node_config, author: ReplicatedAuthor, now: datetime, full: bool = False) -> ReplicatedAuthor:
+        author.started = now
+        author.save(update_fields=['started'])
+
+        previous_urls = None
+        is_complete = False
+        error = ''
+        for page in range(1, self.max_pages + 1):
+            items, error = self.get_page(node_config, author, page)
+            if items is None:
+                # past the last page, some nodes answer with an error instead of an empty page
+                if page > 1:
+                    error = ''
+                break
+
+            posts = PostReplication.to_posts(author, items, now)
+            urls = [post.url for post in posts]
+            if urls == previous_urls:
+                # the node ignores page and size and sent everything again
+                is_complete = True
+                break
+            previous_urls = urls
+
+            PostReplication.save_posts(posts)
+            if len(items) < self.page_size:
+                is_complete = True
+                break
+            if not full and author.high_water is not None and \
+                    any(post.published is not None and post.published <= author.high_water for post in posts):
+                # the rest was copied before
+                break
+        else:
+            if full:
+                error = f'stopped after {self.max_pages} pages'
+
+        if full and is_complete:
+            author.posts.filter(fetched__lt=now).delete()
+        if not error:
+            author.synced = now
+            author.high_water = author.posts.aggregate(Max('published'))['published__max']
+        author.error = error
+        author.save()
+
+        if error:
+            logger.warning(f'PostReplication: {author.url}: {error}')
+        return author
+
+    def get_page(self, node_config, author: ReplicatedAuthor, page: int) -> (Optional[list], str):
+        if node_config is None:
+            return None, 'not a connected node'
+
+        try:
+            response = node_config.get_authors_posts_page(f'/authors/{author.remote_id}/posts/',
+                                                          {'page': page, 'size': self.page_size})
+        except Exception as e:
+            return None, f'could not get page {page}: {e}'
+        if response.status_code < 200 or response.status_code > 299:
+            return None, f'could not get page {page}: {response.status_code}'
+
+        data = response.data if hasattr(response, 'data') else FastJSON.loads(response.content)
+        items = data.get('items') if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return None, f'page {page} has no items'
+        return items, ''
+
+    @staticmethod
+    def to_posts(author: ReplicatedAuthor, items: list, now: datetime) -> list:
+        posts = {}
+        for item in items:
+            if not isinstance(item, dict) or not item.get('id'):
+                continue
+            url = str(item.get('url') or item['id'])
+            if not url.startswith('http'):
+                url = f'{author.url}/posts/{url}'
+            url = PostReplication.get_url_key(url)
+
+            published = parse_datetime(str(item.get('published', '')))
+            if published is not None and timezone.is_naive(published):
+                published = timezone.make_aware(published)
+            posts[url] = ReplicatedPost(url=url, author=author, post_id=pathlib.PurePath(url).name,
+                                        published=published, data=item, fetched=now,
+                                        content_hash=hashlib.sha256(FastJSON.dumps(item)).hexdigest())
+        return list(posts.values())
+
+    @staticmethod
+    def save_posts(posts: list):
+        """Adds new posts and rewrites changed ones; the others are only marked as fetched"""
+        hashes = dict(ReplicatedPost.objects.filter(url__in=[post.url for post in posts])
+                      .values_list('url', 'content_hash'))
+
+        new_posts = [post for post in posts if post.url not in hashes]
+        changed_posts = [post for post in posts if post.url in hashes and hashes[post.url] != post.content_hash]
+        unchanged_urls = [post.url for post in posts if hashes.get(post.url) == post.content_hash]
+
+        ReplicatedPost.objects.bulk_create(new_posts, ignore_conflicts=True)
+        ReplicatedPost.objects.bulk_update(changed_posts, ['published', 'data', 'content_hash', 'fetched'])
+        if unchanged_urls:
+            ReplicatedPost.objects.filter(url__in=unchanged_urls).update(fetched=posts[0].fetched)
+
+    @staticmethod
+    def get_fresh_authors(authors: list, now: datetime = None) -> dict:
+        """The ReplicatedAuthors of these remote authors whose copy is fresh, by (host, id)"""
+        now = now or timezone.now()
+        max_age = timedelta(seconds=base.POST_REPLICATION['MAX_AGE_SECONDS'])
+        replicated = ReplicatedAuthor.objects.filter(remote_id__in=[author.get_id() for author in authors],
+                                                     synced__gt=now - max_age)
+        keys = {(author.host, author.get_id()) for author in authors}
+        return {(replicated_author.host, replicated_author.remote_id): replicated_author
+                for replicated_author in replicated if (replicated_author.host, replicated_author.remote_id) in keys}
+
+    @staticmethod
+    def get_posts(authors: list, now: datetime = None) -> dict:
+        """
+        The copied posts of these remote authors, newest first, in two queries.
+
+        :return: Lists of post jsons by (host, id); authors we have to ask live are left out
+        """
+        fresh = PostReplication.get_fresh_authors(authors, now)
+        posts = {key: [] for key in fresh}
+        keys = {replicated_author.url: key for key, replicated_author in fresh.items()}
+        replicated_posts = ReplicatedPost.objects.filter(author__in=list(fresh.values())) \
+            .order_by('-published', 'url').values_list('author', 'data')
+        for author_url, data in replicated_posts:
+            posts[keys[author_url]].append(data)
+        return posts
+
+    @staticmethod
+    def get_post(author: Author, post_id: str) -> Optional[dict]:
+        """The copy of a remote author's post, or None if we don't have a fresh one"""
+        replicated_author = PostReplication.get_fresh_authors([author]).get((author.host, author.get_id()))
+        if replicated_author is None:
+            return None
+        return replicated_author.posts.filter(post_id=str(post_id)).values_list('data', flat=True).first()
+
+    @staticmethod
+    def purge_if_unfollowed(target_url: str):
+        """Drops the copy of the author's posts if no one here follows them anymore"""
+        url = PostReplication.get_url_key(target_url)
+        if Follow.objects.filter(target__in=[url, f'{url}/'], has_accepted=True).exists():
+            return
+        ReplicatedAuthor.objects.filter(url=url).delete()
@@ -0,0 +1,66 @@
+import uuid
+from typing import Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField, Q, QuerySet
+from django.db.models.functions import Cast
+
+from authors.models.author import Author
+from authors.util import AuthorUtil
+from follow.models import Follow
+from post.models import Post, Visibility
+
+
+class PostSearch:
+    """
+    Full-text search over Post.search_vector, best match first.
+
+    Example how to use::
+
+        posts = PostSearch.search('cats -dogs', viewer=request.user)
+    """
+    # the text search configuration the search vector is built with; see post migration 0009
+    CONFIG = 'english'
+    MAX_QUERY_LENGTH = 200
+
+    @staticmethod
+    def search(text: str, viewer: Optional[Author] = None) -> QuerySet:
+        """
+        Listed posts matching text, in websearch syntax (e.g. `"exact phrase" cats or dogs -birds`), that viewer can
+        see: public ones, and friends-only ones of viewer's friends and viewer.
+
+        Each post has its rank; they are ordered by -rank, -official_id so they can be paginated with
+        PaginationHelper.paginate_queryset.
+        """
+        query = SearchQuery(text, config=PostSearch.CONFIG, search_type='websearch')
+        # ts_rank is a real; as a double it survives the round trip through a pagination cursor exactly
+        rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+        return Post.objects.select_related('author') \
+            .filter(PostSearch.get_visible_condition(viewer), search_vector=query, unlisted=False) \
+            .annotate(rank=rank) \
+            .order_by('-rank', '-official_id')
+
+    @staticmethod
+    def get_visible_condition(viewer: Optional[Author]) -> Q:
+        condition = Q(visibility=Visibility.PUBLIC)
+        if viewer is not None:
+            author_ids = PostSearch.get_friend_ids(viewer) + [viewer.official_id]
+            condition |= Q(visibility=Visibility.FRIENDS, author_id__in=author_ids)
+        return condition
+
+    @staticmethod
+    def get_friend_ids(author: Author) -> list:
+        """Ids of the local authors that follow author and that author follows, in one query"""
+        author_url = author.get_url()
+        follower_urls = Follow.objects.filter(target=author_url, has_accepted=True).values('actor')
+        friend_urls = Follow.objects.filter(actor=author_url, has_accepted=True, target__in=follower_urls) \
+            .values_list('target', flat=True)
+
+        friend_ids = []
+        for friend_url in friend_urls:
+            # remote friends have no posts here, and their ids may not even be uuids
+            try:
+                friend_ids.append(uuid.UUID(AuthorUtil.from_author_url_to_local_id(friend_url)))
+            except ValueError:
+                continue
+        return friend_ids
@@ -1,6 +1,7 @@
+import logging
 from rest_framework import serializers
 from authors.serializers.author_serializer import AuthorSerializer 
-from .models import Post, ContentType, Visibility
+from .models import CategoryCount, Post, ContentType, Visibility
 from comment.models import Comment
 from authors.models.author import Author
 from drf_spectacular.utils import OpenApiExample, extend_schema_field, extend_schema_serializer
@@ -8,6 +9,8 @@
 from mysocial.settings import base
 import pathlib
 
+logger = logging.getLogger(__name__)
+
 POST_SERIALIZER_EXAMPLE = {
     "type": "post",
     "title": "mytitle",
@@ -67,12 +70,7 @@ def get_comments(self, obj):
     
     @extend_schema_field(list[str])
     def get_categories(self, obj):
-        category_list = []
-        
-        for category in obj.categories:
-            category_list.append(category)
-
-        return category_list
+        return list(obj.categories)
     
     def to_internal_value(self, data: dict) -> Post:
         """
@@ -94,7 +92,7 @@ def to_internal_value(self, data: dict) -> Post:
                 post = Post()
                 node_config = base.REMOTE_CONFIG.get(host)
                 if node_config is None:
-                    print(f"PostSerializer: Host not found: {host}")
+                    logger.warning(f"PostSerializer: Host not found: {host}")
                     return serializers.ValidationError(f"PostSerializer: Host not found: {host}")
 
                 post_remote_fields: dict = node_config.post_remote_fields
@@ -123,7 +121,7 @@ def to_internal_value(self, data: dict) -> Post:
                         setattr(post, local_field, data[remote_field])
 
         except Exception as e:
-            print(f"PostSerializer: failed serializing {e}")
+            logger.warning(f"PostSerializer: failed serializing {e}")
             raise serializers.ValidationError(f"PostSerializer: failed serializing {e}")
 
         return post
@@ -191,3 +189,9 @@ class InboxPostSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = ('type', 'title', 'id', 'source', 'origin', 'description', 'content', 'contentType',  'author', 'categories', 'count', 'comments', 'published', 'visibility', 'unlisted', 'url')
+
+
+class CategoryCountSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CategoryCount
+        fields = ('category', 'count')
@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from common.response_cache import ResponseCache
+from follow.models import Follow
+from post.models import CategoryCount, Post
+from post.post_replication import PostReplication
+
+
+@receiver([post_save, post_delete], sender = Post)
+def invalidate_post_responses(sender, instance, **kwargs):
+    ResponseCache.invalidate(ResponseCache.PUBLIC_POSTS)
+    ResponseCache.invalidate(ResponseCache.AUTHOR_POSTS, str(instance.author_id))
+
+
+@receiver(pre_save, sender = Post)
+def remember_counted_categories(sender, instance, **kwargs):
+    # what the post counted towards before this save; see CategoryCount
+    instance._counted_categories = set()
+    if instance._state.adding:
+        return
+    old = Post.objects.filter(pk = instance.pk).values('visibility', 'unlisted', 'categories').first()
+    if old is not None:
+        instance._counted_categories = CategoryCount.get_counted_categories(**old)
+
+
+@receiver(post_save, sender = Post)
+def count_categories(sender, instance, **kwargs):
+    old = getattr(instance, '_counted_categories', set())
+    new = CategoryCount.get_counted_categories(instance.visibility, instance.unlisted, instance.categories)
+    CategoryCount.change(added = new - old, removed = old - new)
+    instance._counted_categories = new
+
+
+@receiver(post_delete, sender = Post)
+def uncount_categories(sender, instance, **kwargs):
+    CategoryCount.change(added = set(), removed = CategoryCount.get_counted_categories(
+        instance.visibility, instance.unlisted, instance.categories))
+
+
+@receiver([post_save, post_delete], sender = Follow)
+def purge_replicated_posts(sender, instance, **kwargs):
+    # an unfollow is a delete, or a follow that isn't accepted anymore
+    if kwargs.get('signal') is post_delete or not instance.has_accepted:
+        PostReplication.purge_if_unfollowed(instance.target)
@@ -1,13 +1,24 @@
 import json
+from unittest import mock
 
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
-from post.models import Visibility
+from authors.author_directory import AuthorDirectory
+from benchmarks.stub_peer import StubPeer
+from comment.models import Comment
+from common.base_util import BaseUtil
+from common.response_cache import ResponseCache
+from mysocial.settings import base
+from post.models import ContentType, ReplicatedAuthor, ReplicatedPost, Visibility
+from post.post_replication import PostReplication
 from authors.models.author import Author
 import logging, uuid
 from common.test_helper import TestHelper
 from follow.models import Follow
 from inbox.models import Inbox
+from likes.models import Like, LikeType
 
 logger = logging.getLogger("mylogger")
 #pymike00, October 29, https://www.youtube.com/watch?v=1FqxfnlQPi8&ab_channel=pymike00
@@ -37,7 +48,33 @@ def test_get_all_public_posts(self):
         self.assertEqual(len(response.data), 2)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-    # GET /authors/{AUTHOR_UUID}/posts?page={INT}&size={INT}
+    # GET posts/public twice, around a new post
+    @mock.patch.dict(base.RESPONSE_CACHE_TTL, {ResponseCache.PUBLIC_POSTS: 30})
+    def test_get_all_public_posts_cached(self):
+        request = "/posts/public/"
+
+        response = self.client.get(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # the second response is served from the cache and matches the first
+        cached_response = self.client.get(request)
+        self.assertEqual(cached_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(len(json.loads(cached_response.content)), 2)
+
+        # a new public post invalidates the cached response
+        TestHelper.create_post(author = self.author2)
+        response = self.client.get(request)
+        self.assertEqual(len(response.data), 3)
+
+        # responses cached under a generation that was evicted are never served again
+        generation_key = ResponseCache._make_generation_key(ResponseCache.PUBLIC_POSTS, '')
+        cache.delete(generation_key)
+        TestHelper.create_post(author = self.author2)
+        cache.delete(generation_key)
+        response = self.client.get(request)
+        self.assertEqual(len(response.data), 4)
+
     def test_get_posts_by_author(self):
         # author 1 should have 2 created posts
         request = f"/authors/{self.author1.get_id()}/posts/?page={1}&size={2}"
@@ -83,6 +120,25 @@ def test_get_specific_post(self):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    # GET /authors/{AUTHOR_UUID}/posts/{POST_UUID} with If-None-Match
+    def test_get_specific_post_not_modified(self):
+        request = f"/authors/{self.author1.official_id}/posts/{self.existing_post.official_id}/"
+
+        response = self.client.get(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+
+        response = self.client.get(request, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # any change to the post invalidates the client's copy
+        self.existing_post.title = "new title"
+        self.existing_post.save()
+        response = self.client.get(request, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
     # DELETE /authors/{AUTHOR_UUID}/posts/{POST_UUID}
     def test_delete_post(self):
         self.client.force_login(self.author1)
@@ -134,9 +190,172 @@ def test_share_post_sends_local_followers(self):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(inbox_item.get('id'), self.existing_post.get_id())
+
+    # GET posts/public?category= and categories
+    def test_categories(self):
+        cat_post = TestHelper.create_post(author = self.author1, other_args = {"categories": ["cats", "test"]})
+        TestHelper.create_post(author = self.author1, other_args = {"categories": ["cats"], "unlisted": True})
+
+        response = self.client.get("/posts/public/?category=cats&category=test")
+        self.assertEqual([post['id'] for post in response.data], [cat_post.get_id()])
+        response = self.client.get(f"/authors/{self.author1.get_id()}/posts/?category=cats")
+        self.assertEqual([post['id'] for post in response.data['items']], [cat_post.get_id()])
+
+        # only public, listed posts count
+        response = self.client.get("/categories/")
+        self.assertEqual(response.data['items'], [{'category': 'test', 'count': 3}, {'category': 'cats', 'count': 1}])
+
+        cat_post.categories = ["dogs"]
+        cat_post.save()
+        self.author2_post.delete()
+        response = self.client.get("/categories/?size=1")
+        self.assertEqual(response.data['items'], [{'category': 'test', 'count': 1}])
+        response = self.client.get(f"/categories/?after={response.data['next']}")
+        self.assertEqual(response.data['items'], [{'category': 'dogs', 'count': 1}])
+        self.assertNotIn('next', response.data)
+
+    # GET changes
+    def test_change_feed(self):
+        response = self.client.get("/changes?size=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(item['action'], item['object']['id']) for item in response.data['items']],
+                         [('create', self.existing_post.get_id()), ('create', self.private_post.get_id())])
+
+        response = self.client.get(f"/changes?since={response.data['next']}")
+        self.assertEqual([item['object']['id'] for item in response.data['items']], [self.author2_post.get_id()])
+        since = response.data['next']
+
+        # only what changed since, with a tombstone for what's gone
+        self.existing_post.title = "changed"
+        self.existing_post.save()
+        author2_post_url = self.author2_post.get_url()
+        self.author2_post.delete()
+        response = self.client.get(f"/changes?since={since}")
+        self.assertEqual([(item['action'], item['object']['type']) for item in response.data['items']],
+                         [('update', 'post'), ('delete', 'tombstone')])
+        self.assertEqual(response.data['items'][0]['object']['title'], "changed")
+        self.assertEqual(response.data['items'][1]['object']['id'], author2_post_url)
+
+        response = self.client.get(f"/changes?since={since}&author={self.author2.get_id()}")
+        self.assertEqual([item['action'] for item in response.data['items']], ['delete'])
+
+        response = self.client.get("/changes?since=first")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # plain ids, the tokens from before transactions were recorded, are still read
+        response = self.client.get("/changes?since=0&size=1")
+        self.assertEqual([item['object']['id'] for item in response.data['items']], [self.existing_post.get_id()])
+
+    def test_change_feed_visibility(self):
+        comment = Comment.objects.create(author = {}, comment = "for friends", post = self.private_post)
+        like = Like.objects.create(author = {}, author_id = self.author1.official_id,
+                                   object = self.private_post.get_url(), object_type = LikeType.POST)
+        unlisted_post = TestHelper.create_post(author = self.author1, other_args = {"unlisted": True})
+        self.client.force_login(self.author2)
+
+        # friends-only posts of authors that aren't friends, unlisted posts and their comments and likes come as
+        # tombstones
+        response = self.client.get("/changes")
+        items = {item['object'].get('id'): item for item in response.data['items']}
+        self.assertEqual(items[self.existing_post.get_id()]['action'], 'create')
+        self.assertEqual(items[self.private_post.get_url()]['object']['type'], 'tombstone')
+        self.assertEqual(items[comment.get_url()]['object']['type'], 'tombstone')
+        self.assertEqual(items[unlisted_post.get_url()]['action'], 'delete')
+        likes = [item for item in response.data['items'] if item['object'].get('object') == like.object]
+        self.assertEqual([item['object']['type'] for item in likes], ['tombstone'])
+
+        Follow.objects.create(actor = self.author1.get_url(), target = self.author2.get_url(), has_accepted = True)
+        Follow.objects.create(actor = self.author2.get_url(), target = self.author1.get_url(), has_accepted = True)
+        response = self.client.get("/changes")
+        ids = [item['object'].get('id') for item in response.data['items']]
+        self.assertIn(self.private_post.get_id(), ids)
+        self.assertIn(comment.get_id(), ids)
+        self.assertIn(unlisted_post.get_url(), ids)
+        self.assertIn('Like', [item['object']['type'] for item in response.data['items']])
+
+        # nodes get everything
+        node = TestHelper.create_node("change_node", "change_node", "change_node", "change_node", "127.0.0.1:8080")
+        self.client.force_login(node)
+        ids = [item['object'].get('id') for item in self.client.get("/changes").data['items']]
+        self.assertIn(unlisted_post.get_id(), ids)
+
+    # GET posts/search
+    def test_search_posts(self):
+        title_match = TestHelper.create_post(author = self.author2, other_args = {"title": "My sourdough starter"})
+        description_match = TestHelper.create_post(author = self.author2, other_args = {"description": "Fed the sourdough"})
+        friends_match = TestHelper.create_post(author = self.author2, other_args = {
+            "content": "Sourdough for friends", "visibility": Visibility.FRIENDS})
+        # images are not searched by their content
+        TestHelper.create_post(author = self.author2, other_args = {
+            "content": "sourdough", "contentType": ContentType.EMBEDDED_PNG})
+        TestHelper.create_post(author = self.author2, other_args = {"title": "Sourdough", "unlisted": True})
+
+        response = self.client.get("/posts/search?q=sourdough")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['id'] for post in response.data['items']],
+                         [title_match.get_id(), description_match.get_id()])
+
+        # friends see the friends-only post too
+        Follow.objects.create(actor = self.author1.get_url(), target = self.author2.get_url(), has_accepted = True)
+        Follow.objects.create(actor = self.author2.get_url(), target = self.author1.get_url(), has_accepted = True)
+        response = self.client.get("/posts/search?q=sourdough&size=2")
+        self.assertEqual([post['id'] for post in response.data['items']], [title_match.get_id(), description_match.get_id()])
+
+        response = self.client.get(f"/posts/search?q=sourdough&after={response.data['next']}")
+        self.assertEqual([post['id'] for post in response.data['items']], [friends_match.get_id()])
+        self.assertNotIn('next', response.data)
+
+        response = self.client.get("/posts/search")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
     
 
 
+class PostReplicationTestCase(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        BaseUtil.connected_nodes = []
+        self.remote_author_ids = [str(uuid.uuid4()) for _ in range(2)]
+        self.peer = StubPeer(self.remote_author_ids)
+        self.peer.register()
+        self.addCleanup(self.peer.unregister)
+        mock = self.peer.mock()
+        mock.__enter__()
+        self.addCleanup(mock.__exit__, None, None, None)
+
+        # remote authors are looked up from the directory instead of the peer
+        AuthorDirectory({'PAGE_SIZE': 10, 'MAX_PAGES': 10}).sync_node(base.REMOTE_CONFIG[self.peer.domain])
+        self.author = TestHelper.create_author(username = "replicating_author")
+        self.remote_urls = [self.peer.get_author_json(author_id)['url'] for author_id in self.remote_author_ids]
+        self.follows = [Follow.objects.create(actor = self.author.get_url(), target = url, has_accepted = True)
+                        for url in self.remote_urls]
+        self.replication = PostReplication({'SYNC_INTERVAL_SECONDS': 300, 'PAGE_SIZE': 2, 'MAX_PAGES': 10})
+
+    def test_sync(self):
+        synced = self.replication.sync(timezone.now())
+        self.assertEqual([author.error for author in synced], ['', ''])
+        self.assertEqual(ReplicatedPost.objects.count(), 2 * StubPeer.POSTS_PER_AUTHOR)
+
+        # nobody is due until SYNC_INTERVAL_SECONDS passed
+        self.assertEqual(self.replication.sync(timezone.now()), [])
+
+    # GET authors/<id>/following/posts
+    def test_following_posts_read_the_copy(self):
+        self.replication.sync(timezone.now())
+        self.peer.calls.clear()
+
+        self.client.force_login(self.author)
+        response = self.client.get(f"/authors/{self.author.official_id}/following/posts/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2 * StubPeer.POSTS_PER_AUTHOR)
+        self.assertFalse([call for call in self.peer.calls if '/posts' in call])
+
+    def test_unfollow_purges_the_copy(self):
+        self.replication.sync(timezone.now())
+
+        self.follows[0].delete()
+        self.assertFalse(ReplicatedAuthor.objects.filter(url = self.remote_urls[0]).exists())
+        self.assertEqual(ReplicatedPost.objects.count(), StubPeer.POSTS_PER_AUTHOR)
+
+
 class PostFailTestCase(APITestCase):
     CREATE_POST_PAYLOAD = {
         "title": "test",
@@ -4,6 +4,10 @@
 app_name = 'post'
 urlpatterns = [
     path('posts/public/', views.PublicPostView.as_view()),
+    path('posts/search', views.PostSearchView.as_view()),
+    path('categories/', views.CategoryView.as_view()),
+    path('changes', views.ChangeFeedView.as_view()),
+    path('changes/stream', views.ChangeFeedStreamView.as_view()),
     path('authors/<uuid:author_id>/posts/<uuid:post_id>/', views.PostView.as_view()),
     path('authors/<uuid:author_id>/posts/', views.CreationPostView.as_view()),
     path('authors/<uuid:author_id>/posts/<uuid:post_id>/share', views.SharePostView.as_view()),
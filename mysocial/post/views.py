@@ -1,18 +1,31 @@
 from django.http.response import HttpResponse, HttpResponseNotFound
-from drf_spectacular.utils import extend_schema, inline_serializer
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework.request import Request
-from .serializer import PostSerializer, CreatePostSerializer, SharePostSerializer, PostSerializerList
+from .serializer import PostSerializer, CreatePostSerializer, SharePostSerializer, PostSerializerList, CategoryCountSerializer
 from rest_framework import serializers
 from authors.models.author import Author
-from .models import Post, Visibility
+from .change_feed import ChangeFeed
+from .models import CategoryCount, ChangeEntry, Post, Visibility
+from .post_replication import PostReplication
+from .post_search import PostSearch
 from rest_framework import status
+import asyncio
 import logging
+import uuid
+from typing import Optional
+from asgiref.sync import sync_to_async
+from common.async_view import AsyncViewMixin
+from common.conditional_helper import ConditionalHelper
+from common.event_stream import EventStreamRenderer, EventStreamResponse
+from common.response_cache import ResponseCache
 from common.pagination_helper import PaginationHelper
+from common.transaction_position import TransactionPosition
 from follow.follow_util import FollowUtil
-from inbox.models import Inbox
+from inbox.inbox_util import InboxUtil
 from mysocial.settings import base
 from remote_nodes.remote_util import RemoteUtil
 import json
@@ -20,7 +33,7 @@
 import base64
 from post.custom_renderers import JPEGRenderer, PNGRenderer
 
-logger = logging.getLogger("mylogger")
+logger = logging.getLogger(__name__)
 
 class PostView(GenericAPIView):
     def get_serializer_class(self):
@@ -64,10 +77,14 @@ def get(self, request: Request, *args, **kwargs) -> HttpResponse:
             #local -> local
             if target_author.is_local():
                 try:
-                    post = Post.objects.get(official_id=kwargs['post_id'])
-                    post_with_comments = PostHelper.add_comments_and_count(author = target_author, post = post)
-               
-                    return Response(post_with_comments)
+                    return ConditionalHelper.respond(
+                        request,
+                        PostHelper.get_validator_querysets(Post.objects.filter(official_id=kwargs['post_id'])),
+                        lambda: Response(PostHelper.add_comments_and_count(
+                            author = target_author,
+                            post = Post.objects.get(official_id=kwargs['post_id'])
+                        ))
+                    )
                 except Exception as e:
                     logger.info(e)
                     return HttpResponseNotFound()
@@ -81,13 +98,18 @@ def get(self, request: Request, *args, **kwargs) -> HttpResponse:
         # remote -> local
         if request.user.is_authenticated_node:
             try:
-                post = Post.objects.get(official_id=kwargs['post_id'])
-                target_author = Author.get_author(kwargs['author_id'])
-                
-                post_with_comments = PostHelper.add_comments_and_count(author = target_author, post = post)
-                return Response(post_with_comments)
+                def build_response():
+                    post = Post.objects.get(official_id=kwargs['post_id'])
+                    target_author = Author.get_author(kwargs['author_id'])
+                    return Response(PostHelper.add_comments_and_count(author = target_author, post = post))
+
+                return ConditionalHelper.respond(
+                    request,
+                    PostHelper.get_validator_querysets(Post.objects.filter(official_id=kwargs['post_id'])),
+                    build_response
+                )
             except Exception as e:
-                print(e)
+                logger.exception(e)
                 return HttpResponse(f'Failed to get post for post id: {kwargs["post_id"]}', status = status.HTTP_400_BAD_REQUEST)
 
     
@@ -210,6 +232,7 @@ def get_queryset(self):
     # get all public posts
     @extend_schema(
         summary = "post_get_all_public_post",
+        parameters = PostHelper.CATEGORY_OPEN_API_PARAMETERS,
         responses = inline_serializer(
             name='PostList',
             fields={
@@ -228,19 +251,138 @@ def get(self, request: Request, *args, **kwargs) -> HttpResponse:
             public_posts = Post.objects.filter(
                 visibility = Visibility.PUBLIC
             )
-            posts = []
-            for post in public_posts:
-                post_with_comments = PostHelper.add_comments_and_count(author = None, post = post)
-                posts.append(post_with_comments)
-                
-            return Response(posts)
+            public_posts = PostHelper.filter_categories(request, public_posts)
+
+            def build_response():
+                posts = []
+                for post in public_posts:
+                    post_with_comments = PostHelper.add_comments_and_count(author = None, post = post)
+                    posts.append(post_with_comments)
+                return Response(posts)
+
+            return ResponseCache.get_or_render(
+                request,
+                ResponseCache.PUBLIC_POSTS,
+                lambda: ConditionalHelper.respond(request, PostHelper.get_validator_querysets(public_posts), build_response)
+            )
+
+        except Exception as e:
+            logger.exception(e)
+            return HttpResponseNotFound()
+
+# GET /categories/
+class CategoryView(GenericAPIView):
+    serializer_class = CategoryCountSerializer
+
+    # categories in a response when the client asks for no page, and at most
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
+
+    def get_queryset(self):
+        return CategoryCount.objects.all()
+
+    @extend_schema(
+        summary = "post_get_categories",
+        parameters = PaginationHelper.KEYSET_OPEN_API_PARAMETERS,
+        responses = inline_serializer(
+            name='CategoryList',
+            fields={
+                'type': serializers.CharField(),
+                'items': CategoryCountSerializer(many=True),
+                'next': serializers.CharField(required=False),
+            }
+        ),
+        tags=['post']
+    )
+    def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """
+        Categories of public posts and how many posts have them, most used first, DEFAULT_PAGE_SIZE at a time unless
+        size is given. Pass the "next" cursor as after for the next page.
+
+        Use a category with ?category= on /posts/public/ or /authors/{AUTHOR_ID}/posts/.
+        """
+        try:
+            categories = CategoryCount.objects.filter(count__gt = 0).order_by('-count', '-category')
+            page, next_cursor, err = PaginationHelper.paginate_queryset(
+                request, categories, key_field = 'count', id_field = 'category',
+                default_size = CategoryView.DEFAULT_PAGE_SIZE, max_size = CategoryView.MAX_PAGE_SIZE)
+            if err is not None:
+                return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
+
+            data = {'type': 'categories', 'items': CategoryCountSerializer(page, many = True).data}
+            if next_cursor is not None:
+                data['next'] = next_cursor
+            return Response(data)
+
+        except Exception as e:
+            logger.exception(e)
+            return HttpResponseNotFound()
+
+# GET /posts/search?q={QUERY}
+class PostSearchView(GenericAPIView):
+    # posts in a response when the client asks for no page, and at most
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    OPEN_API_PARAMETERS = [
+        OpenApiParameter(name='q', location=OpenApiParameter.QUERY,
+                         description='What to search for, e.g. `"exact phrase" cats or dogs -birds`. Titles count '
+                                     'the most, then descriptions, categories and text content.',
+                         required=True, type=str),
+    ] + PaginationHelper.KEYSET_OPEN_API_PARAMETERS
+
+    def get_queryset(self):
+        return Post.objects.all()
+
+    @extend_schema(
+        summary = "post_search_posts",
+        parameters = OPEN_API_PARAMETERS,
+        responses = inline_serializer(
+            name='PostSearchList',
+            fields={
+                'type': serializers.CharField(),
+                'items': PostSerializer(many=True),
+                'next': serializers.CharField(required=False),
+            }
+        ),
+        tags=['post']
+    )
+    def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """
+        User story: As an author I want to find posts about something
+
+        Public posts, and friends-only posts of your friends, best match first, DEFAULT_PAGE_SIZE at a time unless
+        size is given. Pass the "next" cursor as after for the next page.
+        """
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response('q is required', status = status.HTTP_400_BAD_REQUEST)
+        if len(text) > PostSearch.MAX_QUERY_LENGTH:
+            return Response(f'q should be at most {PostSearch.MAX_QUERY_LENGTH} characters',
+                            status = status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # nodes search on behalf of who knows; they only get public posts
+            viewer = request.user if request.user.is_authenticated and request.user.is_authenticated_user else None
+            posts = PostSearch.search(text, viewer)
+
+            page, next_cursor, err = PaginationHelper.paginate_queryset(
+                request, posts, key_field = 'rank', id_field = 'official_id',
+                default_size = PostSearchView.DEFAULT_PAGE_SIZE, max_size = PostSearchView.MAX_PAGE_SIZE)
+            if err is not None:
+                return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
+
+            data = {'type': 'posts', 'items': PostSerializer(page, many = True).data}
+            if next_cursor is not None:
+                data['next'] = next_cursor
+            return Response(data)
 
         except Exception as e:
-            print(e)
+            logger.exception(e)
             return HttpResponseNotFound()
 
 # /authors/{AUTHOR_ID}/posts/
-class CreationPostView(GenericAPIView):
+class CreationPostView(AsyncViewMixin, GenericAPIView):
     def get_serializer_class(self):
         if self.request.method == 'POST' or self.request.method == 'PUT':
             return CreatePostSerializer
@@ -253,6 +395,7 @@ def get_queryset(self):
     @extend_schema(
         responses=PostSerializerList,
         summary="post_get_authors_posts",
+        parameters=PostHelper.CATEGORY_OPEN_API_PARAMETERS,
         tags=["post", RemoteUtil.REMOTE_IMPLEMENTED_TAG, RemoteUtil.TEAM12_CONNECTED, RemoteUtil.TEAM14_CONNECTED, RemoteUtil.TEAM7_CONNECTED]
     )
     @action(detail=True, methods=['get'], url_name='post_get_author_posts')
@@ -276,21 +419,29 @@ def get(self, request, *args, **kwargs):
 
             #local -> local
             if target_author.is_local():
-                author = Author.get_author(kwargs['author_id'])
-                posts = Post.objects.filter(author = author, unlisted = False).order_by('-published')
-
-                posts_with_comments = []
-                for post in posts:
-                    post_with_comments = PostHelper.add_comments_and_count(author = None, post = post)
-                    posts_with_comments.append(post_with_comments)
-                
-                data = posts_with_comments
-                data, err = PaginationHelper.paginate_serialized_data(request, data)
-
-                if err is not None:
-                    return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
-                else:
-                    return Response({'type': 'posts', 'items': data})
+                posts = Post.objects.filter(author = target_author, unlisted = False).order_by('-published')
+                posts = PostHelper.filter_categories(request, posts)
+
+                def build_response():
+                    posts_with_comments = []
+                    for post in posts:
+                        post_with_comments = PostHelper.add_comments_and_count(author = None, post = post)
+                        posts_with_comments.append(post_with_comments)
+
+                    data = posts_with_comments
+                    data, err = PaginationHelper.paginate_serialized_data(request, data)
+
+                    if err is not None:
+                        return Response(f'{err}', status = status.HTTP_400_BAD_REQUEST)
+                    else:
+                        return Response({'type': 'posts', 'items': data})
+
+                return ResponseCache.get_or_render(
+                    request,
+                    ResponseCache.AUTHOR_POSTS,
+                    lambda: ConditionalHelper.respond(request, PostHelper.get_validator_querysets(posts), build_response),
+                    scope=str(target_author.official_id)
+                )
 
             # local -> remote
             else:
@@ -301,19 +452,28 @@ def get(self, request, *args, **kwargs):
         if request.user.is_authenticated_node:
             author = Author.objects.get(official_id = kwargs['author_id'])
             posts = Post.objects.filter(author = author).order_by('-published')
+            posts = PostHelper.filter_categories(request, posts)
 
-            posts_with_comments = []
-            for post in posts:
-                post_with_comments = PostHelper.add_comments_and_count(author = None, post = post)
-                posts_with_comments.append(post_with_comments)
-            
-            data = posts_with_comments
-            data, err = PaginationHelper.paginate_serialized_data(request, data)
+            def build_response():
+                posts_with_comments = []
+                for post in posts:
+                    post_with_comments = PostHelper.add_comments_and_count(author = None, post = post)
+                    posts_with_comments.append(post_with_comments)
 
-            if err is not None:
-                return HttpResponseNotFound()
-            else:
-                return Response({'type': 'posts', 'items': data})
+                data = posts_with_comments
+                data, err = PaginationHelper.paginate_serialized_data(request, data)
+
+                if err is not None:
+                    return HttpResponseNotFound()
+                else:
+                    return Response({'type': 'posts', 'items': data})
+
+            return ResponseCache.get_or_render(
+                request,
+                ResponseCache.AUTHOR_POSTS,
+                lambda: ConditionalHelper.respond(request, PostHelper.get_validator_querysets(posts), build_response),
+                scope=str(author.official_id)
+            )
 
 
     # Édouard Lopez, October 19, https://stackoverflow.com/questions/5255913/kwargs-in-django
@@ -324,7 +484,7 @@ def get(self, request, *args, **kwargs):
         tags=['post']
     )
     @action(detail=True, methods=['post'], url_name='post_POST')
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         """
         Create brand new post, no id
 
@@ -336,45 +496,43 @@ def post(self, request, *args, **kwargs):
         """
         try:
             serializer = CreatePostSerializer(data=request.data)
-            if serializer.is_valid():
-                data = serializer.data
-                author = Author.get_author(kwargs['author_id'])
-                data['author'] = author
-                post = serializer.create(validated_data=data)
+            if await sync_to_async(serializer.is_valid)():
+                post, author = await sync_to_async(CreationPostView.create_post)(serializer, kwargs['author_id'])
             else:
                 return Response(serializer.errors, status = status.HTTP_400_BAD_REQUEST)
 
+            post_json = await sync_to_async(lambda: PostSerializer(post).data)()
             try:
                 if post.visibility == Visibility.FRIENDS:
-                    inbox_post = PostSerializer(post).data
-                    followers = FollowUtil.get_followers(author)
-                
-                    for follower in followers: 
-                        if follower.is_local():
-                            inbox = Inbox.objects.get(author = follower)
-                            inbox.add_to_inbox(inbox_post)
-                        else:
-                            node_config = base.REMOTE_CONFIG.get(follower.host)
-                            response = node_config.send_to_remote_inbox(target_author_url = follower.get_url(), data = inbox_post)
-                            if response.status_code < 200 or response.status_code > 300:  
-                                print("Did not send to remote inbox")
+                    followers = await FollowUtil.aget_followers(author)
+
+                    for follower, response in await InboxUtil.aforward_to_followers(post_json, followers):
+                        if isinstance(response, Exception) or response.status_code < 200 or response.status_code > 300:
+                            logger.warning(f"Did not send to remote inbox: {follower}: {response}")
 
             except Exception as e:
                 return Response(f"Error sending post to inbox, error: {e}", status = status.HTTP_400_BAD_REQUEST)
 
-            return Response(PostSerializer(post).data, status = status.HTTP_200_OK)
+            return Response(post_json, status = status.HTTP_200_OK)
 
         except Exception as e:
             logger.info(e)
             return HttpResponseNotFound()
-class SharePostView(GenericAPIView):
+
+    @staticmethod
+    def create_post(serializer: CreatePostSerializer, author_id: str) -> (Post, Author):
+        data = serializer.data
+        author = Author.get_author(author_id)
+        data['author'] = author
+        return serializer.create(validated_data=data), author
+class SharePostView(AsyncViewMixin, GenericAPIView):
     serializer_class = SharePostSerializer
     @extend_schema(
         summary = "post_share_post",
         tags=['post']
     )
     @action(detail=True, methods=['put'], url_name='post_share_post')
-    def put(self, request: Request, *args, **kwargs) -> HttpResponse:
+    async def put(self, request: Request, *args, **kwargs) -> HttpResponse:
         '''
         Local wants to share local post
         Local wants to share remote post
@@ -391,53 +549,51 @@ def put(self, request: Request, *args, **kwargs) -> HttpResponse:
 
         if node.is_authenticated_user:
             try:
-                target_author = Author.get_author(kwargs['author_id'])
+                target_author = await sync_to_async(Author.get_author)(kwargs['author_id'])
             except:
                 return Response(f"Error getting author id: {kwargs['author_id']}", status.HTTP_400_BAD_REQUEST)
 
             #local getting a local post 
             if target_author.is_local():
                 try:
-                    post = PostSerializer(Post.objects.get(official_id = kwargs['post_id'])).data
+                    post = await sync_to_async(lambda: PostSerializer(Post.objects.get(official_id = kwargs['post_id'])).data)()
                 except:
                     return Response(f"Error getting post id: {kwargs['post_id']}", status.HTTP_400_BAD_REQUEST)
-            #local getting a remote post
+            #local getting a remote post; from our copy if we have it (see PostReplication)
             else:
+                post = await sync_to_async(PostReplication.get_post)(target_author, kwargs['post_id'])
+            if post is None:
                 try:
                     node_config = base.REMOTE_CONFIG.get(target_author.host)
-                    post, response = node_config.get_post_by_post_id(request.path.split('/share')[0])
+                    post, response = await node_config.aget_post_by_post_id(request.path.split('/share')[0])
                     if response.status_code < 200 or response.status_code > 300:
                         return Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
                 except Exception as e:
-                    print(f'{self}: put: error getting remote post: error: {e}')
+                    logger.warning(f'{self}: put: error getting remote post: error: {e}')
                     post_id = request.path.split('/share')[0]
-                    print(f'{self}: put: error getting remote post: remote post: {post_id} @ node: {node_config}')
+                    logger.warning(f'{self}: put: error getting remote post: remote post: {post_id} @ node: {node_config}')
                     return Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-            requesting_author = Author.get_author(self.request.user.get_id())
-            followers = FollowUtil.get_followers(requesting_author)
+            requesting_author = await sync_to_async(Author.get_author)(self.request.user.get_id())
+            followers = await FollowUtil.aget_followers(requesting_author)
 
             if len(followers) == 0:
                 return Response("You currently have no followers", status = status.HTTP_202_ACCEPTED)
-        
-            for follower in followers: 
-                if follower.is_local():
-                    inbox = Inbox.objects.get(author = follower)
-                    inbox.add_to_inbox(post)
-                else:
-                    try:
-                        node_config = base.REMOTE_CONFIG.get(follower.host)
-                        response = node_config.send_to_remote_inbox(target_author_url = follower.get_url(), data = post)
-                        if response.status_code < 200 or response.status_code > 300:
-                            return Response(json.loads(response.content), status = status.HTTP_500_INTERNAL_SERVER_ERROR)
-                    except Exception as e:
-                        print(f'{self}: put: error with remote authors (author: {follower}): {e} from node: {follower.host}')
+
+            for follower, response in await InboxUtil.aforward_to_followers(post, followers):
+                try:
+                    if isinstance(response, Exception):
+                        raise response
+                    if response.status_code < 200 or response.status_code > 300:
+                        return Response(json.loads(response.content), status = status.HTTP_500_INTERNAL_SERVER_ERROR)
+                except Exception as e:
+                    logger.warning(f'{self}: put: error with remote authors (author: {follower}): {e} from node: {follower.host}')
 
             return Response("Successfully added to all followers inbox", status = status.HTTP_200_OK)
 
 
-class FollowingPostView(GenericAPIView):
+class FollowingPostView(AsyncViewMixin, GenericAPIView):
     serializer_class = PostSerializer
 
     def get_queryset(self):
@@ -449,35 +605,60 @@ def get_queryset(self):
         tags=["post", "follows"]
     )
     @action(detail=True, methods=['get'], url_name='post_get_authors_following_post')
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         try:
-            requesting_author = Author.get_author(kwargs['author_id'])
+            requesting_author = await sync_to_async(Author.get_author)(kwargs['author_id'])
         except:
             return Response(f"Error getting author id: {kwargs['author_id']}", status.HTTP_400_BAD_REQUEST)
 
-        followed_authors = FollowUtil.get_following_authors(requesting_author)
-        posts = []
+        followed_authors = await FollowUtil.aget_following_authors(requesting_author)
+        local_authors = [author for author in followed_authors if author.is_local()]
+        remote_authors = [author for author in followed_authors if not author.is_local()]
+
+        # remote posts come from our copy (see PostReplication); nodes are only asked for authors without a fresh one
+        replicated_posts = await sync_to_async(PostReplication.get_posts)(remote_authors)
+        live_authors = [author for author in remote_authors if (author.host, author.get_id()) not in replicated_posts]
+
+        # these authors could be local or remote; local posts are read while the remaining remote nodes are asked
+        local_posts, live_posts = await asyncio.gather(
+            sync_to_async(FollowingPostView.get_local_posts)(requesting_author, local_authors),
+            asyncio.gather(*[FollowingPostView.aget_remote_posts(request, author) for author in live_authors]),
+        )
 
-        # these authors could be local or remote
+        # keep the order of followed_authors
+        local_posts = iter(local_posts)
+        live_posts = iter(live_posts)
+        posts = []
         for followed_author in followed_authors:
             if followed_author.is_local():
-                authors_posts = Post.objects.filter(author = followed_author, unlisted = False).order_by('-published')
+                posts += next(local_posts)
+            elif (followed_author.host, followed_author.get_id()) in replicated_posts:
+                posts += replicated_posts[(followed_author.host, followed_author.get_id())]
+            else:
+                posts += next(live_posts)
 
-                for post in authors_posts:
-                    post_with_comments = PostHelper.add_comments_and_count(author = requesting_author, post = post)
-                    posts.append(post_with_comments)
+        return Response(posts, status = status.HTTP_200_OK)
 
-            else:
-                try:
-                    node_config = base.REMOTE_CONFIG.get(followed_author.host)
-                    authors_posts_path = f'/authors/{followed_author.get_id()}/posts/'
-                    response = node_config.get_authors_posts(request, authors_posts_path)
+    @staticmethod
+    def get_local_posts(requesting_author: Author, followed_authors: list) -> list:
+        """Returns a list of posts per followed author"""
+        posts = []
+        for followed_author in followed_authors:
+            authors_posts = Post.objects.filter(author = followed_author, unlisted = False).order_by('-published')
+            posts.append([PostHelper.add_comments_and_count(author = requesting_author, post = post)
+                          for post in authors_posts])
+        return posts
 
-                    posts = posts + response.data['items']
-                except Exception as e:
-                    continue
+    @staticmethod
+    async def aget_remote_posts(request, followed_author: Author) -> list:
+        try:
+            node_config = base.REMOTE_CONFIG.get(followed_author.host)
+            authors_posts_path = f'/authors/{followed_author.get_id()}/posts/'
+            response = await node_config.aget_authors_posts(request, authors_posts_path)
 
-        return Response(posts, status = status.HTTP_200_OK)
+            return response.data['items']
+        except Exception as e:
+            return []
 
 
 class ImagePostView(GenericAPIView):
@@ -516,7 +697,7 @@ def get(self, request, *args, **kwargs):
                     return Response(imgdata, status = status.HTTP_200_OK, content_type= post.contentType)
 
                 except Exception as e:
-                    print(e)
+                    logger.exception(e)
                     return HttpResponseNotFound()
             else:
                 node_config = base.REMOTE_CONFIG.get(target_author.host) 
@@ -535,3 +716,119 @@ def get(self, request, *args, **kwargs):
 
             return Response(imgdata, status = status.HTTP_200_OK, content_type= post.contentType)
 
+
+class ChangeFeedView(GenericAPIView):
+    OPEN_API_PARAMETERS = [
+        OpenApiParameter(name='since', location=OpenApiParameter.QUERY,
+                         description='The "next" token of the last page read; the changes after it are returned. '
+                                     'From the start by default, which is everything we have.',
+                         required=False, type=str),
+        OpenApiParameter(name='author', location=OpenApiParameter.QUERY,
+                         description='Only the changes on the posts of this author id',
+                         required=False, type=str),
+    ]
+
+    def get_queryset(self):
+        return ChangeEntry.objects.all()
+
+    @staticmethod
+    def get_arguments(request: Request) -> (tuple, str, Optional[Author]):
+        """
+        :return: since, author and the reader from request; see ChangeFeed.to_items
+        :raises ValueError: if since or author isn't valid
+        """
+        since = TransactionPosition.parse(request.query_params.get('since', '0'))
+        author_id = request.query_params.get('author')
+        if author_id is not None:
+            author_id = str(uuid.UUID(author_id))
+        # nodes mirror everything, like they get from /authors/<id>/posts/; authors only get what they can see
+        return since, author_id, None if request.user.is_authenticated_node else request.user
+
+    # GET /changes
+    @extend_schema(
+        summary = "post_get_changes",
+        parameters = OPEN_API_PARAMETERS + [
+            OpenApiParameter(name='size', location=OpenApiParameter.QUERY,
+                             description=f'How many changes at most; {ChangeFeed.DEFAULT_SIZE} by default, '
+                                         f'{ChangeFeed.MAX_SIZE} at most.',
+                             required=False, type=int),
+        ],
+        responses = inline_serializer(
+            name='ChangeList',
+            fields={
+                'type': serializers.CharField(),
+                'items': serializers.ListField(child=serializers.DictField()),
+                'next': serializers.CharField(),
+            }
+        ),
+        tags=['post']
+    )
+    def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """
+        The creates, updates and deletes of our posts, comments and likes since a token, oldest first, so a mirror
+        only downloads what changed since it last looked.
+
+        Each change has its token (id), its action and the object as it is now; deleted objects, and posts you can't
+        see, come as tombstones ({"type": "tombstone", "formerType": ..., "id": url}). Pass "next" as since for the
+        next page. Fewer changes than size means you caught up; a change shows up once the transactions that started
+        before it ended.
+        """
+        if not request.user.is_authenticated:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            since, author_id, reader = ChangeFeedView.get_arguments(request)
+            size = int(request.query_params.get('size', ChangeFeed.DEFAULT_SIZE))
+        except ValueError:
+            return Response('since should be a token from this feed, size a positive integer and author an author id',
+                            status = status.HTTP_400_BAD_REQUEST)
+        if size < 1:
+            return Response('size should be a positive integer', status = status.HTTP_400_BAD_REQUEST)
+
+        try:
+            items, next_since, _ = ChangeFeed.get_page(since, min(size, ChangeFeed.MAX_SIZE), reader, author_id)
+            return Response({'type': 'changes', 'items': items, 'next': TransactionPosition.format(next_since)})
+
+        except Exception as e:
+            logger.exception(e)
+            return HttpResponseNotFound()
+
+
+class ChangeFeedStreamView(AsyncViewMixin, GenericAPIView):
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    def get_queryset(self):
+        return ChangeEntry.objects.all()
+
+    # GET /changes/stream
+    @extend_schema(
+        summary = "post_stream_changes",
+        parameters = ChangeFeedView.OPEN_API_PARAMETERS,
+        responses = {(200, 'text/event-stream'): str},
+        tags=['post']
+    )
+    async def get(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """
+        The changes of /changes as Server-Sent Events, then new ones as they happen; each event's id is the change's
+        token, so EventSource resumes where it stopped when it reconnects (Last-Event-ID wins over since).
+
+        When we're not served through ASGI (see web.sh), the response has up to ChangeFeed.MAX_SIZE changes and ends;
+        EventSource then reconnects after the retry delay, so it works like polling.
+        """
+        if not request.user.is_authenticated:
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            since, author_id, reader = ChangeFeedView.get_arguments(request)
+            if 'Last-Event-ID' in request.headers:
+                since = TransactionPosition.parse(request.headers['Last-Event-ID'])
+        except ValueError:
+            return Response('since and Last-Event-ID should be tokens from this feed and author an author id',
+                            status.HTTP_400_BAD_REQUEST)
+
+        if getattr(request, 'supports_event_streams', False):
+            return EventStreamResponse(ChangeFeed.stream(since, reader, author_id))
+
+        items, _, _ = await sync_to_async(ChangeFeed.get_page)(since, ChangeFeed.MAX_SIZE, reader, author_id)
+        events = [ChangeFeed.format_retry()] + [ChangeFeed.format_item(item) for item in items]
+        return HttpResponse(''.join(events), content_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
@@ -6,6 +6,8 @@ class LocalDefault(NodeConfigBase):
 
     domain = '127.0.0.1:8000'
     username = 'local_default'
+    # another instance of this server; configs for other teams' servers turn it off
+    supports_bulk_inbox = True
 
 
     @classmethod
@@ -1,7 +1,10 @@
-import json
+import asyncio
+import hashlib
+import logging
 import urllib.parse
 
-import requests
+import httpx
+from asgiref.sync import sync_to_async
 from django.http import HttpResponseNotFound
 from rest_framework.response import Response
 from requests import ConnectionError
@@ -12,15 +15,24 @@
 from authors.serializers.author_serializer import AuthorSerializer
 from follow.models import Follow
 from follow.serializers.follow_serializer import FollowRequestSerializer
+from inbox.models import InboxItem
 from common.base_util import BaseUtil
+from common.fast_json import FastJSON
+from remote_nodes.remote_client import AsyncRemoteClient, RemoteClient
 import base64
 
+logger = logging.getLogger(__name__)
+
 
 class NodeConfigBase:
     """
     Serves as sample and base configuration for remote server/node specific implementations
 
     Remember to call super whenever possible; use good judgment to determine when to call super in the method body.
+
+    Methods starting with `a` (e.g. aget_author_via_url) are the async versions used by async views; they return the
+    same values as their sync versions. If a config overrides the sync version but not the async one, the async one
+    runs the override in a thread so it still doesn't block the event loop.
     """
 
     """
@@ -31,6 +43,8 @@ class NodeConfigBase:
     username = 'domain'
     team_metadata_tag = 'default'
     author_serializer = AuthorSerializer
+    # True if the node has POST /inbox/bulk, i.e. it runs this server too; see send_many_to_remote_inbox
+    supports_bulk_inbox = False
 
     """
     Mapping: remote to local
@@ -53,32 +67,61 @@ class NodeConfigBase:
         'localUrl': 'local_url',  # fake; for serializer
         'remoteUrl': 'proxy_url'  # fake; for serializer
     }
+    # see PostSerializer.to_internal_value
+    post_remote_fields = {
+        'id': 'official_id',
+        'url': 'url',
+        'title': 'title',
+        'source': 'source',
+        'origin': 'origin',
+        'description': 'description',
+        'contentType': 'contentType',
+        'content': 'content',
+        'author': 'author',
+        'categories': 'categories',
+        'published': 'published',
+        'visibility': 'visibility',
+        'unlisted': 'unlisted'
+    }
+    # see CommentSerializer.to_internal_value
+    comment_remote_fields = {
+        'id': 'official_id',
+        'type': 'type',
+        'author': 'author',
+        'comment': 'comment',
+        'contentType': 'contentType',
+        'published': 'published',
+        'url': 'url'
+    }
 
     def __init__(self):
         self.is_valid = False
+        # every call to this node goes through here so it shows up in /remote-node/metrics/
+        self.client = RemoteClient(self.__class__.__name__)
+        self.async_client = AsyncRemoteClient(self.__class__.__name__)
         try:
             self.node_author = Author.objects.get(username=self.username)
             self.node_detail = self.node_author.node_detail
             if self.node_detail.status != NodeStatus.ACTIVE:
                 # if we set inactive, don't include!
-                print(f'Node author is deactivated: {self.username}: {self.__class__}')
+                logger.info(f'Node author is deactivated: {self.username}: {self.__class__}')
                 return
 
             self.username = self.node_detail.remote_username
             self.password = self.node_detail.remote_password
             self.is_valid = True
         except Exception as e:
-            print(f'Node author does not exist yet...: Finding username {self.username} {self.__class__}): {e}')
+            logger.warning(f'Node author does not exist yet...: Finding username {self.username} {self.__class__}): {e}')
 
     @classmethod
     def create_dictionary_entry(cls):
         result = cls()
         if result.is_valid:
-            print(f"Adding node: {result.username}")
+            logger.info(f"Adding node: {result.username}")
             return {cls.domain: result}
         else:
             # prevent adding invalid classes
-            print(f"Removing node: {result.username}")
+            logger.info(f"Removing node: {result.username}")
             return {}
 
     def get_base_url(self):
@@ -87,31 +130,64 @@ def get_base_url(self):
     def convert_to_valid_author_url(self, author_id: str) -> str:
         return f'{self.get_base_url()}/authors/{author_id}'
 
-    def get_all_author_jsons(self, params: dict):
-        """Returns a list of authors as json"""
+    def overrides(self, method_name: str) -> bool:
+        """True if this config has its own version of the given NodeConfigBase method"""
+        return getattr(type(self), method_name) is not getattr(NodeConfigBase, method_name)
+
+    async def run_override(self, method_name: str, *args, **kwargs):
+        """Runs a sync override in a thread; not thread sensitive so calls to different nodes still overlap"""
+        return await sync_to_async(getattr(self, method_name), thread_sensitive=False)(*args, **kwargs)
+
+    def get_all_authors_url(self, params: dict) -> str:
         url = f'{self.get_base_url()}/authors/'
         if len(params) > 0:
             query_param = urllib.parse.urlencode(params)
             url += '?' + query_param
+        return url
+
+    def get_all_author_jsons(self, params: dict):
+        """Returns a list of authors as json"""
+        url = self.get_all_authors_url(params)
 
         try:
-            response = requests.get(url, auth=(self.username, self.password))
+            response = self.client.get(url, auth=(self.username, self.password))
         except ConnectionError:
-            print(f'Connection error: {self}')
+            logger.warning(f'Connection error: {self}')
             return None
         except Exception as e:
-            print(f"NodeConfigBase: Unknown err: {str(e)}")
+            logger.warning(f"NodeConfigBase: Unknown err: {str(e)}")
             return None
 
         if response.status_code == 200:
             return AuthorSerializer.deserializer_author_list(response.content.decode('utf-8'))
         return None
 
+    async def aget_all_author_jsons(self, params: dict):
+        if self.overrides('get_all_author_jsons'):
+            return await self.run_override('get_all_author_jsons', params)
+
+        url = self.get_all_authors_url(params)
+        try:
+            response = await self.async_client.get(url, auth=(self.username, self.password))
+        except Exception as e:
+            logger.warning(f'{self}: aget_all_author_jsons: possibly no connection: {e}')
+            return None
+
+        if response.status_code == 200:
+            # authors of our own domain are looked up in the database
+            return await sync_to_async(AuthorSerializer.deserializer_author_list)(response.content.decode('utf-8'))
+        return None
+
     # endpoints
     def get_all_authors_request(self, params: dict):
         """Returns all authors as a valid HTTP Response"""
-        author_jsons = self.get_all_author_jsons(params)
+        return NodeConfigBase.to_authors_response(self.get_all_author_jsons(params))
 
+    async def aget_all_authors_request(self, params: dict):
+        return NodeConfigBase.to_authors_response(await self.aget_all_author_jsons(params))
+
+    @staticmethod
+    def to_authors_response(author_jsons):
         if author_jsons is None:
             return HttpResponseNotFound()
         return Response({
@@ -122,10 +198,10 @@ def get_all_authors_request(self, params: dict):
     # todo: double check this is no longer used
     def from_author_id_to_url(self, author_id: str) -> str:
         url = f'{self.get_base_url()}/authors/{author_id}/'
-        response = requests.get(url, auth=(self.username, self.password))
+        response = self.client.get(url, auth=(self.username, self.password))
         if response.status_code == 200:
             # todo(turnip): map to our author?
-            json_dict = json.loads(response.content)
+            json_dict = FastJSON.loads(response.content)
             return json_dict['url']
         return None
 
@@ -133,33 +209,55 @@ def from_author_id_to_author(self, author_id: str) -> Author:
         url = f'{self.get_base_url()}/authors/{author_id}/'
         return self.get_author_via_url(url)
 
+    async def afrom_author_id_to_author(self, author_id: str) -> Author:
+        if self.overrides('from_author_id_to_author'):
+            return await self.run_override('from_author_id_to_author', author_id)
+
+        url = f'{self.get_base_url()}/authors/{author_id}/'
+        return await self.aget_author_via_url(url)
+
     # todo: double check this is no longer used
     def get_author_request(self, author_id: str):
-        response = requests.get(f'{self.get_base_url()}/authors/{author_id}/', auth=(self.username, self.password))
+        response = self.client.get(f'{self.get_base_url()}/authors/{author_id}/', auth=(self.username, self.password))
         if response.status_code == 200:
             # todo(turnip): map to our author?
-            return Response(json.loads(response.content))
+            return Response(FastJSON.loads(response.content))
         return HttpResponseNotFound()
 
     def get_author_via_url(self, author_url: str) -> Author:
         try:
-            response = requests.get(author_url, auth=(self.username, self.password))
+            response = self.client.get(author_url, auth=(self.username, self.password))
+        except Exception as e:
+            logger.warning(f'{self}: get_author_via_url: possibly no connection: {e}')
+            return None
+
+        return self.to_author(response)
+
+    async def aget_author_via_url(self, author_url: str) -> Author:
+        if self.overrides('get_author_via_url'):
+            return await self.run_override('get_author_via_url', author_url)
+
+        try:
+            response = await self.async_client.get(author_url, auth=(self.username, self.password))
         except Exception as e:
-            print(f'{self}: get_author_via_url: possibly no connection: {e}')
+            logger.warning(f'{self}: aget_author_via_url: possibly no connection: {e}')
             return None
 
+        return await sync_to_async(self.to_author)(response)
+
+    def to_author(self, response) -> Author:
         if response.status_code == 200:
-            author_json = json.loads(response.content.decode('utf-8'))
+            author_json = FastJSON.loads(response.content.decode('utf-8'))
             serializer = AuthorSerializer(data=author_json)
 
             if serializer.is_valid():
                 return serializer.validated_data  # <- GOOD RESULT HERE!!!
 
-            print(f'{self} GetAuthorViaUrl: AuthorSerializer: ', serializer.errors)
+            logger.warning(f'{self} GetAuthorViaUrl: AuthorSerializer: {serializer.errors}')
 
         return None
 
-    def get_all_followers(self, author: Author, params=None):
+    def get_all_followers_url(self, author: Author, params=None) -> str:
         if params is None:
             # python has a weird property that if the argument is mutable, like a dictionary
             # if you pass the reference around, you can actually change the default values,
@@ -170,13 +268,34 @@ def get_all_followers(self, author: Author, params=None):
         if len(params) > 0:
             query_param = urllib.parse.urlencode(params)
             url += '?' + query_param
-        response = requests.get(url, auth=(self.username, self.password))
+        return url
+
+    def get_all_followers(self, author: Author, params=None):
+        response = self.client.get(self.get_all_followers_url(author, params), auth=(self.username, self.password))
+        return NodeConfigBase.to_author_jsons(response)
+
+    async def aget_all_followers(self, author: Author, params=None):
+        if self.overrides('get_all_followers'):
+            return await self.run_override('get_all_followers', author, params)
+
+        url = self.get_all_followers_url(author, params)
+        response = await self.async_client.get(url, auth=(self.username, self.password))
+        return await sync_to_async(NodeConfigBase.to_author_jsons)(response)
+
+    @staticmethod
+    def to_author_jsons(response):
         if response.status_code == 200:
             return AuthorSerializer.deserializer_author_list(response.content.decode('utf-8'))
         return None
 
     def get_all_followers_request(self, author: Author, params: dict):
-        followers = self.get_all_followers(author=author, params=params)
+        return NodeConfigBase.to_followers_response(self.get_all_followers(author=author, params=params))
+
+    async def aget_all_followers_request(self, author: Author, params: dict):
+        return NodeConfigBase.to_followers_response(await self.aget_all_followers(author=author, params=params))
+
+    @staticmethod
+    def to_followers_response(followers):
         if followers is not None:
             return Response({
                 "type": "followers",
@@ -187,30 +306,46 @@ def get_all_followers_request(self, author: Author, params: dict):
     def post_local_follow_remote(self, author_actor: Author, author_target: Author) -> dict:
         """Make call to remote node to follow"""
         url = f'{author_target.get_url()}/followers/'
-        response = requests.post(url,
+        response = self.client.post(url,
                                  auth=(self.username, self.password),
                                  data={'actor': author_actor.get_url()})
-        if 200 <= response.status_code < 300:
-            try:
-                return json.loads(response.content.decode('utf-8'))
-            except Exception as e:
-                print(f"Failed to deserialize response: {response.content}")
-        else:
-            print(f"post_local_follow_remote: remote server response: {response.status_code}")
-        return response.status_code
+        return NodeConfigBase.to_follow_result(response, 'post_local_follow_remote')
+
+    async def apost_local_follow_remote(self, author_actor: Author, author_target: Author) -> dict:
+        if self.overrides('post_local_follow_remote'):
+            return await self.run_override('post_local_follow_remote', author_actor, author_target)
+
+        url = f'{author_target.get_url()}/followers/'
+        response = await self.async_client.post(url,
+                                                auth=(self.username, self.password),
+                                                data={'actor': author_actor.get_url()})
+        return NodeConfigBase.to_follow_result(response, 'apost_local_follow_remote')
 
     def delete_local_follow_remote(self, author_target: Author, author_actor: Author) -> dict:
         """Make call to remote node to delete follow; stop sending stuff in my inbox!!!"""
         url = f'{author_target.get_url()}/followers/{author_actor.get_id()}'
-        response = requests.delete(url,
+        response = self.client.delete(url,
                                    auth=(self.username, self.password))
+        return NodeConfigBase.to_follow_result(response, 'post_local_follow_remote')
+
+    async def adelete_local_follow_remote(self, author_target: Author, author_actor: Author) -> dict:
+        if self.overrides('delete_local_follow_remote'):
+            return await self.run_override('delete_local_follow_remote', author_target, author_actor)
+
+        url = f'{author_target.get_url()}/followers/{author_actor.get_id()}'
+        response = await self.async_client.delete(url, auth=(self.username, self.password))
+        return NodeConfigBase.to_follow_result(response, 'adelete_local_follow_remote')
+
+    @staticmethod
+    def to_follow_result(response, caller: str):
+        """The follow json the other node answered with, or the status code if there is none"""
         if 200 <= response.status_code < 300:
             try:
-                return json.loads(response.content.decode('utf-8'))
+                return FastJSON.loads(response.content.decode('utf-8'))
             except Exception as e:
-                print(f"Failed to deserialize response: {response.content}")
+                logger.warning(f"Failed to deserialize response: {response.content}")
         else:
-            print(f"post_local_follow_remote: remote server response: {response.status_code}")
+            logger.warning(f"{caller}: remote server response: {response.status_code}")
         return response.status_code
 
     def get_remote_follow(self, target: Author, follower: Author) -> Follow:
@@ -221,100 +356,276 @@ def get_remote_follow(self, target: Author, follower: Author) -> Follow:
         Returns None if cannot be found
         """
         url = f'{target.get_url()}/followers/{follower.get_id()}'
-        response = requests.get(url, auth=(self.username, self.password))
+        response = self.client.get(url, auth=(self.username, self.password))
+        return NodeConfigBase.to_follow(response)
+
+    async def aget_remote_follow(self, target: Author, follower: Author) -> Follow:
+        if self.overrides('get_remote_follow'):
+            return await self.run_override('get_remote_follow', target, follower)
+
+        url = f'{target.get_url()}/followers/{follower.get_id()}'
+        response = await self.async_client.get(url, auth=(self.username, self.password))
+        return await sync_to_async(NodeConfigBase.to_follow)(response)
+
+    @staticmethod
+    def to_follow(response) -> Follow:
         if 200 <= response.status_code < 300:
-            follow_json = json.loads(response.content)
+            follow_json = FastJSON.loads(response.content)
             follow_serializer = FollowRequestSerializer(data=follow_json)
             if not follow_serializer.is_valid():
                 for err in follow_serializer.errors:
-                    print(f'NodeConfigBase: get_remote_follow: serialization error: {err}')
+                    logger.warning(f'NodeConfigBase: get_remote_follow: serialization error: {err}')
                 return None
             return follow_serializer.validated_data
         else:
-            print(f'NodeConfigBase: get_follow_request: get failed: {response.status_code}')
+            logger.warning(f'NodeConfigBase: get_follow_request: get failed: {response.status_code}')
             return None
 
     def send_to_remote_inbox(self, data, target_author_url):
         if target_author_url is None:
             return 404
         url = f'{target_author_url}/inbox'
-        return requests.post(url = url, data = json.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
+        return self.client.post(url = url, data = FastJSON.dumps(data), auth = (self.username, self.password), headers = NodeConfigBase.get_inbox_headers(data, target_author_url))
+
+    async def asend_to_remote_inbox(self, data, target_author_url):
+        if self.overrides('send_to_remote_inbox'):
+            return await self.run_override('send_to_remote_inbox', data, target_author_url)
+
+        if target_author_url is None:
+            return 404
+        url = f'{target_author_url}/inbox'
+        return await self.async_client.post(url = url, data = FastJSON.dumps(data), auth = (self.username, self.password), headers = NodeConfigBase.get_inbox_headers(data, target_author_url))
+
+    @staticmethod
+    def get_inbox_headers(data, target_author_url: str) -> dict:
+        """Sends the same Idempotency-Key whenever the same item goes to the same inbox, so it's only added once"""
+        headers = {'content-type': 'application/json'}
+        dedupe_key = InboxItem.get_dedupe_key(data) if isinstance(data, dict) else None
+        if dedupe_key is not None:
+            headers['Idempotency-Key'] = hashlib.sha256(f'{dedupe_key} {target_author_url}'.encode('utf-8')).hexdigest()
+        return headers
+
+    def send_many_to_remote_inbox(self, items: list) -> list:
+        """
+        Sends many items to inboxes on this node: in one POST /inbox/bulk if it supports_bulk_inbox, otherwise with
+        send_to_remote_inbox one by one.
+
+        :param items: (data, target_author_url) pairs
+        :return: The response of every item, in order, or the exception sending it raised. Items sent in bulk get a
+        response of their own, with their status code and result (see BulkInboxView).
+        """
+        if self.supports_bulk_inbox:
+            try:
+                response = self.client.post(url = self.get_bulk_inbox_url(), data = FastJSON.dumps(NodeConfigBase.to_bulk_inbox_request(items)), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
+            except Exception as e:
+                return [e] * len(items)
+            if response.status_code != 404:
+                return NodeConfigBase.to_bulk_inbox_responses(response, len(items))
+            logger.info(f'{self}: send_many_to_remote_inbox: no bulk inbox yet, sending one by one')
+
+        responses = []
+        for data, target_author_url in items:
+            try:
+                responses.append(self.send_to_remote_inbox(data, target_author_url))
+            except Exception as e:
+                responses.append(e)
+        return responses
+
+    async def asend_many_to_remote_inbox(self, items: list) -> list:
+        """Async version of send_many_to_remote_inbox; items sent one by one are all sent at the same time"""
+        if self.supports_bulk_inbox:
+            try:
+                response = await self.async_client.post(url = self.get_bulk_inbox_url(), data = FastJSON.dumps(NodeConfigBase.to_bulk_inbox_request(items)), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
+            except Exception as e:
+                return [e] * len(items)
+            if response.status_code != 404:
+                return NodeConfigBase.to_bulk_inbox_responses(response, len(items))
+            logger.info(f'{self}: asend_many_to_remote_inbox: no bulk inbox yet, sending one by one')
+
+        return list(await asyncio.gather(*[self.asend_to_remote_inbox(data, target_author_url)
+                                           for data, target_author_url in items], return_exceptions=True))
+
+    def get_bulk_inbox_url(self) -> str:
+        return f'{self.get_base_url()}/inbox/bulk'
+
+    @staticmethod
+    def to_bulk_inbox_request(items: list) -> dict:
+        return {
+            'type': 'inbox-bulk',
+            'items': [{'author': target_author_url, 'item': data} for data, target_author_url in items],
+        }
+
+    @staticmethod
+    def to_bulk_inbox_responses(response, item_count: int) -> list:
+        """Splits the response of POST /inbox/bulk into a response per item; all of them fail if it failed"""
+        if response.status_code < 200 or response.status_code > 300:
+            logger.warning(f'NodeConfigBase: bulk inbox: remote server response: {response.status_code}')
+            return [response] * item_count
+
+        try:
+            results = FastJSON.loads(response.content)['items']
+        except Exception as e:
+            return [e] * item_count
+        if len(results) != item_count:
+            return [ValueError(f'NodeConfigBase: bulk inbox: {len(results)} results for {item_count} items')] * item_count
+        return [httpx.Response(result['status'], json = result) for result in results]
 
     def get_authors_liked_on_post(self, object_id):
         url = f'{self.get_base_url()}{object_id}'
-        response =  requests.get(url = url, auth = (self.username, self.password))
+        response =  self.client.get(url = url, auth = (self.username, self.password))
+        return NodeConfigBase.to_json_response(response, "Failed to get author likes for post on remote server")
 
-        if response.status_code < 200 or response.status_code > 300:
-            return Response("Failed to get author likes for post on remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
-        return Response(json.loads(response.content), status = status.HTTP_200_OK)
+    async def aget_authors_liked_on_post(self, object_id):
+        if self.overrides('get_authors_liked_on_post'):
+            return await self.run_override('get_authors_liked_on_post', object_id)
+
+        url = f'{self.get_base_url()}{object_id}'
+        response = await self.async_client.get(url = url, auth = (self.username, self.password))
+        return NodeConfigBase.to_json_response(response, "Failed to get author likes for post on remote server")
 
     def get_authors_liked_on_comment(self, object_id):
         url = f'{self.get_base_url()}{object_id}'
-        return requests.get(url = url, auth = (self.username, self.password))
+        return self.client.get(url = url, auth = (self.username, self.password))
+
+    async def aget_authors_liked_on_comment(self, object_id):
+        if self.overrides('get_authors_liked_on_comment'):
+            return await self.run_override('get_authors_liked_on_comment', object_id)
+
+        url = f'{self.get_base_url()}{object_id}'
+        return await self.async_client.get(url = url, auth = (self.username, self.password))
 
     def get_authors_likes(self, target_author_url):
         url = f'{target_author_url}/liked'
-        return requests.get(url = url, auth = (self.username, self.password))
+        return self.client.get(url = url, auth = (self.username, self.password))
+
+    async def aget_authors_likes(self, target_author_url):
+        if self.overrides('get_authors_likes'):
+            return await self.run_override('get_authors_likes', target_author_url)
+
+        url = f'{target_author_url}/liked'
+        return await self.async_client.get(url = url, auth = (self.username, self.password))
+
+    @staticmethod
+    def to_json_response(response, error_message: str) -> Response:
+        if response.status_code < 200 or response.status_code > 300:
+            return Response(error_message, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response(FastJSON.loads(response.content), status = status.HTTP_200_OK)
 
     def get_post_by_post_id(self, post_url) -> (dict, Response):
         url = post_url  # for debugging
         try:
             url = f'{self.get_base_url()}{post_url}'
-            response =  requests.get(url = url, auth = (self.username, self.password))
+            response =  self.client.get(url = url, auth = (self.username, self.password))
+            return NodeConfigBase.to_post(response)
+        except Exception as e:
+            logger.warning(f'{self}: get_post_by_id: @url: {url}: error: {e}')
+            return None, Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            if response.status_code < 200 or response.status_code > 300:
-                print(response.text)
-                return None, Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+    async def aget_post_by_post_id(self, post_url) -> (dict, Response):
+        if self.overrides('get_post_by_post_id'):
+            return await self.run_override('get_post_by_post_id', post_url)
 
-            return json.loads(response.text), Response(json.loads(response.text), status = status.HTTP_200_OK)
+        url = post_url  # for debugging
+        try:
+            url = f'{self.get_base_url()}{post_url}'
+            response = await self.async_client.get(url = url, auth = (self.username, self.password))
+            return NodeConfigBase.to_post(response)
         except Exception as e:
-            print(f'{self}: get_post_by_id: @url: {url}: error: {e}')
+            logger.warning(f'{self}: aget_post_by_id: @url: {url}: error: {e}')
             return None, Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @staticmethod
+    def to_post(response) -> (dict, Response):
+        if response.status_code < 200 or response.status_code > 300:
+            logger.debug(response.text)
+            return None, Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return FastJSON.loads(response.text), Response(FastJSON.loads(response.text), status = status.HTTP_200_OK)
+
     def get_authors_posts(self, request, author_posts_path):
         url = f'{self.get_base_url()}{author_posts_path}'
-        response = requests.get(url = url, auth = (self.username, self.password))
-        
-        if response.status_code < 200 or response.status_code > 300:
-            return Response("Failed to get author's post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+        response = self.client.get(url = url, auth = (self.username, self.password))
+        return NodeConfigBase.to_posts_response(response)
+
+    def get_authors_posts_page(self, author_posts_path: str, params: dict):
+        """get_authors_posts without a request, for jobs like PostReplication; params has the page and size"""
+        url = f'{self.get_base_url()}{author_posts_path}?{urllib.parse.urlencode(params)}'
+        response = self.client.get(url = url, auth = (self.username, self.password))
+        return NodeConfigBase.to_posts_response(response)
+
+    async def aget_authors_posts(self, request, author_posts_path):
+        if self.overrides('get_authors_posts'):
+            return await self.run_override('get_authors_posts', request, author_posts_path)
+
+        url = f'{self.get_base_url()}{author_posts_path}'
+        response = await self.async_client.get(url = url, auth = (self.username, self.password))
+        return NodeConfigBase.to_posts_response(response)
 
-        return Response(json.loads(response.content), status = status.HTTP_200_OK)
+    @staticmethod
+    def to_posts_response(response) -> Response:
+        return NodeConfigBase.to_json_response(response, "Failed to get author's post from remote server")
 
     def get_comments_for_post(self, comments_path, author = None, request = None):
         url = f'{self.get_base_url()}{comments_path}'
-        response = requests.get(url = url, auth = (self.username, self.password))
+        response = self.client.get(url = url, auth = (self.username, self.password))
+        return NodeConfigBase.to_json_response(response, "Failed to get author's post from remote server")
 
-        if response.status_code < 200 or response.status_code > 300:
-            return Response("Failed to get author's post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+    async def aget_comments_for_post(self, comments_path, author = None, request = None):
+        if self.overrides('get_comments_for_post'):
+            return await self.run_override('get_comments_for_post', comments_path, author, request)
+
+        url = f'{self.get_base_url()}{comments_path}'
+        response = await self.async_client.get(url = url, auth = (self.username, self.password))
+        return NodeConfigBase.to_json_response(response, "Failed to get author's post from remote server")
 
-        return Response(json.loads(response.content), status = status.HTTP_200_OK)
-    
     def create_comment_on_post(self, comments_path, data, extra_data = None):
         url = f'{self.get_base_url()}{comments_path}'
-        response =  requests.post(url = url, data = json.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
-        if response.status_code < 200 or response.status_code > 300:
-            return Response("Failed to create a comment on remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
-        return Response(json.loads(response.content), status = status.HTTP_200_OK)
+        response =  self.client.post(url = url, data = FastJSON.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
+        return NodeConfigBase.to_json_response(response, "Failed to create a comment on remote server")
+
+    async def acreate_comment_on_post(self, comments_path, data, extra_data = None):
+        if self.overrides('create_comment_on_post'):
+            return await self.run_override('create_comment_on_post', comments_path, data, extra_data)
+
+        url = f'{self.get_base_url()}{comments_path}'
+        response = await self.async_client.post(url = url, data = FastJSON.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
+        return NodeConfigBase.to_json_response(response, "Failed to create a comment on remote server")
 
     def get_image_post(self, image_path):
         url = f'{self.get_base_url()}{image_path}'
-        response =  requests.get(url = url, auth = (self.username, self.password))
+        response =  self.client.get(url = url, auth = (self.username, self.password))
+        return NodeConfigBase.to_content_response(response, "Failed to get image post from remote server")
+
+    async def aget_image_post(self, image_path):
+        if self.overrides('get_image_post'):
+            return await self.run_override('get_image_post', image_path)
+
+        url = f'{self.get_base_url()}{image_path}'
+        response = await self.async_client.get(url = url, auth = (self.username, self.password))
+        return NodeConfigBase.to_content_response(response, "Failed to get image post from remote server")
 
-        if response.status_code < 200 or response.status_code > 300:
-            return Response("Failed to get image post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-        return Response(response.content, status = status.HTTP_200_OK, content_type= response.headers['Content-Type'])
-    
     def like_a_post(self, data, target_author_url, extra_data = None):
         if target_author_url is None:
             return 404
         url = f'{target_author_url}/inbox'
-        response = requests.post(url = url, data = json.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
-        
+        response = self.client.post(url = url, data = FastJSON.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
+        return NodeConfigBase.to_content_response(response, "Failed to create like from remote server")
+
+    async def alike_a_post(self, data, target_author_url, extra_data = None):
+        if self.overrides('like_a_post'):
+            return await self.run_override('like_a_post', data, target_author_url, extra_data)
+
+        if target_author_url is None:
+            return 404
+        url = f'{target_author_url}/inbox'
+        response = await self.async_client.post(url = url, data = FastJSON.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
+        return NodeConfigBase.to_content_response(response, "Failed to create like from remote server")
+
+    @staticmethod
+    def to_content_response(response, error_message: str) -> Response:
+        """Passes the other node's body and content type through as is"""
         if response.status_code < 200 or response.status_code > 300:
-            return Response("Failed to create like from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-        return Response(response.content, status = status.HTTP_200_OK, content_type= response.headers['Content-Type'])
+            return Response(error_message, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        return Response(response.content, status = status.HTTP_200_OK, content_type= response.headers['Content-Type'])
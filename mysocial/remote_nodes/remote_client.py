@@ -0,0 +1,233 @@
+import asyncio
+import re
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import httpx
+import requests
+
+from common.logging_util import LoggingUtil, REQUEST_ID_HEADER
+from common.request_context import RequestContext
+
+# path segments that are ids, so /authors/<uuid>/posts/ and /authors/<other uuid>/posts/ share one template
+ID_SEGMENT_PATTERN = re.compile(
+    r'/(?:[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}|[0-9a-fA-F]{24}|\d+)(?=/|$)'
+)
+
+
+class RemoteCallMetrics:
+    """
+    Process-wide aggregates of every call RemoteClient makes, rendered in the Prometheus text format.
+
+    Calls are grouped by node, method, endpoint template and status. Latencies go into a histogram per node, method
+    and endpoint template.
+    """
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    _lock = threading.Lock()
+    _calls = defaultdict(int)
+    _bytes = defaultdict(int)
+    _latency_buckets = defaultdict(lambda: [0] * (len(RemoteCallMetrics.LATENCY_BUCKETS) + 1))
+    _latency_sums = defaultdict(float)
+
+    @staticmethod
+    def record(node: str, method: str, endpoint: str, status: str, seconds: float, size: int):
+        call_key = (node, method, endpoint, status)
+        latency_key = (node, method, endpoint)
+        bucket = bisect_left(RemoteCallMetrics.LATENCY_BUCKETS, seconds)
+
+        with RemoteCallMetrics._lock:
+            RemoteCallMetrics._calls[call_key] += 1
+            RemoteCallMetrics._bytes[call_key] += size
+            RemoteCallMetrics._latency_buckets[latency_key][bucket] += 1
+            RemoteCallMetrics._latency_sums[latency_key] += seconds
+
+    @staticmethod
+    def reset():
+        with RemoteCallMetrics._lock:
+            RemoteCallMetrics._calls.clear()
+            RemoteCallMetrics._bytes.clear()
+            RemoteCallMetrics._latency_buckets.clear()
+            RemoteCallMetrics._latency_sums.clear()
+
+    @staticmethod
+    def render_prometheus() -> str:
+        with RemoteCallMetrics._lock:
+            calls = dict(RemoteCallMetrics._calls)
+            sizes = dict(RemoteCallMetrics._bytes)
+            latency_buckets = {key: list(value) for key, value in RemoteCallMetrics._latency_buckets.items()}
+            latency_sums = dict(RemoteCallMetrics._latency_sums)
+
+        lines = [
+            '# HELP remote_requests_total Outbound requests to other nodes.',
+            '# TYPE remote_requests_total counter',
+        ]
+        for (node, method, endpoint, status), count in sorted(calls.items()):
+            labels = RemoteCallMetrics._labels(node=node, method=method, endpoint=endpoint, status=status)
+            lines.append(f'remote_requests_total{{{labels}}} {count}')
+
+        lines += [
+            '# HELP remote_response_bytes_total Bytes received from other nodes.',
+            '# TYPE remote_response_bytes_total counter',
+        ]
+        for (node, method, endpoint, status), size in sorted(sizes.items()):
+            labels = RemoteCallMetrics._labels(node=node, method=method, endpoint=endpoint, status=status)
+            lines.append(f'remote_response_bytes_total{{{labels}}} {size}')
+
+        lines += [
+            '# HELP remote_request_duration_seconds Latency of outbound requests to other nodes.',
+            '# TYPE remote_request_duration_seconds histogram',
+        ]
+        for (node, method, endpoint), buckets in sorted(latency_buckets.items()):
+            labels = RemoteCallMetrics._labels(node=node, method=method, endpoint=endpoint)
+            cumulative = 0
+            for upper_bound, count in zip(RemoteCallMetrics.LATENCY_BUCKETS + ('+Inf',), buckets):
+                cumulative += count
+                lines.append(f'remote_request_duration_seconds_bucket{{{labels},le="{upper_bound}"}} {cumulative}')
+            lines.append(f'remote_request_duration_seconds_sum{{{labels}}} {latency_sums[(node, method, endpoint)]}')
+            lines.append(f'remote_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        def escape(value: str) -> str:
+            return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        return ','.join(f'{key}="{escape(str(value))}"' for key, value in labels.items())
+
+
+class RemoteClient:
+    """
+    The HTTP client every node config uses to talk to its node; see NodeConfigBase.client.
+
+    Same interface as the requests module (get, post, put, delete), but every call is recorded in RemoteCallMetrics
+    and in the current RequestContext. Connections are kept alive between calls to the same node.
+    """
+
+    def __init__(self, node: str):
+        self.node = node
+        self.session = requests.Session()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        method = method.upper()
+        RemoteClient.add_request_id(kwargs)
+        endpoint = RemoteClient.get_endpoint_template(url)
+        start = time.perf_counter()
+        status = 'error'
+        size = 0
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = str(response.status_code)
+            size = len(response.content)
+            return response
+        finally:
+            RemoteClient.record(self.node, method, endpoint, status, time.perf_counter() - start, size)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+    @staticmethod
+    def add_request_id(kwargs: dict):
+        request_id = LoggingUtil.get_request_id()
+        if request_id is not None:
+            # lets the other node, if it logs request ids too, correlate its logs with ours
+            kwargs['headers'] = {REQUEST_ID_HEADER: request_id, **(kwargs.get('headers') or {})}
+
+    @staticmethod
+    def record(node: str, method: str, endpoint: str, status: str, seconds: float, size: int):
+        RemoteCallMetrics.record(node, method, endpoint, status, seconds, size)
+        context = RequestContext.get_current()
+        if context is not None:
+            context.record_http(seconds)
+
+    @staticmethod
+    def get_endpoint_template(url: str) -> str:
+        """e.g. https://host/authors/<uuid>/posts/<uuid> -> /authors/{id}/posts/{id}"""
+        path = urlparse(url).path or '/'
+        return ID_SEGMENT_PATTERN.sub('/{id}', path)
+
+
+class AsyncRemoteClient:
+    """
+    The async twin of RemoteClient; see NodeConfigBase.async_client.
+
+    Takes the same arguments as RemoteClient (auth tuples, data, headers) and returns httpx responses, which have the
+    status_code, content, text and headers our node configs read. Calls are recorded the same way as RemoteClient's.
+
+    httpx clients can't be shared between event loops, so there is one pooled client per running loop: under uvicorn
+    that's one per worker, under WSGI (where Django runs async views in a short-lived loop) one per request. A client
+    is closed when its loop shuts down.
+    """
+    TIMEOUT_SECONDS = 10.0
+
+    def __init__(self, node: str):
+        self.node = node
+        self._clients = weakref.WeakKeyDictionary()
+        self._closers = weakref.WeakKeyDictionary()
+
+    async def get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(timeout=AsyncRemoteClient.TIMEOUT_SECONDS)
+            self._clients[loop] = client
+            # kept until the loop is gone, so it's only closed by the loop's shutdown and not when it's collected
+            self._closers[loop] = AsyncRemoteClient.close_on_shutdown(client)
+            await self._closers[loop].__anext__()
+        return client
+
+    @staticmethod
+    async def close_on_shutdown(client: httpx.AsyncClient):
+        """
+        Closes client once the loop it's started in shuts down: the loop closes its async generators then, as asyncio.run
+        (and so async_to_sync, which runs async views under WSGI) does
+        """
+        try:
+            yield
+        finally:
+            await client.aclose()
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        method = method.upper()
+        RemoteClient.add_request_id(kwargs)
+        if isinstance(kwargs.get('data'), (bytes, str)):
+            # requests takes a raw body as data; httpx wants it as content
+            kwargs['content'] = kwargs.pop('data')
+        endpoint = RemoteClient.get_endpoint_template(url)
+        start = time.perf_counter()
+        status = 'error'
+        size = 0
+        try:
+            client = await self.get_client()
+            response = await client.request(method, url, **kwargs)
+            status = str(response.status_code)
+            size = len(response.content)
+            return response
+        finally:
+            RemoteClient.record(self.node, method, endpoint, status, time.perf_counter() - start, size)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('PUT', url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('DELETE', url, **kwargs)
@@ -1,4 +1,5 @@
 import json
+import logging
 import os
 import sys
 
@@ -25,6 +26,8 @@
 from remote_nodes.turnip_oomfie import TurnipOomfie
 from remote_nodes.ualberta import UAlberta
 
+logger = logging.getLogger(__name__)
+
 
 class RemoteUtil:
     """
@@ -78,7 +81,7 @@ def setup():
                                                          credentials['remote_username'], credentials['remote_password'],
                                                          host)
             except Exception as e:
-                print(f'RemoteUtil: setup: unknown error: {e}')
+                logger.warning(f'RemoteUtil: setup: unknown error: {e}')
                 continue
 
             is_active = credentials.get('is_active')
@@ -125,17 +128,17 @@ def setup():
                     other_args.pop('username')
                     TestHelper.overwrite_author(username, other_args)
             except Exception as e:
-                print(f'RemoteUtil: setup: unknown error: {e}')
+                logger.warning(f'RemoteUtil: setup: unknown error: {e}')
 
         if 'test' in sys.argv and 'integration' not in sys.argv:
-            print("Ignoring remote because it's a local test")
+            logger.info("Ignoring remote because it's a local test")
             return
 
         # This is where the endpoints and configs are added!
         # When it's local (contains 127.0.0.1), we add 127.0.0.1:8000 and 127.0.0.1:8080
         # Then, we add the endpoints, like turnip-oomfie-1.herokuapp.com (TurnipOomfie)
         for config in connected_node_classes:
-            print(f"Adding node information for: {config}")
+            logger.info(f"Adding node information for: {config}")
             base.REMOTE_CONFIG.update(config.create_dictionary_entry())
 
         # add all connected nodes but self to prevent infinite recursion
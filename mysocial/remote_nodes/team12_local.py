@@ -1,7 +1,8 @@
 import json
+import logging
 import urllib.parse
 
-import requests
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -9,6 +10,7 @@
 from authors.serializers.author_serializer import AuthorSerializer
 from authors.util import AuthorUtil
 from common.base_util import BaseUtil
+from common.fast_json import FastJSON
 from common.pagination_helper import PaginationHelper
 from follow.models import Follow
 from follow.serializers.follow_serializer import FollowRequestSerializer
@@ -18,10 +20,13 @@
 from comment.serializers import CommentSerializer
 from remote_nodes.node_config_base import NodeConfigBase
 
+logger = logging.getLogger(__name__)
+
 
 class Team12Local(LocalDefault):
     domain = '127.0.0.1:8012'
     username = 'team12_local'
+    supports_bulk_inbox = False
     team_metadata_tag = 'team12'
 
     """Mapping: remote <-> local"""
@@ -62,7 +67,7 @@ def __init__(self):
 
         """
         To use headers:
-            response = requests.get('url',
+            response = self.client.get('url',
                                     headers=self.headers,
                                     auth=(self.username, self.password))
         """
@@ -85,33 +90,46 @@ def create_node_credentials(cls):
     def get_headers(self):
         """
         Use like:
-            response = requests.get(url, headers=self.headers)
+            response = self.client.get(url, headers=self.headers)
         """
         if self.bearer_token is None:
             try:
-                payload = json.dumps({
-                    "email": self.username,
-                    "password": self.password
-                })
-                headers = {
-                    'Content-Type': 'application/json'
-                }
-                response = requests.post(
-                    f'{self.get_base_url()}/api/auth/token/obtain/',
-                    data=payload,
-                    headers=headers)
-                if response.status_code == 200:
-                    response_json: dict = json.loads(response.text)
-                    self.bearer_token = response_json.get('access')
-
+                self.read_bearer_token(self.client.post(**self.get_token_request()))
             except ConnectionError as err:
-                print(f'{self}: headers: connection error: the other server at {self.get_base_url()} may not be up or '
-                      f'too slow to respond')
+                logger.warning(f'{self}: headers: connection error: the other server at {self.get_base_url()} may not be up or '
+                           f'too slow to respond')
+            except Exception as e:
+                logger.warning(f'{self}: headers: unknown error: {e}')
+
+        return self.to_headers()
+
+    async def aget_headers(self):
+        if self.bearer_token is None:
+            try:
+                self.read_bearer_token(await self.async_client.post(**self.get_token_request()))
             except Exception as e:
-                print(f'{self}: headers: unknown error: {e}')
+                logger.warning(f'{self}: headers: possibly no connection: {e}')
 
+        return self.to_headers()
+
+    def get_token_request(self) -> dict:
+        payload = json.dumps({
+            "email": self.username,
+            "password": self.password
+        })
+        headers = {
+            'Content-Type': 'application/json'
+        }
+        return {'url': f'{self.get_base_url()}/api/auth/token/obtain/', 'data': payload, 'headers': headers}
+
+    def read_bearer_token(self, response):
+        if response.status_code == 200:
+            response_json: dict = FastJSON.loads(response.text)
+            self.bearer_token = response_json.get('access')
+
+    def to_headers(self):
         if self.bearer_token is None:
-            print(f'{self}: headers: bearer token still empty')
+            logger.warning(f'{self}: headers: bearer token still empty')
 
         return {
             'Authorization': f'Bearer {self.bearer_token}',
@@ -132,9 +150,9 @@ def get_all_followers(self, author: Author, params=None):
         if len(params) > 0:
             query_param = urllib.parse.urlencode(params)
             url += '?' + query_param
-        response = requests.get(url, headers=self.get_headers())
+        response = self.client.get(url, headers=self.get_headers())
         if response.status_code == 200:
-            response_json = json.loads(response.text)
+            response_json = FastJSON.loads(response.text)
             author_list = []
             for author_data in response_json:
                 data_host = author_data.get('sender_host')
@@ -151,20 +169,20 @@ def get_all_followers(self, author: Author, params=None):
                         author = Author.get_author(author_id, should_do_recursively=False)
                         author_list.append(AuthorSerializer(author).data)
                     except Exception as e:
-                        print(f'{self}: get_all_followers: failed with host({host}); data_host({data_host}); id({author_id}): error: {e}')
+                        logger.warning(f'{self}: get_all_followers: failed with host({host}); data_host({data_host}); id({author_id}): error: {e}')
                     continue
 
                 # remote case
                 host = BaseUtil.transform_host(host)
                 node_config: NodeConfigBase = base.REMOTE_CONFIG.get(host)
                 if node_config is None:
-                    print(f"{self}: get_all_followers: Host not found: {host} for {data_host}")
+                    logger.warning(f"{self}: get_all_followers: Host not found: {host} for {data_host}")
                     continue
 
                 author_url = node_config.convert_to_valid_author_url(author_data['sender_id'])
                 author, err = AuthorUtil.from_author_url_to_author(author_url)
                 if err is not None:
-                    print(f"{self}: get_all_followers: failed to get author via url: {err}")
+                    logger.warning(f"{self}: get_all_followers: failed to get author via url: {err}")
                     continue
 
                 author_list.append(AuthorSerializer(author).data)
@@ -196,7 +214,7 @@ def get_remote_follow(self, target: Author, follower: Author) -> Follow:
             })
             if not follow_serializer.is_valid():
                 for err in follow_serializer.errors:
-                    print(f'{self}: get_remote_follow: serialization error: {err}')
+                    logger.warning(f'{self}: get_remote_follow: serialization error: {err}')
                 return None
             return follow_serializer.validated_data
         else:
@@ -209,7 +227,7 @@ def post_local_follow_remote(self, author_actor: Author, author_target: Author)
         snd_username = author_actor.username
         rec_uuid = author_target.get_id()
         url = f'{self.get_base_url()}/friendrequest/from_external/10/{snd_uuid}/{snd_username}/send/{rec_uuid}/'
-        response = requests.post(url, headers=self.get_headers())
+        response = self.client.post(url, headers=self.get_headers())
         if 200 <= response.status_code < 300:
             return {
                 'type': 'follow',
@@ -219,7 +237,7 @@ def post_local_follow_remote(self, author_actor: Author, author_target: Author)
                 'localUrl': f'{BaseUtil.get_http_or_https()}{base.CURRENT_DOMAIN}/{Author.URL_PATH}/{author_target.get_id()}/followers/{author_actor.get_url()}',
                 'id': None
             }  # <- GOOD
-        print(
+        logger.info(
             f"{self}: post_local_follow_remote: remote server response: Code ({response.status_code}): {response.text}")
         return response.status_code
 
@@ -229,11 +247,11 @@ def team12_accept(self, author_actor: Author, author_target: Author):
         snd_uuid = author_actor.get_id()
         rec_uuid = author_target.get_id()
         url = f'{self.get_base_url()}/friendrequest/accept_external/sender/{snd_uuid}/recipient/{rec_uuid}/'
-        response = requests.post(url, headers=self.get_headers())
+        response = self.client.post(url, headers=self.get_headers())
         if 200 <= response.status_code < 300:
             return
 
-        print(f"{self}: team12_accept: non-successful: ({response.status_code}): {response.text}")
+        logger.warning(f"{self}: team12_accept: non-successful: ({response.status_code}): {response.text}")
         # silently ignore if it went wrong
 
     def team12_reject(self, author_actor: Author, author_target: Author):
@@ -242,11 +260,11 @@ def team12_reject(self, author_actor: Author, author_target: Author):
         snd_uuid = author_actor.get_id()
         rec_uuid = author_target.get_id()
         url = f'{self.get_base_url()}/friendrequest/reject_external/sender/{snd_uuid}/recipient/{rec_uuid}/'
-        response = requests.post(url, headers=self.get_headers())
+        response = self.client.post(url, headers=self.get_headers())
         if 200 <= response.status_code < 300:
             return
 
-        print(f"{self}: team12_reject: non-successful: ({response.status_code}): {response.text}")
+        logger.warning(f"{self}: team12_reject: non-successful: ({response.status_code}): {response.text}")
         # silently ignore if it went wrong
 
     def team12_unfollow(self, author_actor: Author, author_target: Author):
@@ -255,70 +273,106 @@ def team12_unfollow(self, author_actor: Author, author_target: Author):
         follower_id = author_actor.get_id()
         user_id = author_target.get_id()
         url = f'{self.get_base_url()}/{follower_id}/unfollow/{user_id}/'
-        response = requests.post(url, headers=self.get_headers())
+        response = self.client.post(url, headers=self.get_headers())
         if 200 <= response.status_code < 300:
             return
 
-        print(f"{self}: team12_unfollow: non-successful: ({response.status_code}): {response.text}")
+        logger.warning(f"{self}: team12_unfollow: non-successful: ({response.status_code}): {response.text}")
         # silently ignore if it went wrong
 
     def get_all_author_jsons(self, params: dict):
         """Returns a list of authors as json"""
-        url = f'{self.get_base_url()}/authors/'
-        if len(params) > 0:
-            query_param = urllib.parse.urlencode(params)
-            url += '?' + query_param
+        url = self.get_all_authors_url(params)
 
         try:
-            response = requests.get(url, headers=self.get_headers())
+            response = self.client.get(url, headers=self.get_headers())
         except ConnectionError:
-            print(f'Connection error: {self}')
+            logger.warning(f'Connection error: {self}')
             return None
         except Exception as e:
-            print(f"NodeConfigBase: Unknown err: {str(e)}")
+            logger.warning(f"NodeConfigBase: Unknown err: {str(e)}")
             return None
 
-        if response.status_code == 200:
-            return AuthorSerializer.deserializer_author_list(response.content.decode('utf-8'))
-        return None
+        return NodeConfigBase.to_author_jsons(response)
+
+    async def aget_all_author_jsons(self, params: dict):
+        url = self.get_all_authors_url(params)
+
+        try:
+            response = await self.async_client.get(url, headers=await self.aget_headers())
+        except Exception as e:
+            logger.warning(f'{self}: aget_all_author_jsons: possibly no connection: {e}')
+            return None
+
+        return await sync_to_async(NodeConfigBase.to_author_jsons)(response)
 
     def get_author_via_url(self, author_url: str) -> Author:
         author_url = author_url.rstrip('/')
         author_url = f'{author_url}/'
-        response = requests.get(author_url, headers=self.get_headers())
+        response = self.client.get(author_url, headers=self.get_headers())
+        return self.convert_team12_author_response(author_url, response)
 
+    async def aget_author_via_url(self, author_url: str) -> Author:
+        author_url = author_url.rstrip('/')
+        author_url = f'{author_url}/'
+        try:
+            response = await self.async_client.get(author_url, headers=await self.aget_headers())
+        except Exception as e:
+            logger.warning(f'{self}: aget_author_via_url: possibly no connection: {e}')
+            return None
+
+        return await sync_to_async(self.convert_team12_author_response)(author_url, response)
+
+    def convert_team12_author_response(self, author_url: str, response) -> Author:
         if response.status_code == 200:
-            author_json = json.loads(response.content.decode('utf-8'))
+            author_json = FastJSON.loads(response.content.decode('utf-8'))
             author_json['url'] = author_url  # since we don't trust their url; this works
             serializer = AuthorSerializer(data=author_json)
 
             if serializer.is_valid():
                 return serializer.validated_data  # <- GOOD RESULT HERE!!!
 
-            print(f'{self} GetAuthorViaUrl: AuthorSerializer: ', serializer.errors)
+            logger.warning(f'{self} GetAuthorViaUrl: AuthorSerializer: {serializer.errors}')
 
         return None
 
     def get_authors_posts(self, request, author_posts_path):
+        return self.get_authors_posts_page(author_posts_path, request.query_params)
+
+    def get_authors_posts_page(self, author_posts_path: str, params: dict):
         url = f'{self.get_base_url()}{author_posts_path}'
 
         try:
-            response = requests.get(url, headers=self.get_headers())
-            if response.status_code < 200 or response.status_code > 300:
-                return Response("Failed to get author's  post from remote server",
-                                status.HTTP_500_INTERNAL_SERVER_ERROR)
+            response = self.client.get(url, headers=self.get_headers())
+        except Exception as e:
+            return Response(f"Failed to get author's post from remote server, error: {e}",
+                            status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return self.convert_team12_posts_response(params, url, response)
+
+    async def aget_authors_posts(self, request, author_posts_path):
+        url = f'{self.get_base_url()}{author_posts_path}'
 
+        try:
+            response = await self.async_client.get(url, headers=await self.aget_headers())
         except Exception as e:
             return Response(f"Failed to get author's post from remote server, error: {e}",
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        return await sync_to_async(self.convert_team12_posts_response)(request.query_params, url, response)
+
+    def convert_team12_posts_response(self, params: dict, url, response):
+        if response.status_code < 200 or response.status_code > 300:
+            return Response("Failed to get author's  post from remote server",
+                            status.HTTP_500_INTERNAL_SERVER_ERROR)
+
         data = []
-        post_data = json.loads(response.content.decode('utf-8'))
+        post_data = FastJSON.loads(response.content.decode('utf-8'))
 
         for post in post_data:
             data.append(self.convert_team12_post(url, post))
 
-        data, err = PaginationHelper.paginate_serialized_data(request, data)
+        data, err = PaginationHelper.paginate_data(params, data)
 
         if err is not None:
             return Response(err, status=status.HTTP_400_BAD_REQUEST)
@@ -329,16 +383,29 @@ def get_post_by_post_id(self, post_url) -> (dict, Response):
         url = f'{self.get_base_url()}{post_url}'
 
         try:
-            response = requests.get(url, headers=self.get_headers())
+            response = self.client.get(url, headers=self.get_headers())
+        except Exception as e:
+            return None, Response(f"Failed to get post from remote server, error: {e}",
+                            status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            if response.status_code < 200 or response.status_code > 300:
-                return None, Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return self.convert_team12_post_response(url, response)
 
+    async def aget_post_by_post_id(self, post_url) -> (dict, Response):
+        url = f'{self.get_base_url()}{post_url}'
+
+        try:
+            response = await self.async_client.get(url, headers=await self.aget_headers())
         except Exception as e:
             return None, Response(f"Failed to get post from remote server, error: {e}",
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        post_data = json.loads(response.content.decode('utf-8'))
+        return await sync_to_async(self.convert_team12_post_response)(url, response)
+
+    def convert_team12_post_response(self, url, response) -> (dict, Response):
+        if response.status_code < 200 or response.status_code > 300:
+            return None, Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        post_data = FastJSON.loads(response.content.decode('utf-8'))
 
         post = self.convert_team12_post(url, post_data)
         return post, Response(post, status=status.HTTP_200_OK)
@@ -348,7 +415,7 @@ def get_comments_for_post(self, comments_path, author = None, request = None):
         url = f'{self.get_base_url()}{split_comments[0]}{author.display_name}/posts{split_comments[1]}/'
         try:
 
-            response = requests.get(url, headers=self.get_headers())
+            response = self.client.get(url, headers=self.get_headers())
             if response.status_code < 200 or response.status_code > 300:
                 return Response("Failed to get comments for post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
             
@@ -357,7 +424,7 @@ def get_comments_for_post(self, comments_path, author = None, request = None):
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         data = []
-        comment_data = json.loads(response.content.decode('utf-8'))
+        comment_data = FastJSON.loads(response.content.decode('utf-8'))
         
         for comment in comment_data:
             data.append(self.convert_team12_comment(url, comment))
@@ -375,11 +442,11 @@ def create_comment_on_post(self, comments_path, data, extra_data = None):
 
         url = f'{self.get_base_url()}{split_comments[0]}{display_name}/posts{split_comments[1]}/'
         data = self.create_team12_comment(data)
-        response = requests.post(url = url, data = json.dumps(data), headers=self.get_headers())
+        response = self.client.post(url = url, data = FastJSON.dumps(data), headers=self.get_headers())
         
         if response.status_code < 200 or response.status_code > 300:
             return Response(
-                f"Failed to get post from remote server, error {json.loads(response.content)}",
+                f"Failed to get post from remote server, error {FastJSON.loads(response.content)}",
                 status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response("Successfully created comment to team 12!", status=status.HTTP_200_OK)
@@ -389,13 +456,13 @@ def get_authors_liked_on_post(self, object_id):
         post_path = object_id.split('posts')[1]
         url = f'{self.get_base_url()}/posts{post_path}/'
   
-        response =  requests.get(url = url, headers=self.get_headers())
+        response =  self.client.get(url = url, headers=self.get_headers())
 
         if response.status_code < 200 or response.status_code > 300:
             return Response("Failed to get author likes for post on remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-        team12_authors = json.loads(response.content.decode('utf-8'))
-        print(team12_authors)
+        team12_authors = FastJSON.loads(response.content.decode('utf-8'))
+        logger.debug(team12_authors)
         data = []
 
         try:
@@ -412,11 +479,11 @@ def like_a_post(self, data, target_author_url, extra_data = None):
         display_name = extra_data['displayName']
 
         url = f'{split_post[0]}{display_name}/posts{split_post[1]}/likes/'
-        response = requests.post(url = url, headers=self.get_headers())
+        response = self.client.post(url = url, headers=self.get_headers())
         
         if response.status_code < 200 or response.status_code > 300:
             return Response(
-                f"Failed to like post on team 12, error {json.loads(response.content)}",
+                f"Failed to like post on team 12, error {FastJSON.loads(response.content)}",
                 status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response("Successfully created like to team 12!", status=status.HTTP_200_OK)
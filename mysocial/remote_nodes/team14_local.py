@@ -1,14 +1,16 @@
-import json
+import logging
 import urllib.parse
 
-import requests
 import urllib.parse
+
+from asgiref.sync import sync_to_async
 from rest_framework.response import Response
 from rest_framework import status
 
 from authors.models.author import Author
 from authors.serializers.author_serializer import AuthorSerializer
 from common.base_util import BaseUtil
+from common.fast_json import FastJSON
 from follow.models import Follow
 from follow.serializers.follow_serializer import FollowRequestSerializer
 from remote_nodes.local_default import LocalDefault
@@ -18,10 +20,13 @@
 
 from common.pagination_helper import PaginationHelper
 
+logger = logging.getLogger(__name__)
+
 
 class Team14Local(LocalDefault):
     domain = '127.0.0.1:8014'
     username = 'team14_local'
+    supports_bulk_inbox = False
 
     """team14 fields <-> our fields"""
     remote_author_fields = {
@@ -77,7 +82,7 @@ def create_node_credentials(cls):
 
     def post_local_follow_remote(self, author_actor: Author, author_target: Author) -> dict:
         url = f'{author_target.get_url()}/inbox/'
-        response = requests.post(url,
+        response = self.client.post(url,
                                  auth=(self.username, self.password),
                                  json={
                                      'type': 'follow',
@@ -99,7 +104,7 @@ def post_local_follow_remote(self, author_actor: Author, author_target: Author)
                 'localUrl': f'{author_actor.get_url()}/followers/{author_target.get_id()}/',
                 'id': None
             }  # <- GOOD
-        print(f'{self}: post_local_follow_remote: {response.content}')
+        logger.info(f'{self}: post_local_follow_remote: {response.content}')
         return response.status_code
 
     def get_remote_follow(self, target: Author, follower: Author) -> Follow:
@@ -110,11 +115,11 @@ def get_remote_follow(self, target: Author, follower: Author) -> Follow:
         Returns None if cannot be found
         """
         url = f'{target.get_url()}/followers/{follower.get_id()}'
-        response = requests.get(url, auth=(self.username, self.password))
+        response = self.client.get(url, auth=(self.username, self.password))
         if 200 <= response.status_code < 300:
-            follow_json = json.loads(response.content)
+            follow_json = FastJSON.loads(response.content)
             if 'message' not in follow_json or follow_json['message'] != 'follower indeed':
-                print(f'{self}: get_remote_follow: unknown message: {follow_json}')
+                logger.warning(f'{self}: get_remote_follow: unknown message: {follow_json}')
                 return None
 
             follow_serializer = FollowRequestSerializer(data={
@@ -126,11 +131,11 @@ def get_remote_follow(self, target: Author, follower: Author) -> Follow:
             })
             if not follow_serializer.is_valid():
                 for err in follow_serializer.errors:
-                    print(f'{self}: get_remote_follow: serialization error: {err}')
+                    logger.warning(f'{self}: get_remote_follow: serialization error: {err}')
                 return None
             return follow_serializer.validated_data
         else:
-            print(f'{self}: get_follow_request: get failed: {response.status_code}')
+            logger.warning(f'{self}: get_follow_request: get failed: {response.status_code}')
             return None
 
     def delete_local_follow_remote(self, author_target: Author, author_actor: Author) -> dict:
@@ -139,46 +144,74 @@ def delete_local_follow_remote(self, author_target: Author, author_actor: Author
 
     def get_all_author_jsons(self, params: dict):
         """Returns a list of authors as json"""
-        url = f'{self.get_base_url()}/authors/'
-        if len(params) > 0:
-            query_param = urllib.parse.urlencode(params)
-            url += '?' + query_param
+        url = self.get_all_authors_url(params)
 
         try:
-            response = requests.get(url, auth=(self.username, self.password))
+            response = self.client.get(url, auth=(self.username, self.password))
         except ConnectionError as e:
-            print(f"{self.__class__.username}: url ({url}) Connection error: {e}")
+            logger.warning(f"{self.__class__.username}: url ({url}) Connection error: {e}")
             return None
         except Exception as e:
-            print(f"{self.__class__.username}: Unknown err: {e}")
+            logger.warning(f"{self.__class__.username}: Unknown err: {e}")
+            return None
+
+        return self.convert_team14_author_jsons_response(url, response)
+
+    async def aget_all_author_jsons(self, params: dict):
+        url = self.get_all_authors_url(params)
+
+        try:
+            response = await self.async_client.get(url, auth=(self.username, self.password))
+        except Exception as e:
+            logger.warning(f"{self.__class__.username}: url ({url}) possibly no connection: {e}")
             return None
 
+        return await sync_to_async(self.convert_team14_author_jsons_response)(url, response)
+
+    def convert_team14_author_jsons_response(self, url, response):
         if response.status_code == 200:
             return AuthorSerializer.deserializer_author_list(response.content.decode('utf-8'))
         else:
-            print(f'Non-200 status code for team 14: {url}')
-            print(response.content.decode('utf-8'))
+            logger.warning(f'Non-200 status code for team 14: {url}')
+            logger.debug(response.content.decode('utf-8'))
         return None
 
     def get_authors_posts(self, request, author_post_path: str):
+        return self.get_authors_posts_page(author_post_path, request.query_params)
+
+    def get_authors_posts_page(self, author_post_path: str, params: dict):
         url = f'{self.get_base_url()}{author_post_path}'
 
         try:
-            response = requests.get(url, auth=(self.username, self.password))
-            if response.status_code < 200 or response.status_code > 300:
-                return Response("Failed to get author's  post from remote server",
-                                status.HTTP_500_INTERNAL_SERVER_ERROR)
+            response = self.client.get(url, auth=(self.username, self.password))
+        except Exception as e:
+            return Response(f"Failed to get author's post from remote server, error: {e}",
+                            status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return self.convert_team14_posts_response(params, url, response)
 
+    async def aget_authors_posts(self, request, author_post_path: str):
+        url = f'{self.get_base_url()}{author_post_path}'
+
+        try:
+            response = await self.async_client.get(url, auth=(self.username, self.password))
         except Exception as e:
             return Response(f"Failed to get author's post from remote server, error: {e}",
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        return await sync_to_async(self.convert_team14_posts_response)(request.query_params, url, response)
+
+    def convert_team14_posts_response(self, params: dict, url, response):
+        if response.status_code < 200 or response.status_code > 300:
+            return Response("Failed to get author's  post from remote server",
+                            status.HTTP_500_INTERNAL_SERVER_ERROR)
+
         data = []
-        post_data = json.loads(response.content.decode('utf-8'))
+        post_data = FastJSON.loads(response.content.decode('utf-8'))
         for post in post_data:
             data.append(self.convert_team14_post(url, post))
 
-        data, err = PaginationHelper.paginate_serialized_data(request, data)
+        data, err = PaginationHelper.paginate_data(params, data)
 
         if err is not None:
             return Response(err, status=status.HTTP_400_BAD_REQUEST)
@@ -189,16 +222,29 @@ def get_post_by_post_id(self, post_url: str) -> (dict, Response):
         url = f'{self.get_base_url()}{post_url}'
 
         try:
-            response = requests.get(url, auth=(self.username, self.password))
+            response = self.client.get(url, auth=(self.username, self.password))
+        except Exception as e:
+            return None, Response(f"Failed to get author's post from remote server, error: {e}",
+                            status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            if response.status_code < 200 or response.status_code > 300:
-                return None, Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return self.convert_team14_post_response(url, response)
 
+    async def aget_post_by_post_id(self, post_url: str) -> (dict, Response):
+        url = f'{self.get_base_url()}{post_url}'
+
+        try:
+            response = await self.async_client.get(url, auth=(self.username, self.password))
         except Exception as e:
             return None, Response(f"Failed to get author's post from remote server, error: {e}",
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        post_data = json.loads(response.content.decode('utf-8'))
+        return await sync_to_async(self.convert_team14_post_response)(url, response)
+
+    def convert_team14_post_response(self, url, response) -> (dict, Response):
+        if response.status_code < 200 or response.status_code > 300:
+            return None, Response("Failed to get post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        post_data = FastJSON.loads(response.content.decode('utf-8'))
 
         post = self.convert_team14_post(url, post_data)
         return post, Response(post, status=status.HTTP_200_OK)
@@ -209,11 +255,23 @@ def send_to_remote_inbox(self, data, target_author_url):
         url = f'{target_author_url}/inbox/'
 
         data = self.convert_post_in_inbox(data)
-        response = requests.post(url=url, data=json.dumps(data), auth=(self.username, self.password),
+        response = self.client.post(url=url, data=FastJSON.dumps(data), auth=(self.username, self.password),
                                  headers={'content-type': 'application/json'})
+        return self.convert_team14_inbox_response(response)
+
+    async def asend_to_remote_inbox(self, data, target_author_url):
+        if target_author_url is None:
+            return 404
+        url = f'{target_author_url}/inbox/'
+
+        data = self.convert_post_in_inbox(data)
+        response = await self.async_client.post(url=url, data=FastJSON.dumps(data), auth=(self.username, self.password),
+                                                headers={'content-type': 'application/json'})
+        return self.convert_team14_inbox_response(response)
 
+    def convert_team14_inbox_response(self, response):
         if response.status_code < 200 or response.status_code > 300:
-            return Response(f"Failed to get post from remote server, error {json.loads(response.content)}",
+            return Response(f"Failed to get post from remote server, error {FastJSON.loads(response.content)}",
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response("Successfully sent to remote inbox!", status=status.HTTP_200_OK)
@@ -222,7 +280,7 @@ def get_comments_for_post(self, comments_path, author = None, request = None):
         url = f'{self.get_base_url()}{comments_path}/'
 
         try:
-            response = requests.get(url, auth=(self.username, self.password))
+            response = self.client.get(url, auth=(self.username, self.password))
             if response.status_code < 200 or response.status_code > 300:
                 return Response("Failed to get comments for post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
             
@@ -231,7 +289,7 @@ def get_comments_for_post(self, comments_path, author = None, request = None):
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         data = []
-        comment_data = json.loads(response.content.decode('utf-8'))
+        comment_data = FastJSON.loads(response.content.decode('utf-8'))
         
         for comment in comment_data:
             data.append(self.convert_team14_comment(comment))
@@ -247,22 +305,22 @@ def create_comment_on_post(self, comments_path, data, extra_data = None):
         author_url = extra_data['post']['post']['author']['url']
         url = f'{author_url}/inbox/'
         data = self.create_team14_comment(data, extra_data)
-        response = requests.post(url = url, data = json.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
+        response = self.client.post(url = url, data = FastJSON.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
         if response.status_code < 200 or response.status_code > 300:
             return Response(
-                f"Failed to get post from remote server, error {json.loads(response.content)}",
+                f"Failed to get post from remote server, error {FastJSON.loads(response.content)}",
                 status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response("Successfully created comment to team 14!", status=status.HTTP_200_OK)
     
     def get_authors_liked_on_post(self, object_id):
         url = f'{self.get_base_url()}{object_id}'
-        response =  requests.get(url = url, auth = (self.username, self.password))
+        response =  self.client.get(url = url, auth = (self.username, self.password))
 
         if response.status_code < 200 or response.status_code > 300:
             return Response("Failed to get author likes for post on remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-        team14_authors = json.loads(response.content.decode('utf-8'))
+        team14_authors = FastJSON.loads(response.content.decode('utf-8'))
         data = []
         for author in team14_authors:
             converted_author = self.convert_team14_authors(url, author)
@@ -273,11 +331,11 @@ def get_authors_liked_on_post(self, object_id):
     def like_a_post(self, data, target_author_url, extra_data = None):
         url = f'{target_author_url}/inbox/'
         data = self.create_team14_like_post(data, target_author_url)
-        response = requests.post(url = url, data = json.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
+        response = self.client.post(url = url, data = FastJSON.dumps(data), auth = (self.username, self.password), headers = {'content-type': 'application/json'})
         
         if response.status_code < 200 or response.status_code > 300:
             return Response(
-                f"Failed to like post on team 14, error {json.loads(response.content)}",
+                f"Failed to like post on team 14, error {FastJSON.loads(response.content)}",
                 status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response("Successfully created like to team 14!", status=status.HTTP_200_OK)
@@ -1,13 +1,14 @@
-import json
+import logging
 import urllib.parse
 
-import requests
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.response import Response
 
 from authors.models.author import Author
 from authors.serializers.author_serializer import AuthorSerializer
 from common.base_util import BaseUtil
+from common.fast_json import FastJSON
 from common.pagination_helper import PaginationHelper
 from follow.models import Follow
 from follow.serializers.follow_serializer import FollowRequestSerializer
@@ -16,9 +17,12 @@
 from remote_nodes.local_default import LocalDefault
 from comment.serializers import CommentSerializer
 
+logger = logging.getLogger(__name__)
+
 class Team7Local(LocalDefault):
     domain = '127.0.0.1:8007'
     username = 'team7_local'
+    supports_bulk_inbox = False
     team_metadata_tag = 'team7'
 
     """Mapping: remote <-> local"""
@@ -65,7 +69,7 @@ def __init__(self):
 
         """
         To use headers:
-            response = requests.get('url',
+            response = self.client.get('url',
                                     headers=self.headers,
                                     auth=(self.username, self.password))
         """
@@ -99,22 +103,33 @@ def create_node_credentials(cls):
 
     def get_all_author_jsons(self, params: dict):
         """Returns a list of authors as json"""
-        url = f'{self.get_base_url()}/authors/'
-        if len(params) > 0:
-            query_param = urllib.parse.urlencode(params)
-            url += '?' + query_param
+        url = self.get_all_authors_url(params)
 
         try:
-            response = requests.get(url)
+            response = self.client.get(url)
         except ConnectionError as e:
-            print(f"{self.__class__.username}: url ({url}) Connection error: {e}")
+            logger.warning(f"{self.__class__.username}: url ({url}) Connection error: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"{self.__class__.username}: Unknown err: {e}")
             return None
+
+        return self.convert_team7_author_jsons_response(url, response)
+
+    async def aget_all_author_jsons(self, params: dict):
+        url = self.get_all_authors_url(params)
+
+        try:
+            response = await self.async_client.get(url)
         except Exception as e:
-            print(f"{self.__class__.username}: Unknown err: {e}")
+            logger.warning(f"{self.__class__.username}: url ({url}) possibly no connection: {e}")
             return None
 
+        return await sync_to_async(self.convert_team7_author_jsons_response)(url, response)
+
+    def convert_team7_author_jsons_response(self, url, response):
         if response.status_code == 200:
-            author_json = json.loads(response.content.decode('utf-8'))
+            author_json = FastJSON.loads(response.content.decode('utf-8'))
             author_list = []
             for raw_author in author_json['items']:
                 raw_author['url'] = url  # since we don't trust their url; this works
@@ -127,26 +142,38 @@ def get_all_author_jsons(self, params: dict):
 
     def get_author_via_url(self, author_url: str) -> Author:
         try:
-            response = requests.get(author_url)  # no password
+            response = self.client.get(author_url)  # no password
         except Exception as e:
-            print(f'{self}: get_author_via_url: possibly no connection: {e}')
+            logger.warning(f'{self}: get_author_via_url: possibly no connection: {e}')
             return None
 
+        return self.convert_team7_author_response(author_url, response)
+
+    async def aget_author_via_url(self, author_url: str) -> Author:
+        try:
+            response = await self.async_client.get(author_url)  # no password
+        except Exception as e:
+            logger.warning(f'{self}: aget_author_via_url: possibly no connection: {e}')
+            return None
+
+        return await sync_to_async(self.convert_team7_author_response)(author_url, response)
+
+    def convert_team7_author_response(self, author_url: str, response) -> Author:
         if response.status_code == 200:
-            author_json = json.loads(response.content.decode('utf-8'))
+            author_json = FastJSON.loads(response.content.decode('utf-8'))
             author_json['url'] = author_url  # since we don't trust their url; this works
             serializer = AuthorSerializer(data=author_json)
 
             if serializer.is_valid():
                 return serializer.validated_data  # <- GOOD RESULT HERE!!!
 
-            print(f'{self} GetAuthorViaUrl: AuthorSerializer: ', serializer.errors)
+            logger.warning(f'{self} GetAuthorViaUrl: AuthorSerializer: {serializer.errors}')
 
         return None
 
     def post_local_follow_remote(self, author_actor: Author, author_target: Author) -> dict:
         url = f'{author_target.get_url()}/followers/{author_actor.get_id()}'
-        response = requests.put(url,
+        response = self.client.put(url,
                                 auth=(self.username, self.password),
                                 headers=self.headers)
         if 200 <= response.status_code < 300:
@@ -158,7 +185,7 @@ def post_local_follow_remote(self, author_actor: Author, author_target: Author)
                 'localUrl': f'{author_actor.get_url()}/followers/{author_target.get_id()}/',
                 'id': None
             }  # <- GOOD
-        print(f'{self}: post_local_follow_remote: {response.content}')
+        logger.info(f'{self}: post_local_follow_remote: {response.content}')
         return response.status_code
 
     def get_remote_follow(self, target: Author, follower: Author) -> Follow:
@@ -169,7 +196,7 @@ def get_remote_follow(self, target: Author, follower: Author) -> Follow:
         Returns None if cannot be found
         """
         url = f'{target.get_url()}/followers/{follower.get_id()}'
-        response = requests.get(url, auth=(self.username, self.password))
+        response = self.client.get(url, auth=(self.username, self.password))
         if 200 <= response.status_code < 300:
             follow_serializer = FollowRequestSerializer(data={
                 'actor': AuthorSerializer(follower).data,
@@ -180,32 +207,49 @@ def get_remote_follow(self, target: Author, follower: Author) -> Follow:
             })
             if not follow_serializer.is_valid():
                 for err in follow_serializer.errors:
-                    print(f'{self}: get_remote_follow: serialization error: {err}')
+                    logger.warning(f'{self}: get_remote_follow: serialization error: {err}')
                 return None
             return follow_serializer.validated_data
         else:
-            print(f'{self}: get_follow_request: get failed: {response.status_code}')
+            logger.warning(f'{self}: get_follow_request: get failed: {response.status_code}')
             return None
 
     def get_authors_posts(self, request, author_post_path: str):
+        return self.get_authors_posts_page(author_post_path, request.query_params)
+
+    def get_authors_posts_page(self, author_post_path: str, params: dict):
         url = f'{self.get_base_url()}{author_post_path}'
 
         try:
-            response = requests.get(url, auth=(self.username, self.password))
-            if response.status_code < 200 or response.status_code > 300:
-                return Response("Failed to get author's  post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+            response = self.client.get(url, auth=(self.username, self.password))
+        except Exception as e:
+            return Response(f"Failed to get author's post from remote server, error: {e}",
+                            status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return self.convert_team7_posts_response(params, url, response)
 
+    async def aget_authors_posts(self, request, author_post_path: str):
+        url = f'{self.get_base_url()}{author_post_path}'
+
+        try:
+            response = await self.async_client.get(url, auth=(self.username, self.password))
         except Exception as e:
             return Response(f"Failed to get author's post from remote server, error: {e}",
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        return await sync_to_async(self.convert_team7_posts_response)(request.query_params, url, response)
+
+    def convert_team7_posts_response(self, params: dict, url, response):
+        if response.status_code < 200 or response.status_code > 300:
+            return Response("Failed to get author's  post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
+
         data = []
 
-        post_data = json.loads(response.content.decode('utf-8'))
+        post_data = FastJSON.loads(response.content.decode('utf-8'))
         for key, value in post_data.items():
             data.append(self.convert_team7_post(url, value))
 
-        data, err = PaginationHelper.paginate_serialized_data(request, data)
+        data, err = PaginationHelper.paginate_data(params, data)
 
         if err is not None:
             return Response(err, status=status.HTTP_400_BAD_REQUEST)
@@ -217,7 +261,7 @@ def get_comments_for_post(self, comments_path, author = None, request = None):
         url = f'{self.get_base_url()}{comments_path}'
 
         try:
-            response = requests.get(url, auth=(self.username, self.password))
+            response = self.client.get(url, auth=(self.username, self.password))
             if response.status_code < 200 or response.status_code > 300:
                 return Response("Failed to get comments for post from remote server", status.HTTP_500_INTERNAL_SERVER_ERROR)
             
@@ -226,7 +270,7 @@ def get_comments_for_post(self, comments_path, author = None, request = None):
                             status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         data = []
-        comment_data = json.loads(response.content.decode('utf-8'))['comments']
+        comment_data = FastJSON.loads(response.content.decode('utf-8'))['comments']
 
         for comment in comment_data:
             data.append(self.convert_team7_comment(url, comment))
@@ -242,11 +286,11 @@ def create_comment_on_post(self, comments_path, data, extra_data = None):
         url = f'{self.get_base_url()}{comments_path}'
 
         data = self.create_team7_comment(data)
-        response = requests.post(url = url, data = json.dumps(data))
+        response = self.client.post(url = url, data = FastJSON.dumps(data))
         
         if response.status_code < 200 or response.status_code > 300:
             return Response(
-                f"Failed to get post from remote server, error {json.loads(response.content)}",
+                f"Failed to get post from remote server, error {FastJSON.loads(response.content)}",
                 status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response("Successfully created comment to team 7!", status=status.HTTP_200_OK)
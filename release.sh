@@ -4,6 +4,8 @@ set -e
 echo "Starting release"
 python mysocial/manage.py migrate --settings mysocial.settings.production
 echo "Database migrated"
+# the table of a DatabaseCache in CACHE_CONFIG, if there's one
+python mysocial/manage.py createcachetable --settings mysocial.settings.production
 
 # .keep!
 touch mysocial/mysocial/staticfiles/.keep
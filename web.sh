@@ -0,0 +1,7 @@
+set -e
+
+# SERVER_MODE=asgi serves through uvicorn workers, so requests waiting on other nodes don't each hold a worker
+if [ "$SERVER_MODE" = "asgi" ]; then
+  exec gunicorn --pythonpath mysocial mysocial.asgi -k uvicorn.workers.UvicornWorker
+fi
+exec gunicorn --pythonpath mysocial mysocial.wsgi